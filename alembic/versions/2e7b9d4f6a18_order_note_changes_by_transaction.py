@@ -0,0 +1,72 @@
+"""order note changes by transaction
+
+Revision ID: 2e7b9d4f6a18
+Revises: 9c2f5a7e1b34
+Create Date: 2026-10-19 09:41:27.318806
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e7b9d4f6a18'
+down_revision: Union[str, Sequence[str], None] = '9c2f5a7e1b34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The trigger no longer takes a global advisory lock; readers order by the
+# writing transaction instead (see app.services.changes_service).
+RECORD_NOTE_CHANGE = """
+    CREATE OR REPLACE FUNCTION record_note_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM note_changes WHERE note_id = OLD.id;
+            INSERT INTO note_changes (note_id, op, txid) VALUES (OLD.id, 'delete', txid_current());
+            RETURN OLD;
+        END IF;
+        DELETE FROM note_changes WHERE note_id = NEW.id;
+        INSERT INTO note_changes (note_id, op, txid) VALUES (NEW.id, 'upsert', txid_current());
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+# As created by revision 3f9b2c6d8e14
+LOCKING_RECORD_NOTE_CHANGE = """
+    CREATE OR REPLACE FUNCTION record_note_change() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_advisory_xact_lock(hashtext('note_changes'));
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM note_changes WHERE note_id = OLD.id;
+            INSERT INTO note_changes (note_id, op) VALUES (OLD.id, 'delete');
+            RETURN OLD;
+        END IF;
+        DELETE FROM note_changes WHERE note_id = NEW.id;
+        INSERT INTO note_changes (note_id, op) VALUES (NEW.id, 'upsert');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows keep txid 0 and so stay ahead of every new change, in seq order
+    op.add_column('note_changes', sa.Column('txid', sa.BigInteger(), server_default='0', nullable=False))
+    op.create_index('ix_note_changes_txid_seq', 'note_changes', ['txid', 'seq'], unique=False)
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(RECORD_NOTE_CHANGE)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(LOCKING_RECORD_NOTE_CHANGE)
+    op.drop_index('ix_note_changes_txid_seq', table_name='note_changes')
+    # Not batch mode: recreating the table would break the notes triggers that
+    # reference it, and SQLite 3.35+ drops columns in place
+    op.drop_column('note_changes', 'txid')
@@ -0,0 +1,86 @@
+"""add note changes feed
+
+Revision ID: 3f9b2c6d8e14
+Revises: b71d4c0e9a36
+Create Date: 2026-10-18 18:27:51.640219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9b2c6d8e14'
+down_revision: Union[str, Sequence[str], None] = 'b71d4c0e9a36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    op.create_table('note_changes',
+    sa.Column('seq', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('note_id', sa.Integer(), nullable=False),
+    sa.Column('op', sa.String(length=6), nullable=False),
+    sa.PrimaryKeyConstraint('seq'),
+    sa.UniqueConstraint('note_id'),
+    sqlite_autoincrement=True,
+    )
+    # Existing notes form the initial feed
+    op.execute("INSERT INTO note_changes (note_id, op) SELECT id, 'upsert' FROM notes ORDER BY id")
+
+    if dialect == "postgresql":
+        op.execute("""
+            CREATE OR REPLACE FUNCTION record_note_change() RETURNS trigger AS $$
+            BEGIN
+                PERFORM pg_advisory_xact_lock(hashtext('note_changes'));
+                IF TG_OP = 'DELETE' THEN
+                    DELETE FROM note_changes WHERE note_id = OLD.id;
+                    INSERT INTO note_changes (note_id, op) VALUES (OLD.id, 'delete');
+                    RETURN OLD;
+                END IF;
+                DELETE FROM note_changes WHERE note_id = NEW.id;
+                INSERT INTO note_changes (note_id, op) VALUES (NEW.id, 'upsert');
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute("""
+            CREATE TRIGGER note_changes_trg AFTER INSERT OR UPDATE OR DELETE ON notes
+            FOR EACH ROW EXECUTE FUNCTION record_note_change()
+        """)
+    elif dialect == "sqlite":
+        op.execute("""
+            CREATE TRIGGER note_changes_ai AFTER INSERT ON notes BEGIN
+                DELETE FROM note_changes WHERE note_id = new.id;
+                INSERT INTO note_changes (note_id, op) VALUES (new.id, 'upsert');
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER note_changes_au AFTER UPDATE ON notes BEGIN
+                DELETE FROM note_changes WHERE note_id = new.id;
+                INSERT INTO note_changes (note_id, op) VALUES (new.id, 'upsert');
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER note_changes_ad AFTER DELETE ON notes BEGIN
+                DELETE FROM note_changes WHERE note_id = old.id;
+                INSERT INTO note_changes (note_id, op) VALUES (old.id, 'delete');
+            END
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS note_changes_trg ON notes")
+        op.execute("DROP FUNCTION IF EXISTS record_note_change()")
+    elif dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS note_changes_ad")
+        op.execute("DROP TRIGGER IF EXISTS note_changes_au")
+        op.execute("DROP TRIGGER IF EXISTS note_changes_ai")
+    op.drop_table('note_changes')
@@ -0,0 +1,118 @@
+"""add stats counters
+
+Revision ID: 6d0c9e3b5a71
+Revises: a4e8f1c2d937
+Create Date: 2026-10-18 21:02:44.518306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d0c9e3b5a71'
+down_revision: Union[str, Sequence[str], None] = 'a4e8f1c2d937'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of app.models.stats.COUNTERS:
+# (source table, its foreign key column, counter table, counter table key, counter column)
+COUNTERS = [
+    ("notes", "user_id", "user_stats", "user_id", "note_count"),
+    ("links", "note_id", "note_stats", "note_id", "link_count"),
+    ("media", "note_id", "note_stats", "note_id", "media_count"),
+    ("note_edges", "target_id", "note_stats", "note_id", "backlink_count"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('note_count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('note_stats',
+    sa.Column('note_id', sa.Integer(), nullable=False),
+    sa.Column('link_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('media_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('backlink_count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['note_id'], ['notes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('note_id')
+    )
+    # Backfill before the triggers exist; `python -m app.cli rebuild-stats` does the same later
+    op.execute("""
+        INSERT INTO user_stats (user_id, note_count)
+        SELECT user_id, count(*) FROM notes WHERE user_id IS NOT NULL GROUP BY user_id
+    """)
+    op.execute("""
+        INSERT INTO note_stats (note_id, link_count, media_count, backlink_count)
+        SELECT note_id, sum(links), sum(media), sum(backlinks) FROM (
+            SELECT note_id, 1 AS links, 0 AS media, 0 AS backlinks FROM links WHERE note_id IS NOT NULL
+            UNION ALL SELECT note_id, 0, 1, 0 FROM media WHERE note_id IS NOT NULL
+            UNION ALL SELECT target_id, 0, 0, 1 FROM note_edges
+        ) AS per_note GROUP BY note_id
+    """)
+
+    for source, fk, stats, key, column in COUNTERS:
+        if dialect == "postgresql":
+            op.execute(f"""
+                CREATE OR REPLACE FUNCTION {stats}_{source}_count() RETURNS trigger AS $$
+                BEGIN
+                    IF TG_OP = 'UPDATE' AND OLD.{fk} IS NOT DISTINCT FROM NEW.{fk} THEN
+                        RETURN NULL;
+                    END IF;
+                    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.{fk} IS NOT NULL THEN
+                        UPDATE {stats} SET {column} = {column} - 1 WHERE {key} = OLD.{fk};
+                    END IF;
+                    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.{fk} IS NOT NULL THEN
+                        INSERT INTO {stats} ({key}, {column}) VALUES (NEW.{fk}, 1)
+                        ON CONFLICT ({key}) DO UPDATE SET {column} = {stats}.{column} + 1;
+                    END IF;
+                    RETURN NULL;
+                END
+                $$ LANGUAGE plpgsql
+            """)
+            op.execute(f"""
+                CREATE TRIGGER {stats}_{source}_trg AFTER INSERT OR DELETE OR UPDATE OF {fk} ON {source}
+                FOR EACH ROW EXECUTE FUNCTION {stats}_{source}_count()
+            """)
+        elif dialect == "sqlite":
+            upsert = f"ON CONFLICT ({key}) DO UPDATE SET {column} = {column} + 1"
+            op.execute(f"""
+                CREATE TRIGGER {stats}_{source}_ai AFTER INSERT ON {source}
+                WHEN new.{fk} IS NOT NULL BEGIN
+                    INSERT INTO {stats} ({key}, {column}) VALUES (new.{fk}, 1) {upsert};
+                END
+            """)
+            op.execute(f"""
+                CREATE TRIGGER {stats}_{source}_ad AFTER DELETE ON {source}
+                WHEN old.{fk} IS NOT NULL BEGIN
+                    UPDATE {stats} SET {column} = {column} - 1 WHERE {key} = old.{fk};
+                END
+            """)
+            op.execute(f"""
+                CREATE TRIGGER {stats}_{source}_au AFTER UPDATE OF {fk} ON {source}
+                WHEN old.{fk} IS NOT new.{fk} BEGIN
+                    UPDATE {stats} SET {column} = {column} - 1 WHERE {key} = old.{fk};
+                    INSERT INTO {stats} ({key}, {column}) SELECT new.{fk}, 1 WHERE new.{fk} IS NOT NULL {upsert};
+                END
+            """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for source, fk, stats, key, column in COUNTERS:
+        if dialect == "postgresql":
+            op.execute(f"DROP TRIGGER IF EXISTS {stats}_{source}_trg ON {source}")
+            op.execute(f"DROP FUNCTION IF EXISTS {stats}_{source}_count()")
+        elif dialect == "sqlite":
+            for suffix in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER IF EXISTS {stats}_{source}_{suffix}")
+    op.drop_table('note_stats')
+    op.drop_table('user_stats')
@@ -0,0 +1,164 @@
+"""shard user stats
+
+Revision ID: 7b4e2a9c6d15
+Revises: 2e7b9d4f6a18
+Create Date: 2026-10-19 14:12:05.902417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b4e2a9c6d15'
+down_revision: Union[str, Sequence[str], None] = '2e7b9d4f6a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of app.models.stats for the notes -> user_stats counter. A user's
+# count is spread over 16 rows so concurrent note writes for one user don't all
+# wait on the same row lock; the connection's backend pid picks the shard.
+SHARD = {"postgresql": "pg_backend_pid() % 16", "sqlite": "0"}
+
+
+def _upsert(value: str, delta: int, dialect: str) -> str:
+    return (
+        f"INSERT INTO user_stats (user_id, shard, note_count) SELECT {value}, {SHARD[dialect]}, {delta} "
+        f"WHERE {value} IS NOT NULL "
+        f"ON CONFLICT (user_id, shard) DO UPDATE SET note_count = user_stats.note_count + excluded.note_count"
+    )
+
+
+def _drop_triggers(dialect: str) -> None:
+    if dialect == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS user_stats_notes_trg ON notes")
+        op.execute("DROP FUNCTION IF EXISTS user_stats_notes_count()")
+    elif dialect == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS user_stats_notes_{suffix}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    _drop_triggers(dialect)
+    # Derived data: rebuilt from notes rather than migrated row by row
+    op.drop_table('user_stats')
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('shard', sa.SmallInteger(), server_default='0', nullable=False),
+    sa.Column('note_count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'shard')
+    )
+    op.execute("""
+        INSERT INTO user_stats (user_id, shard, note_count)
+        SELECT user_id, 0, count(*) FROM notes WHERE user_id IS NOT NULL GROUP BY user_id
+    """)
+
+    if dialect == "postgresql":
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION user_stats_notes_count() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id THEN
+                    RETURN NULL;
+                END IF;
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    {_upsert("OLD.user_id", -1, dialect)};
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    {_upsert("NEW.user_id", 1, dialect)};
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute("""
+            CREATE TRIGGER user_stats_notes_trg AFTER INSERT OR DELETE OR UPDATE OF user_id ON notes
+            FOR EACH ROW EXECUTE FUNCTION user_stats_notes_count()
+        """)
+    elif dialect == "sqlite":
+        op.execute(f"""
+            CREATE TRIGGER user_stats_notes_ai AFTER INSERT ON notes
+            WHEN new.user_id IS NOT NULL BEGIN
+                {_upsert("new.user_id", 1, dialect)};
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER user_stats_notes_ad AFTER DELETE ON notes
+            WHEN old.user_id IS NOT NULL BEGIN
+                {_upsert("old.user_id", -1, dialect)};
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER user_stats_notes_au AFTER UPDATE OF user_id ON notes
+            WHEN old.user_id IS NOT new.user_id BEGIN
+                {_upsert("old.user_id", -1, dialect)};
+                {_upsert("new.user_id", 1, dialect)};
+            END
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    _drop_triggers(dialect)
+    op.drop_table('user_stats')
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('note_count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.execute("""
+        INSERT INTO user_stats (user_id, note_count)
+        SELECT user_id, count(*) FROM notes WHERE user_id IS NOT NULL GROUP BY user_id
+    """)
+
+    # As created by revision 6d0c9e3b5a71
+    if dialect == "postgresql":
+        op.execute("""
+            CREATE OR REPLACE FUNCTION user_stats_notes_count() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id THEN
+                    RETURN NULL;
+                END IF;
+                IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL THEN
+                    UPDATE user_stats SET note_count = note_count - 1 WHERE user_id = OLD.user_id;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL THEN
+                    INSERT INTO user_stats (user_id, note_count) VALUES (NEW.user_id, 1)
+                    ON CONFLICT (user_id) DO UPDATE SET note_count = user_stats.note_count + 1;
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute("""
+            CREATE TRIGGER user_stats_notes_trg AFTER INSERT OR DELETE OR UPDATE OF user_id ON notes
+            FOR EACH ROW EXECUTE FUNCTION user_stats_notes_count()
+        """)
+    elif dialect == "sqlite":
+        upsert = "ON CONFLICT (user_id) DO UPDATE SET note_count = note_count + 1"
+        op.execute(f"""
+            CREATE TRIGGER user_stats_notes_ai AFTER INSERT ON notes
+            WHEN new.user_id IS NOT NULL BEGIN
+                INSERT INTO user_stats (user_id, note_count) VALUES (new.user_id, 1) {upsert};
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER user_stats_notes_ad AFTER DELETE ON notes
+            WHEN old.user_id IS NOT NULL BEGIN
+                UPDATE user_stats SET note_count = note_count - 1 WHERE user_id = old.user_id;
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER user_stats_notes_au AFTER UPDATE OF user_id ON notes
+            WHEN old.user_id IS NOT new.user_id BEGIN
+                UPDATE user_stats SET note_count = note_count - 1 WHERE user_id = old.user_id;
+                INSERT INTO user_stats (user_id, note_count) SELECT new.user_id, 1 WHERE new.user_id IS NOT NULL {upsert};
+            END
+        """)
@@ -0,0 +1,50 @@
+"""add owner and foreign key indexes
+
+Revision ID: 8e3a6d21c7f0
+Revises: 5c1f0e7a9b42
+Create Date: 2026-10-18 14:03:27.551093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3a6d21c7f0'
+down_revision: Union[str, Sequence[str], None] = '5c1f0e7a9b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_notes_user_id_id', 'notes', ['user_id', 'id']),
+    ('ix_links_note_id', 'links', ['note_id']),
+    ('ix_media_note_id', 'media', ['note_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        # CREATE INDEX CONCURRENTLY doesn't block writes but can't run inside a
+        # transaction. if_not_exists lets a re-run skip indexes that already
+        # finished; an invalid index left by an interrupted run must be dropped by hand.
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, unique=False,
+                                postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, table, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    else:
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,43 @@
+"""add note similarity index
+
+Revision ID: 9c2f5a7e1b34
+Revises: 6d0c9e3b5a71
+Create Date: 2026-10-18 22:10:05.731942
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c2f5a7e1b34'
+down_revision: Union[str, Sequence[str], None] = '6d0c9e3b5a71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Populate afterwards with `python -m app.cli rebuild-similarity`
+    op.create_table('note_signatures',
+    sa.Column('note_id', sa.Integer(), nullable=False),
+    sa.Column('signature', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['note_id'], ['notes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('note_id')
+    )
+    op.create_table('note_lsh_bands',
+    sa.Column('bucket', sa.BigInteger(), nullable=False),
+    sa.Column('note_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['note_id'], ['notes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('bucket', 'note_id')
+    )
+    op.create_index('ix_note_lsh_bands_note_id', 'note_lsh_bands', ['note_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_note_lsh_bands_note_id', table_name='note_lsh_bands')
+    op.drop_table('note_lsh_bands')
+    op.drop_table('note_signatures')
@@ -0,0 +1,37 @@
+"""add note edges
+
+Revision ID: a4e8f1c2d937
+Revises: 3f9b2c6d8e14
+Create Date: 2026-10-18 20:15:36.882410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e8f1c2d937'
+down_revision: Union[str, Sequence[str], None] = '3f9b2c6d8e14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Populate afterwards with `python -m app.cli rebuild-links`
+    op.create_table('note_edges',
+    sa.Column('source_id', sa.Integer(), nullable=False),
+    sa.Column('target_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['source_id'], ['notes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['target_id'], ['notes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('source_id', 'target_id')
+    )
+    op.create_index('ix_note_edges_target_source', 'note_edges', ['target_id', 'source_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_note_edges_target_source', table_name='note_edges')
+    op.drop_table('note_edges')
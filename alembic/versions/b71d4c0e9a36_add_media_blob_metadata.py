@@ -0,0 +1,34 @@
+"""add media blob metadata
+
+Revision ID: b71d4c0e9a36
+Revises: 8e3a6d21c7f0
+Create Date: 2026-10-18 16:41:09.207314
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71d4c0e9a36'
+down_revision: Union[str, Sequence[str], None] = '8e3a6d21c7f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable with no default: a metadata-only change on PostgreSQL, no table rewrite
+    op.add_column('media', sa.Column('size', sa.BigInteger(), nullable=True))
+    op.add_column('media', sa.Column('sha256', sa.String(length=64), nullable=True))
+    op.add_column('media', sa.Column('mime_type', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('media') as batch_op:
+        batch_op.drop_column('mime_type')
+        batch_op.drop_column('sha256')
+        batch_op.drop_column('size')
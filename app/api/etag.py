@@ -0,0 +1,15 @@
+import hashlib
+from typing import Optional
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the exact response body."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip() for tag in if_none_match.split(","))
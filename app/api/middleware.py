@@ -0,0 +1,228 @@
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from typing import Optional
+
+from app.core.admission import AdmissionLimiter
+from app.core.config import settings
+from app.core.metrics import RequestStats, current_request_stats, request_metrics, worker_info
+from app.core.profiling import (
+    ProfileStore, RequestProfile, Sampler, current_profile, should_profile, sql_summary, summarize,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records latency, query count and DB time per route, and logs the statements of
+    requests that exceed SLOW_REQUEST_MS or MAX_QUERIES_PER_REQUEST.
+    Pure ASGI so streaming responses are timed to their last byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request_stats.reset(token)
+            route = scope.get("route")
+            # Route templates (not raw paths) keep label cardinality bounded
+            route_path = getattr(route, "path", None) or "unmatched"
+            request_metrics.observe(scope["method"], route_path, status, elapsed, stats)
+            if elapsed * 1000 > settings.SLOW_REQUEST_MS or stats.query_count > settings.MAX_QUERIES_PER_REQUEST:
+                logger.warning(
+                    "slow request %s %s: %.1f ms, %d queries (%.1f ms in SQL)\n%s",
+                    scope["method"], route_path, elapsed * 1000, stats.query_count,
+                    stats.db_time * 1000, "\n".join(stats.statements),
+                )
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pins a client to the primary for a short window after a successful write, so
+    it reads its own writes even if the replicas lag. The pin is a cookie that
+    get_read_db checks; it carries no data, so a forged one only costs the
+    client replica routing.
+    """
+
+    def __init__(self, app, cookie_name: str, window_seconds: float):
+        self.app = app
+        self.cookie_name = cookie_name
+        self.window_seconds = window_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_pin(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = f"{self.cookie_name}=1; Max-Age={int(self.window_seconds)}; Path=/; HttpOnly; SameSite=Lax"
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
+
+
+class AdmissionControlMiddleware:
+    """
+    Sheds load before it reaches the connection pool. GET/HEAD/OPTIONS requests
+    take a slot from read_limiter, media uploads (writes to upload_path) from
+    upload_limiter when one is given, everything else from write_limiter; a
+    request that can't get one in time is answered 503 with Retry-After right away.
+    Paths under exempt_prefixes (health checks, metrics) always pass.
+    """
+
+    READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, app, read_limiter: AdmissionLimiter, write_limiter: AdmissionLimiter,
+                 upload_limiter: Optional[AdmissionLimiter] = None, upload_path: str = r"/notes/[^/]+/media",
+                 exempt_prefixes: tuple = ("/health", "/metrics", "/internal")):
+        self.app = app
+        self.read_limiter = read_limiter
+        self.write_limiter = write_limiter
+        self.upload_limiter = upload_limiter
+        self.upload_path = re.compile(upload_path)
+        self.exempt_prefixes = exempt_prefixes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self._limiter(scope)
+        if not await limiter.acquire():
+            await self._reject(send, limiter)
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - started)
+
+    def _limiter(self, scope) -> AdmissionLimiter:
+        if scope["method"] in self.READ_METHODS:
+            return self.read_limiter
+        # An upload holds its slot while the body streams in, so it doesn't count
+        # against the note writes' budget
+        if self.upload_limiter is not None and self.upload_path.fullmatch(scope["path"]):
+            return self.upload_limiter
+        return self.write_limiter
+
+    async def _reject(self, send, limiter: AdmissionLimiter) -> None:
+        body = json.dumps({"detail": "Server is overloaded, retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(limiter.retry_after()).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+class ProfilingMiddleware:
+    """
+    Samples the stacks of requests that carry the X-Profile-Token header with
+    the configured token, or that are picked at sample_rate, and keeps the result
+    in store: collapsed stacks, the top functions and the request's SQL time and
+    slowest statements. The response carries X-Profile-Id. Installed inside
+    RequestMetricsMiddleware so the request's SQL stats are available; requests
+    that aren't profiled pay for a header lookup and, with a sample rate, one
+    random number.
+    """
+
+    HEADER = b"x-profile-token"
+
+    def __init__(self, app, store: ProfileStore, sampler: Sampler, token: str, sample_rate: float,
+                 top_n: int = 20, exempt_prefixes: tuple = ("/health", "/metrics", "/internal")):
+        self.app = app
+        self.store = store
+        self.sampler = sampler
+        self.token = token
+        self.sample_rate = sample_rate
+        self.top_n = top_n
+        self.exempt_prefixes = exempt_prefixes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_prefixes):
+            await self.app(scope, receive, send)
+            return
+        header = next((value for name, value in scope["headers"] if name == self.HEADER), None)
+        if not should_profile(header.decode("latin-1") if header is not None else None,
+                              self.token, self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = self.store.next_id()
+        profile = RequestProfile(scope["method"], scope["path"], self.sampler.interval)
+        status = 500
+        headers = [(b"x-profile-id", str(profile_id).encode())]
+        worker = worker_info()["worker"]
+        if worker is not None:
+            headers.append((b"x-profile-worker", str(worker).encode()))
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + headers
+            await send(message)
+
+        # This coroutine's frame is on the event loop thread's stack whenever the
+        # request's async code runs
+        thread_id, frame = threading.get_ident(), sys._getframe()
+        token = current_profile.set(profile)
+        profile.add_target(thread_id, frame)
+        self.sampler.start(profile)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.sampler.stop(profile)
+            profile.remove_target(thread_id, frame)
+            current_profile.reset(token)
+            stats = current_request_stats.get()
+            top, collapsed = summarize(profile, self.top_n)
+            self.store.add({
+                "id": profile_id,
+                **worker_info(),
+                "method": profile.method,
+                "path": profile.path,
+                "route": getattr(scope.get("route"), "path", None),
+                "status": status,
+                "started_at": profile.started_at,
+                "duration_ms": round(elapsed * 1000, 2),
+                "sql_ms": round(stats.db_time * 1000, 2) if stats else None,
+                "query_count": stats.query_count if stats else None,
+                "samples": profile.samples,
+                "ms_per_sample": round(profile.seconds_per_sample() * 1000, 3),
+                "top": top,
+                "sql": sql_summary(stats, self.top_n),
+                "collapsed": collapsed,
+            })
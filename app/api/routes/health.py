@@ -1,7 +1,39 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.core.admission import read_limiter, upload_limiter, write_limiter
+from app.core.config import settings
+from app.db.pool_metrics import pool_status
+from app.db.session import engine
 
 router = APIRouter(tags=["health"])
 
 @router.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+@router.get("/health/ready")
+async def readiness_check():
+    """
+    "degraded" (503) while the connection pool is nearly exhausted or an
+    admission queue is nearly full, so a load balancer can steer traffic away.
+    Async so it answers even when the threadpool is full.
+    """
+    pool = pool_status(engine)
+    capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    saturation = pool["checkedout"] / capacity if "checkedout" in pool and capacity else 0.0
+    queue_full = any(
+        limiter.max_queue and limiter.waiting >= limiter.max_queue * settings.HEALTH_DEGRADED_QUEUE_RATIO
+        for limiter in (read_limiter, write_limiter, upload_limiter)
+    )
+    degraded = saturation >= settings.HEALTH_DEGRADED_POOL_RATIO or queue_full
+    body = {
+        "status": "degraded" if degraded else "healthy",
+        "pool": {**pool, "saturation": round(saturation, 3)},
+        "admission": {
+            "read": read_limiter.stats(),
+            "write": write_limiter.stats(),
+            "upload": upload_limiter.stats(),
+        },
+    }
+    return JSONResponse(body, status_code=503 if degraded else 200)
@@ -0,0 +1,78 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.core.admission import read_limiter, upload_limiter, write_limiter
+from app.core.config import settings
+from app.core.metrics import worker_info
+from app.core.profiling import profile_store, token_matches
+from app.db.pool_metrics import pool_metrics, pool_status
+from app.db.session import engine, replica_router
+from app.services import write_coalescer
+from app.services.note_cache import note_cache
+
+def require_profile_token(x_profile_token: Optional[str] = Header(None)):
+    """
+    Pool, cache and admission stats describe the deployment and profiles hold SQL
+    text and source paths: every /internal endpoint takes the PROFILING_TOKEN.
+    """
+    if not token_matches(x_profile_token, settings.PROFILING_TOKEN):
+        raise HTTPException(status_code=403, detail="X-Profile-Token required")
+
+# Operational endpoints for the team; not part of the public API
+router = APIRouter(prefix="/internal", tags=["internal"], include_in_schema=False,
+                   dependencies=[Depends(require_profile_token)])
+
+@router.get("/cache")
+def cache_stats():
+    return {**note_cache.stats(), **worker_info()}
+
+@router.get("/pool")
+def pool_stats():
+    return {
+        "config": {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        },
+        "status": pool_status(engine),
+        "metrics": pool_metrics.snapshot(),
+        "replicas": replica_router.status(),
+        **worker_info(),
+    }
+
+@router.get("/writes")
+def write_coalescer_stats():
+    writer = write_coalescer.note_writer
+    return {"enabled": writer is not None, **(writer.stats() if writer is not None else {}), **worker_info()}
+
+@router.get("/admission")
+def admission_stats():
+    return {
+        "enabled": settings.ADMISSION_CONTROL,
+        "read": read_limiter.stats(),
+        "write": write_limiter.stats(),
+        "upload": upload_limiter.stats(),
+        **worker_info(),
+    }
+
+@router.get("/profiles")
+def list_profiles():
+    return {"enabled": settings.PROFILING, "profiles": profile_store.summaries(), **worker_info()}
+
+@router.get("/profiles/{profile_id}")
+def read_profile(profile_id: int):
+    record = profile_store.get(profile_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Profile not found on worker {worker_info()['worker']}")
+    return record
+
+@router.get("/profiles/{profile_id}/collapsed", response_class=PlainTextResponse)
+def read_profile_collapsed(profile_id: int):
+    """Collapsed stacks for flamegraph.pl, speedscope or inferno."""
+    record = profile_store.get(profile_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Profile not found on worker {worker_info()['worker']}")
+    return "\n".join(record["collapsed"]) + "\n"
@@ -0,0 +1,133 @@
+import mimetypes
+import os
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.services import media_service, notes_service
+from app.services.media_storage import StorageBackend, get_storage
+from app.db.session import get_db, get_read_db
+from app.core.config import settings
+from app.api.etag import etag_matches
+from app.schemas.notes import MediaResponse
+from app.api.routing import ProfiledRoute
+from app.core.profiling import profiled
+
+router = APIRouter(tags=["Media"], route_class=ProfiledRoute)
+
+# The stored mime type comes from the uploader. Only these are shown inline;
+# anything else (HTML, SVG, scripts) is served as a download, so an upload
+# can't run script on the API's origin.
+INLINE_MIME_TYPES = {"image/png", "image/jpeg", "image/gif", "image/webp", "application/pdf", "text/plain"}
+
+@router.post("/notes/{note_id}/media", response_model=MediaResponse, status_code=201)
+async def upload_media(
+    note_id: int,
+    request: Request,
+    filename: str = Query(..., min_length=1, max_length=255, description="Name to store and serve the file under"),
+    db: Session = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+):
+    """
+    Upload the raw request body as a media file for a note. The body is streamed
+    to storage in MEDIA_CHUNK_SIZE pieces and hashed on the way, so memory use
+    does not depend on the file size. Content-Type is stored as the mime type.
+    """
+    filename = os.path.basename(filename)
+    if not filename:
+        raise HTTPException(status_code=400, detail="Invalid filename")
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > settings.MEDIA_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="File too large")
+    exists = await run_in_threadpool(profiled(notes_service.note_exists), db, note_id)
+    # End the check's transaction so its pooled connection isn't held for the
+    # whole (possibly slow) upload; create_media checks out a fresh one
+    await run_in_threadpool(db.rollback)
+    if not exists:
+        raise HTTPException(status_code=404, detail="Note not found")
+
+    writer = await run_in_threadpool(storage.writer)
+    try:
+        buffer = bytearray()
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > settings.MEDIA_MAX_BYTES:
+                raise HTTPException(status_code=413, detail="File too large")
+            buffer += chunk
+            # Hand full chunks to the writer thread; at most one chunk plus one
+            # network read is held in memory
+            while len(buffer) >= settings.MEDIA_CHUNK_SIZE:
+                piece = bytes(buffer[:settings.MEDIA_CHUNK_SIZE])
+                del buffer[:settings.MEDIA_CHUNK_SIZE]
+                await run_in_threadpool(writer.write, piece)
+        if buffer:
+            await run_in_threadpool(writer.write, bytes(buffer))
+        digest, size = await run_in_threadpool(writer.commit)
+    except BaseException:
+        await run_in_threadpool(writer.abort)
+        raise
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    mime_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    return await run_in_threadpool(profiled(media_service.create_media), db, note_id, filename, digest, size, mime_type)
+
+@router.delete("/notes/{note_id}/media/{media_id}", response_model=MediaResponse)
+def delete_media(note_id: int, media_id: int, db: Session = Depends(get_db)):
+    deleted = media_service.delete_media(db, note_id, media_id)
+    if deleted is None:
+        raise HTTPException(status_code=404, detail="Media not found")
+    return deleted
+
+@router.get("/media/{media_id}", response_model=MediaResponse)
+def read_media(media_id: int, db: Session = Depends(get_read_db)):
+    media = media_service.get_media(db, media_id)
+    if media is None:
+        raise HTTPException(status_code=404, detail="Media not found")
+    return media
+
+@router.get("/media/{media_id}/content")
+def download_media(
+    media_id: int,
+    request: Request,
+    db: Session = Depends(get_read_db),
+    storage: StorageBackend = Depends(get_storage),
+):
+    """
+    Serve the media bytes. Local blobs go through FileResponse, which honours
+    Range/If-Range and uses the server's zero-copy path send extension when available.
+    """
+    media = media_service.get_media(db, media_id)
+    if media is None:
+        raise HTTPException(status_code=404, detail="Media not found")
+    # Rows created before uploads existed only point at an external file_path
+    if media.sha256 is None or not storage.exists(media.sha256):
+        raise HTTPException(status_code=404, detail="Media content not available")
+
+    # Content-addressed and never rewritten, so the hash is a strong validator
+    etag = f'"{media.sha256}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}, immutable",
+        "X-Content-Type-Options": "nosniff",
+    }
+    disposition = "inline" if media.mime_type in INLINE_MIME_TYPES else "attachment"
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    path = storage.local_path(media.sha256)
+    if path is None:
+        headers["Content-Length"] = str(media.size)
+        headers["Content-Disposition"] = f"{disposition}; filename*=utf-8''{quote(media.file_path)}"
+        return StreamingResponse(
+            storage.open(media.sha256, settings.MEDIA_CHUNK_SIZE), media_type=media.mime_type, headers=headers
+        )
+    return FileResponse(
+        path,
+        media_type=media.mime_type,
+        filename=media.file_path,
+        content_disposition_type=disposition,
+        headers=headers,
+    )
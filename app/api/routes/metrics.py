@@ -0,0 +1,47 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.admission import read_limiter, upload_limiter, write_limiter
+from app.core.metrics import render_histogram, request_metrics, worker_info
+from app.db.pool_metrics import pool_metrics, pool_status
+from app.db.session import engine
+from app.services.note_cache import note_cache
+
+router = APIRouter(tags=["health"], include_in_schema=False)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text exposition format."""
+    # Every series below is this worker's own; under app.serve the info line says
+    # which one answered. A single process has no worker id, so no info line.
+    worker = worker_info()
+    lines = []
+    if worker["worker"] is not None:
+        lines += ["# HELP app_worker_info Worker process that served this scrape", "# TYPE app_worker_info gauge",
+                  f'app_worker_info{{worker="{worker["worker"]}",pid="{worker["pid"]}"}} 1']
+    lines += request_metrics.render()
+
+    lines += ["# HELP db_pool_connections Pool occupancy", "# TYPE db_pool_connections gauge"]
+    for state, value in pool_status(engine).items():
+        if isinstance(value, int):
+            lines.append(f'db_pool_connections{{state="{state}"}} {value}')
+    lines += ["# HELP db_pool_checkout_wait_seconds Time spent waiting for a pooled connection",
+              "# TYPE db_pool_checkout_wait_seconds histogram"]
+    lines += render_histogram("db_pool_checkout_wait_seconds", pool_metrics.checkout_wait.snapshot(), {})
+
+    lines += ["# HELP admission_requests_total Requests admitted or shed by admission control",
+              "# TYPE admission_requests_total counter"]
+    for limiter in (read_limiter, write_limiter, upload_limiter):
+        lines.append(f'admission_requests_total{{class="{limiter.name}",outcome="admitted"}} {limiter.admitted}')
+        for reason, count in limiter.rejected.items():
+            lines.append(f'admission_requests_total{{class="{limiter.name}",outcome="rejected_{reason}"}} {count}')
+    lines += ["# HELP admission_waiting Requests queued for admission", "# TYPE admission_waiting gauge"]
+    for limiter in (read_limiter, write_limiter, upload_limiter):
+        lines.append(f'admission_waiting{{class="{limiter.name}"}} {limiter.waiting}')
+
+    cache = note_cache.stats()
+    lines += ["# HELP note_cache_events_total Note cache lookups and evictions", "# TYPE note_cache_events_total counter"]
+    for name in ("hits", "misses", "evictions"):
+        lines.append(f'note_cache_events_total{{event="{name}"}} {cache[name]}')
+
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
@@ -1,37 +1,309 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from typing import Optional
+import orjson
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 # from app.schemas.schemas  import NoteCreate, NoteUpdate, NoteOut
-from app.services import notes_service
-from app.db.session import get_db
+from app.services import (
+    changes_service, graph_service, notes_service, search_service, similarity, stats_service, write_coalescer,
+)
+from app.db.session import get_db, get_read_db
+from app.core.config import settings
+from app.services.pagination import decode_change_token, decode_cursor, encode_change_token, encode_cursor
+from app.api.etag import make_etag, etag_matches
+from app.api.routing import ProfiledRoute
+from app.core.profiling import profiled
 
 from app.schemas.notes import (
     NoteCreate, 
     NoteUpdate,
-    NoteResponse
+    NoteBatchUpdate,
+    NoteResponse,
+    NoteBatchResponse,
+    NoteSearchHit,
+    NotePartialResponse,
+    NoteChangesResponse,
+    NoteNeighborhoodResponse,
+    NoteSimilarHit,
+    NoteStatsResponse,
 )
 
 router = APIRouter(
     prefix="/notes", 
     tags=["Notes"],
+    route_class=ProfiledRoute,
 )
 
-@router.get("/", response_model=list[NoteResponse])
-def read_notes(db: Session= Depends(get_db)):
-    return notes_service.get_all_notes(db)
+def conditional_json(request: Request, body: bytes, headers: Optional[dict] = None) -> Response:
+    """JSON response with a strong ETag; 304 without a body if the client already has it."""
+    etag = make_etag(body)
+    headers = {**(headers or {}), "ETag": etag}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+INCLUDABLE_RELATIONS = {"links", "media"}
+INCLUDE_DESCRIPTION = "Comma-separated relations to embed: links,media"
+
+def parse_include(include: Optional[str]) -> set[str]:
+    if not include:
+        return set()
+    requested = {part.strip() for part in include.split(",") if part.strip()}
+    unknown = requested - INCLUDABLE_RELATIONS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown include: {', '.join(sorted(unknown))}")
+    return requested
+
+FIELDS_DESCRIPTION = "Comma-separated note fields to return: id,title,content,user_id (id is always included)"
+
+def parse_fields(fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    """
+    Requested note fields in column order, id first. None means every field, so
+    callers keep their full-row (and cached) paths.
+    """
+    if not fields:
+        return None
+    requested = {part.strip() for part in fields.split(",") if part.strip()}
+    unknown = requested - notes_service.NOTE_FIELDS.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    if requested == notes_service.NOTE_FIELDS.keys():
+        return None
+    return tuple(field for field in notes_service.NOTE_FIELDS if field in requested)
+
+def note_to_dict(note, include=(), fields=None) -> dict:
+    """
+    Serialize a note plus only the relations named in include. Relations are
+    read explicitly (never via from_attributes on the whole note) so an
+    un-requested relationship is never lazy-loaded; likewise only the columns
+    in fields are read, since the others were deferred by the query.
+    """
+    if fields:
+        data = {field: getattr(note, field) for field in fields}
+    else:
+        data = {"id": note.id, "title": note.title, "content": note.content, "user_id": note.user_id}
+    if "links" in include:
+        data["links"] = [{"id": link.id, "url": link.url} for link in note.links]
+    if "media" in include:
+        data["media"] = [
+            {"id": media.id, "file_path": media.file_path, "size": media.size,
+             "sha256": media.sha256, "mime_type": media.mime_type}
+            for media in note.media
+        ]
+    return data
+
+def list_notes(
+    request: Request,
+    db: Session,
+    limit: int,
+    after: Optional[str],
+    include: Optional[str],
+    user_id: Optional[int] = None,
+    fields: Optional[str] = None,
+) -> Response:
+    """Shared by GET /notes/ and GET /users/{user_id}/notes."""
+    relations = parse_include(include)
+    columns = parse_fields(fields)
+    try:
+        after_id = decode_cursor(after) if after else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if relations:
+        notes, next_id = notes_service.get_notes_page(
+            db, limit=limit, after_id=after_id, include=relations, user_id=user_id, fields=columns
+        )
+        body = orjson.dumps([note_to_dict(note, relations, columns) for note in notes])
+    else:
+        # Fast path: column tuples -> dicts -> orjson, no ORM objects and no
+        # per-row Pydantic validation (the columns already match NoteResponse)
+        rows, next_id = notes_service.get_note_rows_page(
+            db, limit=limit, after_id=after_id, user_id=user_id, fields=columns
+        )
+        body = orjson.dumps(notes_service.rows_to_dicts(rows, columns))
+    # The body stays a plain list; the cursor for the next page travels in a header
+    headers = {"X-Next-Cursor": encode_cursor(next_id)} if next_id is not None else None
+    return conditional_json(request, body, headers)
+
+@router.get("/", response_model=list[NotePartialResponse], response_model_exclude_unset=True)
+def read_notes(
+    request: Request,
+    limit: int = Query(settings.NOTES_PAGE_DEFAULT_LIMIT, ge=1, le=settings.NOTES_PAGE_MAX_LIMIT),
+    after: Optional[str] = Query(None, description="Opaque cursor taken from the X-Next-Cursor header"),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    user_id: Optional[int] = Query(None, description="Only notes owned by this user"),
+    db: Session = Depends(get_read_db),
+):
+    return list_notes(request, db, limit, after, include, user_id, fields)
+
+@router.get("/export")
+def export_notes(
+    since_id: Optional[int] = Query(None, ge=0, description="Resume after this note id"),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    db: Session = Depends(get_read_db),
+):
+    """Stream all notes as newline-delimited JSON, ordered by id."""
+    relations = parse_include(include)
 
-@router.get("/{note_id}", response_model=NoteResponse)
-def read_note(note_id:int, db:Session=Depends(get_db)):
-    note = notes_service.get_note_by_id(db, note_id)
-    if not note:
+    def generate(batch_size: int = 100):
+        lines = []
+        for note in notes_service.iter_notes_for_export(db, since_id=since_id, include=relations):
+            lines.append(orjson.dumps(note_to_dict(note, relations)) + b"\n")
+            if len(lines) >= batch_size:
+                yield b"".join(lines)
+                lines = []
+        if lines:
+            yield b"".join(lines)
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@router.get("/changes", response_model=NoteChangesResponse)
+def read_changes(
+    since: Optional[str] = Query(None, description="Token from the previous response's next; omit for a full sync"),
+    limit: int = Query(settings.NOTES_PAGE_DEFAULT_LIMIT, ge=1, le=settings.NOTES_PAGE_MAX_LIMIT),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Notes created, updated or deleted after the since token, oldest change first.
+    Each note appears at most once, with its current body; deleted notes appear
+    as tombstones. Keep calling with next while has_more is true.
+    """
+    try:
+        position = decode_change_token(since) if since else (0, 0)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    rows, has_more = changes_service.get_changes(db, since=position, limit=limit)
+    changes = []
+    for txid, seq, changed_id, op, note_id, title, content, user_id in rows:
+        note = None
+        if op == "upsert" and note_id is not None:
+            note = {"id": note_id, "title": title, "content": content, "user_id": user_id}
+        changes.append({"id": changed_id, "op": op, "note": note})
+    # An empty page hands the same token back
+    if rows:
+        position = (rows[-1].txid, rows[-1].seq)
+    body = orjson.dumps({"changes": changes, "next": encode_change_token(*position), "has_more": has_more})
+    return Response(content=body, media_type="application/json")
+
+@router.get("/search", response_model=list[NoteSearchHit])
+def search_notes(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms"),
+    limit: int = Query(20, ge=1, le=settings.NOTES_PAGE_MAX_LIMIT),
+    offset: int = Query(0, ge=0, le=10000),
+    db: Session = Depends(get_read_db),
+):
+    """Ranked full-text search over note titles and content."""
+    return search_service.search_notes(db, q, limit=limit, offset=offset)
+
+# Batch routes are declared before /{note_id} so "batch" is not parsed as an id
+@router.post("/batch", response_model=NoteBatchResponse)
+def create_notes_batch(
+    notes: list[NoteCreate] = Body(..., min_length=1, max_length=settings.NOTES_BATCH_MAX_SIZE),
+    db: Session = Depends(get_db),
+):
+    return {"results": notes_service.create_notes_batch(db, notes)}
+
+@router.patch("/batch", response_model=NoteBatchResponse)
+def update_notes_batch(
+    notes: list[NoteBatchUpdate] = Body(..., min_length=1, max_length=settings.NOTES_BATCH_MAX_SIZE),
+    db: Session = Depends(get_db),
+):
+    return {"results": notes_service.update_notes_batch(db, notes)}
+
+@router.delete("/batch", response_model=NoteBatchResponse)
+def delete_notes_batch(
+    note_ids: list[int] = Body(..., min_length=1, max_length=settings.NOTES_BATCH_MAX_SIZE),
+    db: Session = Depends(get_db),
+):
+    return {"results": notes_service.delete_notes_batch(db, note_ids)}
+
+@router.get("/{note_id}", response_model=NotePartialResponse, response_model_exclude_unset=True)
+def read_note(
+    note_id:int,
+    request: Request,
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db:Session=Depends(get_read_db),
+):
+    relations = parse_include(include)
+    columns = parse_fields(fields)
+    if relations or columns:
+        # Expanded and sparse reads bypass the cache, which only holds the plain NoteResponse
+        note = notes_service.get_note_by_id(db, note_id, include=relations, fields=columns)
+        body = orjson.dumps(note_to_dict(note, relations, columns)) if note else None
+    else:
+        body = notes_service.get_note_json(db, note_id)
+    if body is None:
         raise HTTPException(status_code = 404, detail="Note not found")
-    return note
+    return conditional_json(request, body)
+
+@router.get("/{note_id}/stats", response_model=NoteStatsResponse)
+def read_note_stats(note_id: int, db: Session = Depends(get_read_db)):
+    """Link, media and backlink counts, read from the note_stats counters."""
+    stats = stats_service.get_note_stats(db, note_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Note not found")
+    return stats
+
+@router.get("/{note_id}/similar", response_model=list[NoteSimilarHit])
+def read_similar_notes(
+    note_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    threshold: float = Query(settings.SIMILARITY_THRESHOLD, ge=0.1, le=1.0, description="Minimum estimated similarity"),
+    db: Session = Depends(get_read_db),
+):
+    """Near-duplicates of this note by content, most similar first."""
+    if not notes_service.note_exists(db, note_id):
+        raise HTTPException(status_code=404, detail="Note not found")
+    hits = similarity.find_similar(
+        db, note_id, limit=limit, threshold=threshold, max_candidates=settings.SIMILARITY_MAX_CANDIDATES
+    )
+    return [{"id": hit_id, "title": title, "similarity": round(score, 3)} for hit_id, title, score in hits]
+
+@router.get("/{note_id}/backlinks", response_model=list[NoteResponse])
+def read_backlinks(
+    note_id: int,
+    limit: int = Query(settings.NOTES_PAGE_DEFAULT_LIMIT, ge=1, le=settings.NOTES_PAGE_MAX_LIMIT),
+    db: Session = Depends(get_read_db),
+):
+    """Notes whose content references this note with [[id]] or [[title]]."""
+    if not notes_service.note_exists(db, note_id):
+        raise HTTPException(status_code=404, detail="Note not found")
+    rows = graph_service.get_backlinks(db, note_id, limit=limit)
+    return Response(content=orjson.dumps(notes_service.rows_to_dicts(rows)), media_type="application/json")
+
+@router.get("/{note_id}/neighborhood", response_model=NoteNeighborhoodResponse)
+def read_neighborhood(
+    note_id: int,
+    depth: int = Query(1, ge=1, le=settings.NOTE_GRAPH_MAX_DEPTH),
+    direction: str = Query("both", pattern="^(out|in|both)$", description="Follow links out, backlinks in, or both"),
+    db: Session = Depends(get_read_db),
+):
+    """Notes within depth link hops of this note and the links between them."""
+    if not notes_service.note_exists(db, note_id):
+        raise HTTPException(status_code=404, detail="Note not found")
+    nodes, edges, truncated = graph_service.get_neighborhood(
+        db, note_id, depth=depth, direction=direction, max_nodes=settings.NOTE_GRAPH_MAX_NODES
+    )
+    return {
+        "root": note_id,
+        "nodes": [dict(node._mapping) for node in nodes],
+        "edges": [dict(edge._mapping) for edge in edges],
+        "truncated": truncated,
+    }
 
 @router.post("/", response_model=NoteResponse)
-def create_note(note: NoteCreate, db:Session =Depends(get_db)):
-    
-    return notes_service.create_note(db, note)
-    
+async def create_note(note: NoteCreate, db:Session =Depends(get_db)):
+    # Async so that, with write coalescing on, waiting for the group commit
+    # doesn't hold a threadpool thread per request
+    if write_coalescer.note_writer is not None:
+        return await asyncio.wrap_future(write_coalescer.note_writer.submit(note))
+    return await run_in_threadpool(profiled(notes_service.create_note), db, note)
+
 
 @router.put("/{note_id}", response_model=NoteResponse)
 def update_note(note_id: int, note: NoteUpdate, db:Session=Depends(get_db)):
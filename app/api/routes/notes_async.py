@@ -0,0 +1,106 @@
+import asyncio
+from typing import Optional
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services import notes_service, notes_service_async, write_coalescer
+from app.db.session import get_async_db
+from app.core.config import settings
+from app.services.pagination import encode_cursor, decode_cursor
+from app.api.routes.notes import (
+    FIELDS_DESCRIPTION,
+    INCLUDE_DESCRIPTION,
+    conditional_json,
+    note_to_dict,
+    parse_fields,
+    parse_include,
+)
+from app.api.routing import ProfiledRoute
+
+from app.schemas.notes import (
+    NoteCreate,
+    NoteUpdate,
+    NoteResponse,
+    NotePartialResponse,
+)
+
+# Async versions of the CRUD routes in notes.py, mounted ahead of notes.router when
+# settings.DB_ASYNC is on. Paths use the int convertor so non-numeric paths such as
+# /notes/export or /notes/search fall through to the sync router.
+router = APIRouter(
+    prefix="/notes",
+    tags=["Notes"],
+    route_class=ProfiledRoute,
+)
+
+@router.get("/", response_model=list[NotePartialResponse], response_model_exclude_unset=True)
+async def read_notes(
+    request: Request,
+    limit: int = Query(settings.NOTES_PAGE_DEFAULT_LIMIT, ge=1, le=settings.NOTES_PAGE_MAX_LIMIT),
+    after: Optional[str] = Query(None, description="Opaque cursor taken from the X-Next-Cursor header"),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    user_id: Optional[int] = Query(None, description="Only notes owned by this user"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    relations = parse_include(include)
+    columns = parse_fields(fields)
+    try:
+        after_id = decode_cursor(after) if after else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if relations:
+        notes, next_id = await notes_service_async.get_notes_page(
+            db, limit=limit, after_id=after_id, include=relations, user_id=user_id, fields=columns
+        )
+        body = orjson.dumps([note_to_dict(note, relations, columns) for note in notes])
+    else:
+        rows, next_id = await notes_service_async.get_note_rows_page(
+            db, limit=limit, after_id=after_id, user_id=user_id, fields=columns
+        )
+        body = orjson.dumps(notes_service.rows_to_dicts(rows, columns))
+    headers = {"X-Next-Cursor": encode_cursor(next_id)} if next_id is not None else None
+    return conditional_json(request, body, headers)
+
+@router.get("/{note_id:int}", response_model=NotePartialResponse, response_model_exclude_unset=True)
+async def read_note(
+    note_id: int,
+    request: Request,
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+):
+    relations = parse_include(include)
+    columns = parse_fields(fields)
+    if relations or columns:
+        note = await notes_service_async.get_note_by_id(db, note_id, include=relations, fields=columns)
+        body = orjson.dumps(note_to_dict(note, relations, columns)) if note else None
+    else:
+        body = await notes_service_async.get_note_json(db, note_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Note not found")
+    return conditional_json(request, body)
+
+@router.post("/", response_model=NoteResponse)
+async def create_note(note: NoteCreate, db: AsyncSession = Depends(get_async_db)):
+    if write_coalescer.note_writer is not None:
+        return await asyncio.wrap_future(write_coalescer.note_writer.submit(note))
+    return await notes_service_async.create_note(db, note)
+
+@router.put("/{note_id:int}", response_model=NoteResponse)
+async def update_note(note_id: int, note: NoteUpdate, db: AsyncSession = Depends(get_async_db)):
+    try:
+        updated = await notes_service_async.update_note(db, note_id, note)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not updated:
+        raise HTTPException(status_code=404, detail="Note not found")
+    return updated
+
+@router.delete("/{note_id:int}", response_model=NoteResponse)
+async def delete_note(note_id: int, db: AsyncSession = Depends(get_async_db)):
+    deleted = await notes_service_async.delete_note(db, note_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Note not found")
+    return deleted
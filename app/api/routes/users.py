@@ -0,0 +1,40 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+
+from app.services import notes_service, stats_service
+from app.db.session import get_read_db
+from app.core.config import settings
+from app.api.routes.notes import FIELDS_DESCRIPTION, INCLUDE_DESCRIPTION, list_notes
+from app.schemas.notes import NotePartialResponse, UserStatsResponse
+from app.api.routing import ProfiledRoute
+
+router = APIRouter(
+    prefix="/users",
+    tags=["Users"],
+    route_class=ProfiledRoute,
+)
+
+@router.get("/{user_id}/notes", response_model=list[NotePartialResponse], response_model_exclude_unset=True)
+def read_user_notes(
+    user_id: int,
+    request: Request,
+    limit: int = Query(settings.NOTES_PAGE_DEFAULT_LIMIT, ge=1, le=settings.NOTES_PAGE_MAX_LIMIT),
+    after: Optional[str] = Query(None, description="Opaque cursor taken from the X-Next-Cursor header"),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_read_db),
+):
+    """A user's notes ordered by id, paginated like GET /notes/."""
+    # An unknown user is a 404 rather than an empty page
+    if not notes_service.user_exists(db, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    return list_notes(request, db, limit, after, include, user_id=user_id, fields=fields)
+
+@router.get("/{user_id}/stats", response_model=UserStatsResponse)
+def read_user_stats(user_id: int, db: Session = Depends(get_read_db)):
+    """Note count for a user, read from the user_stats counters."""
+    stats = stats_service.get_user_stats(db, user_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return stats
@@ -0,0 +1,19 @@
+import asyncio
+
+from fastapi.routing import APIRoute
+
+from app.core.profiling import profiled
+
+
+class ProfiledRoute(APIRoute):
+    """
+    Route class for the API routers. Sync endpoints run on a threadpool thread,
+    out of the profiling middleware's sight, so they are wrapped with `profiled`
+    to be sampled there too. Async endpoints run inside the middleware's frame on
+    the event loop and are left alone.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if not asyncio.iscoroutinefunction(endpoint):
+            endpoint = profiled(endpoint)
+        super().__init__(path, endpoint, **kwargs)
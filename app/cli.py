@@ -0,0 +1,62 @@
+"""
+Maintenance commands, run against DATABASE_URL:
+
+    python -m app.cli rebuild-links       # recompute note_edges from note content
+    python -m app.cli rebuild-stats       # recompute user_stats / note_stats counters
+    python -m app.cli rebuild-similarity  # recompute MinHash signatures and LSH buckets (process pool)
+    python -m app.cli find-duplicates     # group near-duplicate notes from the stored signatures
+"""
+import argparse
+import json
+import time
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services import note_links, similarity, stats_service
+
+
+def rebuild_links() -> dict:
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        edges = note_links.rebuild_links(db)
+    return {"edges": edges, "seconds": round(time.perf_counter() - started, 3)}
+
+
+def rebuild_stats() -> dict:
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        counts = stats_service.rebuild_stats(db)
+    return {**counts, "seconds": round(time.perf_counter() - started, 3)}
+
+
+def rebuild_similarity() -> dict:
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        indexed = similarity.rebuild_signatures(db)
+    return {"notes": indexed, "seconds": round(time.perf_counter() - started, 3)}
+
+
+def find_duplicates() -> dict:
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        result = similarity.find_duplicates(db, threshold=settings.SIMILARITY_THRESHOLD)
+    return {**result, "seconds": round(time.perf_counter() - started, 3)}
+
+
+COMMANDS = {
+    "rebuild-links": rebuild_links,
+    "rebuild-stats": rebuild_stats,
+    "rebuild-similarity": rebuild_similarity,
+    "find-duplicates": find_duplicates,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+    print(json.dumps({args.command: COMMANDS[args.command]()}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import asyncio
+import math
+from collections import deque
+
+from app.core.config import settings
+
+
+class AdmissionLimiter:
+    """
+    Bounded concurrency with a short FIFO queue, for one class of requests.
+
+    At most `concurrency` requests run at once and up to `max_queue` more wait for
+    a slot. A request is refused up front when the queue is full or when the
+    estimated wait (queue position x average service time / concurrency) already
+    exceeds `max_wait_seconds`, and refused after waiting that long. Refusing
+    early is the point: a fast 503 beats a 30 second pool timeout.
+    Used from the event loop only, so the counters need no lock.
+    """
+
+    # Weight of the newest sample in the service time average
+    SMOOTHING = 0.2
+
+    def __init__(self, name: str, concurrency: int, max_queue: int, max_wait_seconds: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.in_flight = 0
+        self.avg_service_seconds = 0.0
+        self._waiters: "deque[asyncio.Future]" = deque()
+        self.admitted = 0
+        self.rejected = {"queue_full": 0, "deadline": 0, "timeout": 0}
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def estimated_wait(self) -> float:
+        """Expected seconds until a request joining the queue now gets a slot."""
+        return (self.waiting + 1) * self.avg_service_seconds / self.concurrency
+
+    def retry_after(self) -> int:
+        """Seconds to suggest in Retry-After: the current queue's drain time, at least 1."""
+        return max(1, math.ceil(self.estimated_wait()))
+
+    async def acquire(self) -> bool:
+        """Wait for a slot; False means the request should be shed."""
+        if self.in_flight < self.concurrency and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if self.waiting >= self.max_queue:
+            self.rejected["queue_full"] += 1
+            return False
+        if self.estimated_wait() > self.max_wait_seconds:
+            self.rejected["deadline"] += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            self._remove(waiter)
+            self.rejected["timeout"] += 1
+            return False
+        except asyncio.CancelledError:
+            # Client went away; hand back a slot we may have been given meanwhile
+            self._remove(waiter)
+            if waiter.done() and not waiter.cancelled():
+                self.release(0.0)
+            raise
+        self.admitted += 1
+        return True
+
+    def release(self, service_seconds: float) -> None:
+        """Free a slot, passing it straight to the oldest waiter if there is one."""
+        if service_seconds:
+            self.avg_service_seconds += self.SMOOTHING * (service_seconds - self.avg_service_seconds)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.in_flight -= 1
+
+    def _remove(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait_seconds,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "avg_service_ms": round(self.avg_service_seconds * 1000, 2),
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+        }
+
+
+def _limiter(name: str, concurrency: int) -> AdmissionLimiter:
+    return AdmissionLimiter(
+        name,
+        concurrency=concurrency,
+        max_queue=settings.ADMISSION_QUEUE_SIZE,
+        max_wait_seconds=settings.ADMISSION_MAX_WAIT_MS / 1000,
+    )
+
+# Separate budgets so a burst of writes can't starve reads, and vice versa, and
+# slow media uploads can't take every write slot
+read_limiter = _limiter("read", settings.ADMISSION_READ_CONCURRENCY)
+write_limiter = _limiter("write", settings.ADMISSION_WRITE_CONCURRENCY)
+upload_limiter = _limiter("upload", settings.ADMISSION_UPLOAD_CONCURRENCY)
@@ -1,8 +1,116 @@
 import os
+from typing import Optional
 
 class Settings:
     APP_NAME: str = "Knowledge Base API"
     DATABASE_URL: str = os.getenv("DATABASE_URL", "postgresql://user:mysecretpassword@db:5432/kb_db")
 
-settings = Settings()
+    # Connection pool (ignored for in-memory SQLite)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds, -1 disables
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+    # Admission control: at most ADMISSION_*_CONCURRENCY reads / writes run at once
+    # and up to ADMISSION_QUEUE_SIZE more of each wait, for no longer than
+    # ADMISSION_MAX_WAIT_MS. Anything beyond that gets 503 with Retry-After
+    # instead of queueing on the pool for DB_POOL_TIMEOUT. On by default.
+    # Media uploads have their own ADMISSION_UPLOAD_CONCURRENCY budget: they hold
+    # a slot for the whole body transfer but no pool connection while streaming.
+    ADMISSION_CONTROL: bool = os.getenv("ADMISSION_CONTROL", "true").lower() in ("1", "true", "yes")
+    ADMISSION_READ_CONCURRENCY: int = int(os.getenv("ADMISSION_READ_CONCURRENCY", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+    ADMISSION_WRITE_CONCURRENCY: int = int(os.getenv("ADMISSION_WRITE_CONCURRENCY", str(DB_POOL_SIZE)))
+    ADMISSION_UPLOAD_CONCURRENCY: int = int(os.getenv("ADMISSION_UPLOAD_CONCURRENCY", "16"))
+    ADMISSION_QUEUE_SIZE: int = int(os.getenv("ADMISSION_QUEUE_SIZE", "64"))
+    ADMISSION_MAX_WAIT_MS: float = float(os.getenv("ADMISSION_MAX_WAIT_MS", "2000"))
+    # GET /health/ready reports "degraded" (503) at this share of pool connections
+    # checked out, or once an admission queue is this full. A few queued requests
+    # are a burst the queue is there to absorb, not a reason to leave the rotation.
+    HEALTH_DEGRADED_POOL_RATIO: float = float(os.getenv("HEALTH_DEGRADED_POOL_RATIO", "0.9"))
+    HEALTH_DEGRADED_QUEUE_RATIO: float = float(os.getenv("HEALTH_DEGRADED_QUEUE_RATIO", "0.9"))
+
+    # Startup: set DB_CREATE_ALL=false once Alembic manages the schema
+    DB_CREATE_ALL: bool = os.getenv("DB_CREATE_ALL", "true").lower() in ("1", "true", "yes")
+    # Off in workers started by app.serve, which initializes the database once up front
+    DB_INIT_ON_STARTUP: bool = os.getenv("DB_INIT_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+    DB_CONNECT_RETRIES: int = int(os.getenv("DB_CONNECT_RETRIES", "5"))
+    DB_CONNECT_BACKOFF: float = float(os.getenv("DB_CONNECT_BACKOFF", "0.5"))
+    STARTUP_BUDGET_SECONDS: float = float(os.getenv("STARTUP_BUDGET_SECONDS", "2.0"))
+
+    # Serving via `python -m app.serve`: WEB_WORKERS forked worker processes share
+    # one listening socket; WEB_PRELOAD imports the app in the master before forking.
+    # On SIGTERM workers get WEB_GRACEFUL_TIMEOUT seconds to finish in-flight requests.
+    WEB_WORKERS: int = int(os.getenv("WEB_WORKERS", "1"))
+    WEB_PRELOAD: bool = os.getenv("WEB_PRELOAD", "false").lower() in ("1", "true", "yes")
+    WEB_GRACEFUL_TIMEOUT: float = float(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+    # Set by app.serve in each forked worker (0 .. WEB_WORKERS-1); None when the app
+    # runs in a single process. Metrics and /internal stats are per worker.
+    WEB_WORKER_ID: Optional[int] = None
+
+    # Request instrumentation: log requests slower or chattier than this
+    SLOW_REQUEST_MS: float = float(os.getenv("SLOW_REQUEST_MS", "500"))
+    MAX_QUERIES_PER_REQUEST: int = int(os.getenv("MAX_QUERIES_PER_REQUEST", "20"))
+
+    # On-demand profiling (off by default). When on, a request carrying the
+    # X-Profile-Token header with PROFILING_TOKEN, or picked at PROFILING_SAMPLE_RATE,
+    # is stack-sampled every PROFILING_INTERVAL_MS; the last PROFILING_MAX_PROFILES
+    # results are served under /internal/profiles.
+    PROFILING: bool = os.getenv("PROFILING", "false").lower() in ("1", "true", "yes")
+    PROFILING_TOKEN: str = os.getenv("PROFILING_TOKEN", "")
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    PROFILING_INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+    PROFILING_MAX_PROFILES: int = int(os.getenv("PROFILING_MAX_PROFILES", "50"))
+    PROFILING_TOP_N: int = int(os.getenv("PROFILING_TOP_N", "20"))
+
+    # Serve the notes CRUD routes from async handlers on an AsyncEngine
+    # (asyncpg / aiosqlite). ASYNC_DATABASE_URL defaults to DATABASE_URL with
+    # the driver swapped for its async counterpart.
+    DB_ASYNC: bool = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+
+    # Read replicas (comma-separated URLs). Read-only routes use them round-robin;
+    # a replica that fails is skipped for REPLICA_RETRY_SECONDS, and a client that
+    # just wrote is pinned to the primary for READ_YOUR_WRITES_SECONDS.
+    DATABASE_REPLICA_URLS: list[str] = [
+        url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+    ]
+    REPLICA_RETRY_SECONDS: float = float(os.getenv("REPLICA_RETRY_SECONDS", "10"))
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
 
+    # Keyset pagination for GET /notes/
+    NOTES_PAGE_DEFAULT_LIMIT: int = int(os.getenv("NOTES_PAGE_DEFAULT_LIMIT", "100"))
+    NOTES_PAGE_MAX_LIMIT: int = int(os.getenv("NOTES_PAGE_MAX_LIMIT", "1000"))
+
+    # Maximum number of items accepted by the /notes/batch endpoints
+    NOTES_BATCH_MAX_SIZE: int = int(os.getenv("NOTES_BATCH_MAX_SIZE", "1000"))
+
+    # Group commit for POST /notes/: concurrent creates are gathered for up to
+    # NOTES_COALESCE_WINDOW_MS (or NOTES_COALESCE_MAX_BATCH items) and inserted
+    # in one transaction
+    NOTES_WRITE_COALESCING: bool = os.getenv("NOTES_WRITE_COALESCING", "false").lower() in ("1", "true", "yes")
+    NOTES_COALESCE_WINDOW_MS: float = float(os.getenv("NOTES_COALESCE_WINDOW_MS", "2"))
+    NOTES_COALESCE_MAX_BATCH: int = int(os.getenv("NOTES_COALESCE_MAX_BATCH", "256"))
+
+    # Bounds for GET /notes/{id}/neighborhood
+    NOTE_GRAPH_MAX_DEPTH: int = int(os.getenv("NOTE_GRAPH_MAX_DEPTH", "3"))
+    NOTE_GRAPH_MAX_NODES: int = int(os.getenv("NOTE_GRAPH_MAX_NODES", "500"))
+
+    # Near-duplicate detection: notes whose estimated Jaccard similarity (MinHash)
+    # reaches SIMILARITY_THRESHOLD. At most SIMILARITY_MAX_CANDIDATES LSH candidates
+    # are scored per lookup; the batch jobs use SIMILARITY_WORKERS processes (0 = one per CPU).
+    SIMILARITY_THRESHOLD: float = float(os.getenv("SIMILARITY_THRESHOLD", "0.8"))
+    SIMILARITY_MAX_CANDIDATES: int = int(os.getenv("SIMILARITY_MAX_CANDIDATES", "500"))
+    SIMILARITY_WORKERS: int = int(os.getenv("SIMILARITY_WORKERS", "0"))
+
+    # Read-through cache for single-note reads (0 entries disables it)
+    NOTE_CACHE_MAX_ENTRIES: int = int(os.getenv("NOTE_CACHE_MAX_ENTRIES", "10000"))
+    NOTE_CACHE_TTL_SECONDS: float = float(os.getenv("NOTE_CACHE_TTL_SECONDS", "60"))
+
+    # Media blobs: content-addressed files under MEDIA_ROOT, streamed in MEDIA_CHUNK_SIZE pieces
+    MEDIA_ROOT: str = os.getenv("MEDIA_ROOT", "./media")
+    MEDIA_CHUNK_SIZE: int = int(os.getenv("MEDIA_CHUNK_SIZE", str(64 * 1024)))
+    MEDIA_MAX_BYTES: int = int(os.getenv("MEDIA_MAX_BYTES", str(100 * 1024 * 1024)))
+    MEDIA_CACHE_MAX_AGE: int = int(os.getenv("MEDIA_CACHE_MAX_AGE", "31536000"))  # blobs are immutable
+
+settings = Settings()
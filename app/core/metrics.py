@@ -0,0 +1,128 @@
+import bisect
+import os
+import threading
+from contextvars import ContextVar
+from typing import Optional
+
+from app.core.config import settings
+
+# Latency buckets in seconds (upper bounds), Prometheus-style
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def worker_info() -> dict:
+    """The process that answered. Under app.serve every worker keeps its own stats."""
+    return {"worker": settings.WEB_WORKER_ID, "pid": os.getpid()}
+
+
+class Histogram:
+    """Thread-safe fixed-bucket histogram."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        """Cumulative bucket counts keyed by upper bound, plus count and sum."""
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative, running = {}, 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            running += bucket_count
+            cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+        return {"buckets": cumulative, "count": count, "sum": total}
+
+
+class RequestStats:
+    """Per-request database activity, collected by the engine's cursor hooks."""
+
+    MAX_STATEMENTS = 50
+
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.statements: list[str] = []
+        self.statement_seconds: list[float] = []
+
+    def record_query(self, statement: str, seconds: float) -> None:
+        self.query_count += 1
+        self.db_time += seconds
+        if len(self.statements) < self.MAX_STATEMENTS:
+            self.statements.append(statement)
+            self.statement_seconds.append(seconds)
+
+
+# Set by RequestMetricsMiddleware for the duration of each request. Sync handlers
+# run in the threadpool with a copy of the context, so they see the same object.
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class RouteMetrics:
+    """Latency, query-count and DB-time histograms keyed by method and route template."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.queries: dict[tuple[str, str], Histogram] = {}
+        self.db_time: dict[tuple[str, str], Histogram] = {}
+        self.responses: dict[tuple[str, str, int], int] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        key = (method, route)
+        with self._lock:
+            if key not in self.latency:
+                self.latency[key] = Histogram()
+                self.queries[key] = Histogram(QUERY_COUNT_BUCKETS)
+                self.db_time[key] = Histogram()
+            self.responses[(method, route, status)] = self.responses.get((method, route, status), 0) + 1
+        self.latency[key].observe(seconds)
+        self.queries[key].observe(stats.query_count)
+        self.db_time[key].observe(stats.db_time)
+
+    def render(self) -> list[str]:
+        lines = []
+        with self._lock:
+            responses = dict(self.responses)
+            histograms = [
+                ("http_request_duration_seconds", "Request latency", dict(self.latency)),
+                ("http_request_db_queries", "SQL statements per request", dict(self.queries)),
+                ("http_request_db_seconds", "Time spent in SQL per request", dict(self.db_time)),
+            ]
+        lines += ["# HELP http_requests_total Requests by route and status", "# TYPE http_requests_total counter"]
+        for (method, route, status), count in sorted(responses.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+        for name, help_text, by_route in histograms:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (method, route), histogram in sorted(by_route.items()):
+                lines += render_histogram(name, histogram.snapshot(), {"method": method, "route": route})
+        return lines
+
+
+def _labels(labels: dict) -> str:
+    return ",".join(f'{key}="{value}"' for key, value in labels.items())
+
+
+def render_histogram(name: str, snapshot: dict, labels: dict) -> list[str]:
+    """Prometheus text exposition lines for one histogram snapshot."""
+    base = _labels(labels)
+    sep = "," if base else ""
+    lines = [f'{name}_bucket{{{base}{sep}le="{bound}"}} {count}' for bound, count in snapshot["buckets"].items()]
+    lines.append(f"{name}_sum{{{base}}} {snapshot['sum']}")
+    lines.append(f"{name}_count{{{base}}} {snapshot['count']}")
+    return lines
+
+
+request_metrics = RouteMetrics()
@@ -0,0 +1,224 @@
+import functools
+import hmac
+import itertools
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Optional
+
+from app.core.config import settings
+
+
+class RequestProfile:
+    """
+    Stack samples of one request. A target is a (thread, frame) pair: while that
+    frame is on the thread's stack the thread is working for this request, and the
+    stack from the frame up is recorded. The middleware adds its own frame on the
+    event loop thread; `profiled` adds the handler's frame on a threadpool thread.
+    Stacks are kept collapsed ("a;b;c" -> samples), the format flamegraph.pl and
+    speedscope read.
+    """
+
+    def __init__(self, method: str, path: str, interval: float):
+        self.method = method
+        self.path = path
+        self.interval = interval
+        self.started_at = time.time()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        # Ticks can be further apart than the interval (the sampler waits for the
+        # GIL), so milliseconds are derived from the measured time between ticks
+        self.ticks = 0
+        self.tick_seconds = 0.0
+        self._targets: dict[int, list] = {}  # thread id -> marker frames
+        self._lock = threading.Lock()
+
+    def add_target(self, thread_id: int, frame) -> None:
+        with self._lock:
+            self._targets.setdefault(thread_id, []).append(frame)
+
+    def remove_target(self, thread_id: int, frame) -> None:
+        with self._lock:
+            frames = self._targets.get(thread_id, [])
+            if frame in frames:
+                frames.remove(frame)
+            if not frames:
+                self._targets.pop(thread_id, None)
+
+    def seconds_per_sample(self) -> float:
+        return self.tick_seconds / self.ticks if self.ticks else self.interval
+
+    def sample(self, current_frames: dict, elapsed: float) -> None:
+        self.ticks += 1
+        self.tick_seconds += elapsed
+        with self._lock:
+            targets = [(thread_id, list(frames)) for thread_id, frames in self._targets.items()]
+        for thread_id, markers in targets:
+            frame = current_frames.get(thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame))
+                if any(frame is marker for marker in markers):
+                    # Root first, as collapsed stacks are written
+                    self.stacks[";".join(reversed(stack))] += 1
+                    self.samples += 1
+                    break
+                frame = frame.f_back
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}"
+
+
+class Sampler:
+    """
+    One daemon thread that samples every active profile each interval. It runs
+    only while some request is being profiled, so an idle profiler costs nothing.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._active: set[RequestProfile] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._active.add(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+
+    def stop(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._active.discard(profile)
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while True:
+            with self._lock:
+                active = list(self._active)
+                if not active:
+                    self._thread = None
+                    return
+            frames = sys._current_frames()
+            now = time.perf_counter()
+            for profile in active:
+                # A profile's first tick covers at most one interval
+                profile.sample(frames, min(now - last, self.interval) if not profile.ticks else now - last)
+            last = now
+            # Drop the references before sleeping so finished frames can be freed
+            del frames
+            time.sleep(self.interval)
+
+
+class ProfileStore:
+    """The most recent finished profiles, newest last."""
+
+    def __init__(self, max_profiles: int):
+        self._profiles: deque = deque(maxlen=max_profiles)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def add(self, record: dict) -> None:
+        with self._lock:
+            self._profiles.append(record)
+
+    def get(self, profile_id: int) -> Optional[dict]:
+        with self._lock:
+            return next((record for record in self._profiles if record["id"] == profile_id), None)
+
+    def summaries(self) -> list[dict]:
+        with self._lock:
+            records = list(self._profiles)
+        return [
+            {key: record[key] for key in ("id", "method", "path", "route", "status", "started_at",
+                                          "duration_ms", "sql_ms", "query_count", "samples")}
+            for record in reversed(records)
+        ]
+
+
+def summarize(profile: RequestProfile, top_n: int) -> tuple[list[dict], list[str]]:
+    """
+    Top functions by samples and the collapsed stack lines. self counts samples
+    where the function was the innermost frame, total those where it was anywhere
+    on the stack; both are converted to milliseconds at the measured time per sample.
+    """
+    own: Counter = Counter()
+    total: Counter = Counter()
+    for stack, count in profile.stacks.items():
+        frames = stack.split(";")
+        own[frames[-1]] += count
+        for name in set(frames):
+            total[name] += count
+    interval_ms = profile.seconds_per_sample() * 1000
+    top = [
+        {"function": name, "self_ms": round(own[name] * interval_ms, 1),
+         "total_ms": round(count * interval_ms, 1), "samples": count}
+        for name, count in sorted(total.items(), key=lambda item: (-own[item[0]], -item[1], item[0]))[:top_n]
+    ]
+    collapsed = [f"{stack} {count}" for stack, count in profile.stacks.most_common()]
+    return top, collapsed
+
+
+def sql_summary(stats, top_n: int) -> list[dict]:
+    """Statements grouped by text, slowest first."""
+    if stats is None:
+        return []
+    grouped: dict[str, list] = {}
+    for statement, seconds in zip(stats.statements, stats.statement_seconds):
+        entry = grouped.setdefault(statement, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+    return [
+        {"statement": statement, "count": count, "total_ms": round(seconds * 1000, 2)}
+        for statement, (count, seconds) in sorted(grouped.items(), key=lambda item: -item[1][1])[:top_n]
+    ]
+
+
+def token_matches(token: Optional[str], expected_token: str) -> bool:
+    """An empty expected token matches nothing."""
+    # Constant time comparison, so the token can't be guessed byte by byte
+    return token is not None and bool(expected_token) and hmac.compare_digest(token, expected_token)
+
+
+def should_profile(token: Optional[str], expected_token: str, sample_rate: float) -> bool:
+    if token_matches(token, expected_token):
+        return True
+    return sample_rate > 0 and random.random() < sample_rate
+
+
+# Set by ProfilingMiddleware for the requests it profiles; threadpool calls see it
+# through their copy of the request context.
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+def profiled(func):
+    """
+    Wrap a function that runs on a threadpool thread (a sync route handler, a
+    notes_service call) so that the thread is sampled while it runs for a profiled
+    request. One ContextVar lookup otherwise.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = current_profile.get()
+        if profile is None:
+            return func(*args, **kwargs)
+        thread_id, frame = threading.get_ident(), sys._getframe()
+        profile.add_target(thread_id, frame)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.remove_target(thread_id, frame)
+    return wrapper
+
+
+profile_store = ProfileStore(settings.PROFILING_MAX_PROFILES)
+sampler = Sampler(settings.PROFILING_INTERVAL_MS / 1000)
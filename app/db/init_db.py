@@ -0,0 +1,70 @@
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.models import Base, User
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER = {"id": 1, "username": "default", "email": "default@example.com"}
+
+
+def wait_for_db(engine: Engine, retries: int, backoff: float, max_backoff: float = 10.0) -> None:
+    """Open a connection, retrying with exponential backoff while the database is unavailable."""
+    for attempt in range(retries + 1):
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return
+        except OperationalError as e:
+            if attempt == retries:
+                raise
+            delay = min(backoff * 2 ** attempt, max_backoff)
+            logger.warning("Database not reachable (attempt %d/%d): %s; retrying in %.1fs",
+                           attempt + 1, retries + 1, e.orig, delay)
+            time.sleep(delay)
+
+
+def seed_default_user(conn: Connection) -> None:
+    """Idempotently create the default user (id=1); safe to run on every start."""
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        conn.execute(postgresql.insert(User).values(**DEFAULT_USER).on_conflict_do_nothing())
+        # Explicit ids bypass the sequence; move it past the highest id so the
+        # next auto-generated user does not collide with the default one
+        conn.execute(text("SELECT setval('users_id_seq', GREATEST((SELECT MAX(id) FROM users), 1))"))
+    elif dialect == "sqlite":
+        conn.execute(sqlite.insert(User).values(**DEFAULT_USER).on_conflict_do_nothing())
+    else:
+        if conn.execute(text("SELECT 1 FROM users WHERE id = :id"), {"id": DEFAULT_USER["id"]}).first() is None:
+            conn.execute(User.__table__.insert().values(**DEFAULT_USER))
+
+
+def init_db(engine: Engine, create_all: bool = True) -> dict:
+    """
+    Prepare the database for serving: wait for it, optionally create missing tables
+    (skip when Alembic manages the schema), and seed the default user. Schema creation
+    and seeding share one transaction. Returns the duration of each phase in seconds.
+    """
+    phases = {}
+    start = time.perf_counter()
+    wait_for_db(engine, retries=settings.DB_CONNECT_RETRIES, backoff=settings.DB_CONNECT_BACKOFF)
+    phases["connect"] = time.perf_counter() - start
+
+    with engine.begin() as conn:
+        if create_all:
+            phase_start = time.perf_counter()
+            Base.metadata.create_all(bind=conn)
+            phases["create_all"] = time.perf_counter() - phase_start
+        phase_start = time.perf_counter()
+        seed_default_user(conn)
+        phases["seed"] = time.perf_counter() - phase_start
+
+    for phase, seconds in phases.items():
+        logger.info("startup phase %s took %.1f ms", phase, seconds * 1000)
+    return phases
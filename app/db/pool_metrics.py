@@ -0,0 +1,101 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+from app.core.metrics import Histogram
+
+
+class PoolMetrics:
+    """
+    Connection pool counters and latency histograms, fed by pool events. Events
+    fire on whichever thread checks a connection in or out, and `+= 1` on an
+    attribute isn't atomic, so the counters change under a lock.
+    """
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.checkout_errors = 0
+        self.connect_latency = Histogram()
+        self.checkout_wait = Histogram()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def increment(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "checkout_errors": self.checkout_errors,
+            }
+        return {
+            **counters,
+            "connect_latency_seconds": self.connect_latency.snapshot(),
+            "checkout_wait_seconds": self.checkout_wait.snapshot(),
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited (including connect time)."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except Exception:
+            pool_metrics.increment("checkout_errors")
+            raise
+        finally:
+            pool_metrics.checkout_wait.observe(time.perf_counter() - start)
+
+
+def instrument_pool(engine, metrics: PoolMetrics = pool_metrics) -> None:
+    """Attach pool event listeners that feed metrics."""
+
+    @event.listens_for(engine, "do_connect")
+    def _before_connect(dialect, conn_rec, cargs, cparams):
+        metrics._local.connect_started = time.perf_counter()
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.increment("connects")
+        started = getattr(metrics._local, "connect_started", None)
+        if started is not None:
+            metrics.connect_latency.observe(time.perf_counter() - started)
+            metrics._local.connect_started = None
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.increment("checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        metrics.increment("checkins")
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.increment("invalidations")
+
+
+def pool_status(engine) -> dict:
+    """Point-in-time pool occupancy (QueuePool only exposes all of these)."""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if method is not None:
+            status[name] = method()
+    return status
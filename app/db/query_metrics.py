@@ -0,0 +1,21 @@
+import time
+
+from sqlalchemy import event
+
+from app.core.metrics import current_request_stats
+
+
+def instrument_queries(engine) -> None:
+    """Count and time every statement executed on engine within a request."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if current_request_stats.get() is not None:
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = current_request_stats.get()
+        started = conn.info.get("query_started")
+        if stats is not None and started:
+            stats.record_query(statement, time.perf_counter() - started.pop())
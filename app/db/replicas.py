@@ -0,0 +1,60 @@
+import threading
+import time
+from typing import Callable, Optional
+
+from sqlalchemy.engine import Engine
+
+
+class ReplicaRouter:
+    """
+    Round-robin over read replica engines. A replica that fails to hand out a
+    connection is marked down and skipped for retry_after seconds; the next
+    request after that window acts as the health probe (with pool_pre_ping the
+    checkout itself pings the server). choose() returns None when no replica is
+    usable, and the caller falls back to the primary.
+    """
+
+    def __init__(self, engines: list[Engine], retry_after: float, clock: Callable[[], float] = time.monotonic):
+        self.engines = list(engines)
+        self.retry_after = retry_after
+        self._clock = clock
+        self._down_until: dict[Engine, float] = {}
+        self._next = 0
+        self._lock = threading.Lock()
+        self.failures = 0
+
+    def choose(self) -> Optional[Engine]:
+        with self._lock:
+            now = self._clock()
+            for _ in range(len(self.engines)):
+                engine = self.engines[self._next % len(self.engines)]
+                self._next += 1
+                if self._down_until.get(engine, 0.0) <= now:
+                    return engine
+            return None
+
+    def mark_down(self, engine: Engine) -> None:
+        with self._lock:
+            self._down_until[engine] = self._clock() + self.retry_after
+            self.failures += 1
+
+    def mark_up(self, engine: Engine) -> None:
+        # Called on every successful checkout; skip the lock in the common case
+        if engine in self._down_until:
+            with self._lock:
+                self._down_until.pop(engine, None)
+
+    def status(self) -> dict:
+        with self._lock:
+            now = self._clock()
+            return {
+                "failures": self.failures,
+                "replicas": [
+                    {
+                        "url": engine.url.render_as_string(hide_password=True),
+                        "healthy": self._down_until.get(engine, 0.0) <= now,
+                    }
+                    for engine in self.engines
+                ],
+            }
+
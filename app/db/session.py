@@ -1,12 +1,47 @@
 # Placeholder for SQLAlchemy session
+import os
+from fastapi import Depends, Request
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from app.core.config import settings
+from app.db.pool_metrics import InstrumentedQueuePool, instrument_pool
+from app.db.query_metrics import instrument_queries
+from app.db.replicas import ReplicaRouter
 
 # Use DATABASE_URL from settings instead of hardcoded value
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+def engine_options(url: str) -> dict:
+    """Pool settings from Settings; in-memory SQLite keeps its single-connection pool."""
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return options
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    return options
+
+
+def _sync_engine_options(url: str) -> dict:
+    options = engine_options(url)
+    if "pool_size" in options:
+        options["poolclass"] = InstrumentedQueuePool
+    return options
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_sync_engine_options(SQLALCHEMY_DATABASE_URL))
+instrument_pool(engine)
+instrument_queries(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -15,4 +50,81 @@ def get_db()-> Session:
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+replica_engines = []
+for _url in settings.DATABASE_REPLICA_URLS:
+    _replica = create_engine(_url, **engine_options(_url))
+    instrument_queries(_replica)
+    replica_engines.append(_replica)
+replica_router = ReplicaRouter(replica_engines, retry_after=settings.REPLICA_RETRY_SECONDS)
+
+# Set by ReadYourWritesMiddleware after a successful write
+READ_PIN_COOKIE = "kb_primary_pin"
+
+
+def get_read_db(request: Request, primary: Session = Depends(get_db)) -> Session:
+    """
+    Session for read-only routes: a replica when one is configured and healthy,
+    otherwise the primary session from get_db (so overriding get_db also covers
+    read routes). Clients holding the pin cookie always read from the primary.
+    """
+    engine = None if READ_PIN_COOKIE in request.cookies else replica_router.choose()
+    if engine is None:
+        yield primary
+        return
+    db = SessionLocal(bind=engine, info={"replica": True})
+    try:
+        # Check out the connection now so an unreachable replica falls back here
+        # rather than failing the route's first query
+        db.connection()
+    except DBAPIError:
+        db.close()
+        replica_router.mark_down(engine)
+        yield primary
+        return
+    replica_router.mark_up(engine)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def to_async_url(url: str) -> str:
+    """Swap the sync DBAPI in a database URL for its asyncio driver."""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+# The async engine is only created in async mode so asyncpg/aiosqlite stay optional
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or to_async_url(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+    instrument_queries(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db() -> AsyncSession:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def dispose_pools_after_fork() -> None:
+    """
+    A forked process inherits the parent's pooled connections, and two processes
+    talking over one socket corrupt each other's protocol state. Give the child
+    empty pools; close=False leaves the parent's connections alone.
+    """
+    engine.dispose(close=False)
+    for replica in replica_engines:
+        replica.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=dispose_pools_after_fork)
@@ -1,49 +1,87 @@
+# Measured from the first line so the cold-start log includes import time
+import time
+_import_started = time.perf_counter()
+
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from sqlalchemy import text
 from app.api.routes.health import router as health_router
-from app.api.routes import notes
-from app.models.base import Base
-from app.models import User, Note, Link, Media  # Import all models so they register with Base.metadata
-from app.db.session import engine, SessionLocal
-
-app = FastAPI(title="Knowledge Base API")
-
-# Import models before create_all() so they register with Base.metadata
-Base.metadata.create_all(bind=engine)
-
-# Create a default user with id=1 at startup (first time only)
-def create_default_user():
-    db = SessionLocal()
-    try:
-        # Check if user with id=1 already exists
-        existing_user = db.query(User).filter(User.id == 1).first()
-        if not existing_user:
-            # Use raw SQL to insert user with id=1, bypassing the sequence
-            with engine.connect() as conn:
-                # Insert the user directly with id=1 using raw SQL
-                conn.execute(text("""
-                    INSERT INTO users (id, username, email) 
-                    VALUES (1, 'default', 'default@example.com')
-                    ON CONFLICT (id) DO NOTHING
-                """))
-                conn.commit()
-            
-            # After inserting id=1, set sequence to 1 so next auto-increment gets 2
-            with engine.connect() as conn:
-                # Set sequence to 1 (the last inserted value)
-                # The 'false' parameter means the next call to nextval will return 2
-                conn.execute(text("SELECT setval('users_id_seq', 1, false)"))
-                conn.commit()
-            
-            print("Created default user with id: 1")
-        else:
-            print("Default user with id=1 already exists")
-    except Exception as e:
-        db.rollback()
-        print(f"Error creating default user: {e}")
-    finally:
-        db.close()
-
-create_default_user()
+from app.api.routes import notes, notes_async, users, media, internal, metrics
+from app.api.middleware import (
+    AdmissionControlMiddleware, ProfilingMiddleware, ReadYourWritesMiddleware, RequestMetricsMiddleware,
+)
+from app.core.admission import read_limiter, upload_limiter, write_limiter
+from app.core.config import settings
+from app.core.profiling import profile_store, sampler
+from app.db.init_db import init_db
+from app.db.session import READ_PIN_COOKIE, engine
+from app.services import write_coalescer
+
+logger = logging.getLogger(__name__)
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema creation and seeding run at startup rather than at import time, so
+    # importing the app never touches the database (app.serve runs them once in
+    # the master instead of once per worker)
+    phases = {"import": _import_seconds}
+    startup_started = time.perf_counter()
+    if settings.DB_INIT_ON_STARTUP:
+        phases.update(init_db(engine, create_all=settings.DB_CREATE_ALL))
+    total = phases["import"] + (time.perf_counter() - startup_started)
+    logger.info("cold start took %.1f ms (import %.1f ms)", total * 1000, phases["import"] * 1000)
+    if total > settings.STARTUP_BUDGET_SECONDS:
+        logger.warning("cold start %.2fs exceeded the %.2fs budget: %s", total,
+                       settings.STARTUP_BUDGET_SECONDS,
+                       {phase: round(seconds, 3) for phase, seconds in phases.items()})
+    app.state.startup_phases = phases
+    if write_coalescer.note_writer is not None:
+        write_coalescer.note_writer.start()
+    yield
+    if write_coalescer.note_writer is not None:
+        # Flush notes already accepted before the worker exits
+        write_coalescer.note_writer.stop()
+
+
+app = FastAPI(title="Knowledge Base API", lifespan=lifespan)
+if settings.PROFILING:
+    # Inside RequestMetricsMiddleware, which collects the SQL stats it reports
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=profile_store,
+        sampler=sampler,
+        token=settings.PROFILING_TOKEN,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        top_n=settings.PROFILING_TOP_N,
+    )
+app.add_middleware(RequestMetricsMiddleware)
+if settings.DATABASE_REPLICA_URLS:
+    app.add_middleware(
+        ReadYourWritesMiddleware,
+        cookie_name=READ_PIN_COOKIE,
+        window_seconds=settings.READ_YOUR_WRITES_SECONDS,
+    )
+if settings.ADMISSION_CONTROL:
+    # Outermost, so shed requests cost as little as possible
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        read_limiter=read_limiter,
+        write_limiter=write_limiter,
+        upload_limiter=upload_limiter,
+    )
+
+if settings.DB_ASYNC:
+    # Async CRUD handlers take precedence; everything else is served by notes.router
+    app.include_router(notes_async.router)
 app.include_router(notes.router)
+app.include_router(users.router)
+app.include_router(media.router)
+app.include_router(health_router)
+app.include_router(metrics.router)
+app.include_router(internal.router)
+
+# Measured here rather than in lifespan: with app.serve --preload the app is
+# imported in the master long before a worker starts
+_import_seconds = time.perf_counter() - _import_started
@@ -1,5 +1,12 @@
+# Imported for its side effect: SQLite connections enforce foreign keys like PostgreSQL
+import app.db.sqlite  # noqa: F401
+
 from .base import Base
 from .user import User
 from .note import Note
 from .link import Link
 from .media import Media
+from .note_change import NoteChange
+from .note_edge import NoteEdge
+from .stats import UserStats, NoteStats
+from .note_signature import NoteSignature, NoteLshBand
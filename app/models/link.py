@@ -7,7 +7,7 @@ class Link(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     url  = Column(String, nullable=False)
-    note_id = Column(Integer, ForeignKey("notes.id"))
+    note_id = Column(Integer, ForeignKey("notes.id"), index=True)
 
     note = relationship("Note", backref="links")
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import BigInteger, Column, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
@@ -7,7 +7,12 @@ class Media(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     file_path = Column(String, nullable=False)
-    note_id = Column(Integer, ForeignKey("notes.id"))
+    note_id = Column(Integer, ForeignKey("notes.id"), index=True)
+    # Set for uploaded media; the blob lives in the media storage under sha256.
+    # file_path then holds the uploaded filename.
+    size = Column(BigInteger, nullable=True)
+    sha256 = Column(String(64), nullable=True)
+    mime_type = Column(String, nullable=True)
 
     note = relationship("Note", backref="media")
     
\ No newline at end of file
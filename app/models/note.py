@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DDL, Index, event
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
@@ -10,4 +10,55 @@ class Note(Base):
     content = Column(Text, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"))
 
-    user = relationship("User", backref="notes")
\ No newline at end of file
+    user = relationship("User", backref="notes")
+
+    __table_args__ = (
+        # Per-owner listing: WHERE user_id = ? AND id > ? ORDER BY id is a range scan
+        Index("ix_notes_user_id_id", "user_id", "id"),
+    )
+
+
+# Full-text search index (see app/services/search_service.py).
+# PostgreSQL: a generated tsvector column with a GIN index, maintained by the database.
+# SQLite: an external-content FTS5 table kept in sync by triggers on notes.
+# Alembic revision 5c1f0e7a9b42 creates the same objects on migrated databases.
+POSTGRES_FTS_DDL = [
+    """
+    ALTER TABLE notes ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX ix_notes_search_vector ON notes USING gin (search_vector)",
+]
+
+SQLITE_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts
+    USING fts5(title, content, content='notes', content_rowid='id')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_ai AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_ad AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_au AFTER UPDATE OF title, content ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+]
+
+for statement in POSTGRES_FTS_DDL:
+    event.listen(Note.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_FTS_DDL:
+    event.listen(Note.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Note.__table__, "before_drop", DDL("DROP TABLE IF EXISTS notes_fts").execute_if(dialect="sqlite"))
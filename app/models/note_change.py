@@ -0,0 +1,87 @@
+from sqlalchemy import BigInteger, Column, Index, Integer, String, DDL, event
+from app.models.base import Base
+from app.models.note import Note
+
+class NoteChange(Base):
+    """
+    Change log behind GET /notes/changes. Holds one row per note (the latest
+    change), so the feed is compacted: a note edited many times since a client's
+    token is sent once. seq increases on every write and is never reused.
+    Rows are written by triggers on notes, so every write path is covered.
+
+    The feed is read in (txid, seq) order. On PostgreSQL txid is the writing
+    transaction's id, and readers only see rows from transactions older than
+    every transaction still running (see changes_service), so a row can't
+    commit behind a position a client has already passed. SQLite has a single
+    writer; txid stays 0 there and seq alone gives commit order.
+    """
+    __tablename__ = "note_changes"
+    # AUTOINCREMENT: without it SQLite reuses the highest rowid after the
+    # compaction delete, and a client already past it would miss the change
+    __table_args__ = (
+        Index("ix_note_changes_txid_seq", "txid", "seq"),
+        {"sqlite_autoincrement": True},
+    )
+
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    # No foreign key: a deleted note keeps its row as a tombstone
+    note_id = Column(Integer, nullable=False, unique=True)
+    op = Column(String(6), nullable=False)  # "upsert" or "delete"
+    txid = Column(BigInteger, nullable=False, server_default="0")
+
+
+# Triggers on notes that keep note_changes current.
+# Alembic revisions 3f9b2c6d8e14 and 2e7b9d4f6a18 create the same objects on
+# migrated databases.
+POSTGRES_CHANGES_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION record_note_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM note_changes WHERE note_id = OLD.id;
+            INSERT INTO note_changes (note_id, op, txid) VALUES (OLD.id, 'delete', txid_current());
+            RETURN OLD;
+        END IF;
+        DELETE FROM note_changes WHERE note_id = NEW.id;
+        INSERT INTO note_changes (note_id, op, txid) VALUES (NEW.id, 'upsert', txid_current());
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER note_changes_trg AFTER INSERT OR UPDATE OR DELETE ON notes
+    FOR EACH ROW EXECUTE FUNCTION record_note_change()
+    """,
+]
+
+SQLITE_CHANGES_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS note_changes_ai AFTER INSERT ON notes BEGIN
+        DELETE FROM note_changes WHERE note_id = new.id;
+        INSERT INTO note_changes (note_id, op) VALUES (new.id, 'upsert');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS note_changes_au AFTER UPDATE ON notes BEGIN
+        DELETE FROM note_changes WHERE note_id = new.id;
+        INSERT INTO note_changes (note_id, op) VALUES (new.id, 'upsert');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS note_changes_ad AFTER DELETE ON notes BEGIN
+        DELETE FROM note_changes WHERE note_id = old.id;
+        INSERT INTO note_changes (note_id, op) VALUES (old.id, 'delete');
+    END
+    """,
+]
+
+# The triggers live on notes, so notes must exist before note_changes is created
+NoteChange.__table__.add_is_dependent_on(Note.__table__)
+for statement in POSTGRES_CHANGES_DDL:
+    event.listen(NoteChange.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_CHANGES_DDL:
+    event.listen(NoteChange.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(NoteChange.__table__, "before_drop", DDL("DROP TRIGGER IF EXISTS note_changes_trg ON notes").execute_if(dialect="postgresql"))
+event.listen(NoteChange.__table__, "before_drop", DDL("DROP FUNCTION IF EXISTS record_note_change()").execute_if(dialect="postgresql"))
+for trigger in ("note_changes_ai", "note_changes_au", "note_changes_ad"):
+    event.listen(NoteChange.__table__, "before_drop", DDL(f"DROP TRIGGER IF EXISTS {trigger}").execute_if(dialect="sqlite"))
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from app.models.base import Base
+
+class NoteEdge(Base):
+    """
+    A [[reference]] from one note's content to another note. The primary key
+    serves outgoing lookups (source_id, ...) and ix_note_edges_target_source serves
+    backlinks, so both directions cost O(degree).
+    """
+    __tablename__ = "note_edges"
+
+    source_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+    target_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_note_edges_target_source", "target_id", "source_id"),
+    )
@@ -0,0 +1,26 @@
+from sqlalchemy import BigInteger, Column, ForeignKey, Index, Integer, LargeBinary
+from app.models.base import Base
+
+class NoteSignature(Base):
+    """MinHash signature of a note's content (little-endian uint32 values), see services/similarity."""
+    __tablename__ = "note_signatures"
+
+    note_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+    signature = Column(LargeBinary, nullable=False)
+
+
+class NoteLshBand(Base):
+    """
+    One LSH band of a note's signature, hashed into a bucket (the band number is
+    mixed into the hash, so buckets from different bands never collide). Notes
+    sharing any bucket are similarity candidates; the primary key serves the
+    bucket lookups and ix_note_lsh_bands_note_id the per-note rewrites.
+    """
+    __tablename__ = "note_lsh_bands"
+
+    bucket = Column(BigInteger, primary_key=True)
+    note_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_note_lsh_bands_note_id", "note_id"),
+    )
@@ -0,0 +1,187 @@
+from sqlalchemy import Column, Integer, SmallInteger, ForeignKey, DDL, event
+from app.models.base import Base
+from app.models.note import Note
+from app.models.link import Link
+from app.models.media import Media
+from app.models.note_edge import NoteEdge
+
+# Every note insert and delete bumps its owner's counter inside the writer's
+# transaction, and all unauthenticated clients write as user 1. With one row per
+# user, concurrent creates would queue on that row's lock (PostgreSQL), so each
+# user's counts are spread over USER_STATS_SHARDS rows and summed on read. A
+# connection always writes the shard picked by its backend pid, so a transaction
+# locks one row per user, and concurrent writers on different pool connections
+# rarely share a row. SQLite allows one writer at a time and uses shard 0 only.
+USER_STATS_SHARDS = 16
+SHARDED_COUNTERS = {"user_stats"}
+SHARD_EXPRESSIONS = {"postgresql": f"pg_backend_pid() % {USER_STATS_SHARDS}", "sqlite": "0"}
+
+
+class UserStats(Base):
+    """Per-user counters, kept current by triggers; a user's count is the sum over its shards."""
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(SmallInteger, primary_key=True, server_default="0")
+    note_count = Column(Integer, nullable=False, server_default="0")
+
+
+class NoteStats(Base):
+    """Per-note counters: external links, media and incoming [[links]]."""
+    __tablename__ = "note_stats"
+
+    note_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+    link_count = Column(Integer, nullable=False, server_default="0")
+    media_count = Column(Integer, nullable=False, server_default="0")
+    backlink_count = Column(Integer, nullable=False, server_default="0")
+
+
+# (source table, its foreign key column, counter table, counter table key, counter column).
+# Each source row adds 1 to the counter of the row it points at. The counters are
+# separate tables rather than columns on notes/users so that bumping them doesn't
+# count as a note update (and doesn't fire the note_changes triggers).
+# Counter tables in SHARDED_COUNTERS are keyed by (key, shard) and are only ever
+# upserted by a signed delta, never updated in place.
+# Alembic revisions 6d0c9e3b5a71 and 7b4e2a9c6d15 create the same objects on
+# migrated databases.
+COUNTERS = [
+    ("notes", "user_id", "user_stats", "user_id", "note_count"),
+    ("links", "note_id", "note_stats", "note_id", "link_count"),
+    ("media", "note_id", "note_stats", "note_id", "media_count"),
+    ("note_edges", "target_id", "note_stats", "note_id", "backlink_count"),
+]
+
+def sharded_upsert(stats, key, column, value, delta, dialect) -> str:
+    """Add delta to value's counter row in the connection's shard."""
+    return (
+        f"INSERT INTO {stats} ({key}, shard, {column}) SELECT {value}, {SHARD_EXPRESSIONS[dialect]}, {delta} "
+        f"WHERE {value} IS NOT NULL "
+        f"ON CONFLICT ({key}, shard) DO UPDATE SET {column} = {stats}.{column} + excluded.{column}"
+    )
+
+def sqlite_counter_ddl(source, fk, stats, key, column) -> list[str]:
+    if stats in SHARDED_COUNTERS:
+        return sqlite_sharded_counter_ddl(source, fk, stats, key, column)
+    upsert = f"ON CONFLICT ({key}) DO UPDATE SET {column} = {column} + 1"
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {stats}_{source}_ai AFTER INSERT ON {source}
+        WHEN new.{fk} IS NOT NULL BEGIN
+            INSERT INTO {stats} ({key}, {column}) VALUES (new.{fk}, 1) {upsert};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {stats}_{source}_ad AFTER DELETE ON {source}
+        WHEN old.{fk} IS NOT NULL BEGIN
+            UPDATE {stats} SET {column} = {column} - 1 WHERE {key} = old.{fk};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {stats}_{source}_au AFTER UPDATE OF {fk} ON {source}
+        WHEN old.{fk} IS NOT new.{fk} BEGIN
+            UPDATE {stats} SET {column} = {column} - 1 WHERE {key} = old.{fk};
+            INSERT INTO {stats} ({key}, {column}) SELECT new.{fk}, 1 WHERE new.{fk} IS NOT NULL {upsert};
+        END
+        """,
+    ]
+
+def sqlite_sharded_counter_ddl(source, fk, stats, key, column) -> list[str]:
+    def upsert(value, delta):
+        return sharded_upsert(stats, key, column, value, delta, "sqlite")
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {stats}_{source}_ai AFTER INSERT ON {source}
+        WHEN new.{fk} IS NOT NULL BEGIN
+            {upsert(f"new.{fk}", 1)};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {stats}_{source}_ad AFTER DELETE ON {source}
+        WHEN old.{fk} IS NOT NULL BEGIN
+            {upsert(f"old.{fk}", -1)};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {stats}_{source}_au AFTER UPDATE OF {fk} ON {source}
+        WHEN old.{fk} IS NOT new.{fk} BEGIN
+            {upsert(f"old.{fk}", -1)};
+            {upsert(f"new.{fk}", 1)};
+        END
+        """,
+    ]
+
+def postgres_counter_ddl(source, fk, stats, key, column) -> list[str]:
+    if stats in SHARDED_COUNTERS:
+        return postgres_sharded_counter_ddl(source, fk, stats, key, column)
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION {stats}_{source}_count() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND OLD.{fk} IS NOT DISTINCT FROM NEW.{fk} THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.{fk} IS NOT NULL THEN
+                UPDATE {stats} SET {column} = {column} - 1 WHERE {key} = OLD.{fk};
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.{fk} IS NOT NULL THEN
+                INSERT INTO {stats} ({key}, {column}) VALUES (NEW.{fk}, 1)
+                ON CONFLICT ({key}) DO UPDATE SET {column} = {stats}.{column} + 1;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        f"""
+        CREATE TRIGGER {stats}_{source}_trg AFTER INSERT OR DELETE OR UPDATE OF {fk} ON {source}
+        FOR EACH ROW EXECUTE FUNCTION {stats}_{source}_count()
+        """,
+    ]
+
+def postgres_sharded_counter_ddl(source, fk, stats, key, column) -> list[str]:
+    def upsert(value, delta):
+        return sharded_upsert(stats, key, column, value, delta, "postgresql")
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION {stats}_{source}_count() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND OLD.{fk} IS NOT DISTINCT FROM NEW.{fk} THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                {upsert(f"OLD.{fk}", -1)};
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                {upsert(f"NEW.{fk}", 1)};
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        f"""
+        CREATE TRIGGER {stats}_{source}_trg AFTER INSERT OR DELETE OR UPDATE OF {fk} ON {source}
+        FOR EACH ROW EXECUTE FUNCTION {stats}_{source}_count()
+        """,
+    ]
+
+def sqlite_drop_ddl(source, fk, stats, key, column) -> list[str]:
+    return [f"DROP TRIGGER IF EXISTS {stats}_{source}_{suffix}" for suffix in ("ai", "ad", "au")]
+
+def postgres_drop_ddl(source, fk, stats, key, column) -> list[str]:
+    return [
+        f"DROP TRIGGER IF EXISTS {stats}_{source}_trg ON {source}",
+        f"DROP FUNCTION IF EXISTS {stats}_{source}_count()",
+    ]
+
+
+# All counter triggers hang off note_stats, created after every table they touch
+for table in (UserStats.__table__, Note.__table__, Link.__table__, Media.__table__, NoteEdge.__table__):
+    NoteStats.__table__.add_is_dependent_on(table)
+for counter in COUNTERS:
+    for statement in postgres_counter_ddl(*counter):
+        event.listen(NoteStats.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+    for statement in sqlite_counter_ddl(*counter):
+        event.listen(NoteStats.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in postgres_drop_ddl(*counter):
+        event.listen(NoteStats.__table__, "before_drop", DDL(statement).execute_if(dialect="postgresql"))
+    for statement in sqlite_drop_ddl(*counter):
+        event.listen(NoteStats.__table__, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
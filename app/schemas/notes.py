@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Literal, Optional
 
 # Shared base fields
 class NoteBase(BaseModel):
@@ -32,6 +32,10 @@ class NoteUpdate(BaseModel):
     )
     content: Optional[str]=None
 
+# Used when updating several notes in one request
+class NoteBatchUpdate(NoteUpdate):
+    id: int = Field(..., ge=1)
+
 # Used when returning a note
 class NoteResponse(BaseModel):
     id: int
@@ -40,4 +44,93 @@ class NoteResponse(BaseModel):
     user_id: int
 
     class Config:
-        from_attributes = True # SQLAlchemy compatibility
\ No newline at end of file
+        from_attributes = True # SQLAlchemy compatibility
+
+# Per-item outcome of a batch request: either the note or an error detail
+class NoteBatchItemResult(BaseModel):
+    index: int
+    status: int
+    note: Optional[NoteResponse] = None
+    detail: Optional[str] = None
+
+class NoteBatchResponse(BaseModel):
+    results: list[NoteBatchItemResult]
+
+# One entry of the changes feed: the note as it is now, or a tombstone (note is
+# null) when op is "delete"
+class NoteChangeEntry(BaseModel):
+    id: int
+    op: Literal["upsert", "delete"]
+    note: Optional[NoteResponse] = None
+
+class NoteChangesResponse(BaseModel):
+    changes: list[NoteChangeEntry]
+    next: str = Field(..., description="Pass as since on the next call")
+    has_more: bool
+
+# Neighborhood of a note in the [[link]] graph
+class NoteGraphNode(BaseModel):
+    id: int
+    title: str
+    depth: int
+
+class NoteGraphEdge(BaseModel):
+    source_id: int
+    target_id: int
+
+class NoteNeighborhoodResponse(BaseModel):
+    root: int
+    nodes: list[NoteGraphNode]
+    edges: list[NoteGraphEdge]
+    truncated: bool
+
+# A near-duplicate of a note, with its estimated Jaccard similarity (0..1)
+class NoteSimilarHit(BaseModel):
+    id: int
+    title: str
+    similarity: float
+
+class UserStatsResponse(BaseModel):
+    user_id: int
+    note_count: int
+
+class NoteStatsResponse(BaseModel):
+    note_id: int
+    link_count: int
+    media_count: int
+    backlink_count: int
+
+# Used when returning full-text search hits
+class NoteSearchHit(NoteResponse):
+    rank: float
+    snippet: Optional[str] = None
+
+
+class LinkResponse(BaseModel):
+    id: int
+    url: str
+
+    class Config:
+        from_attributes = True
+
+
+class MediaResponse(BaseModel):
+    id: int
+    file_path: str
+    size: Optional[int] = None
+    sha256: Optional[str] = None
+    mime_type: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+# Used by the list and detail routes, which accept ?fields= and ?include=: any
+# field the client didn't ask for is omitted (id is always present)
+class NotePartialResponse(BaseModel):
+    id: int
+    title: Optional[str] = None
+    content: Optional[str] = None
+    user_id: Optional[int] = None
+    links: Optional[list[LinkResponse]] = None
+    media: Optional[list[MediaResponse]] = None
@@ -0,0 +1,172 @@
+"""
+Multi-process server: one master, WEB_WORKERS forked uvicorn workers.
+
+    python -m app.serve --host 0.0.0.0 --port 8000 --workers 4 [--preload]
+
+The master binds the listening socket and initializes the database once
+(schema and default user), then forks the workers, which all accept on that
+socket and skip the per-worker init. With --preload the app is imported before
+forking, so workers start immediately and share the imported code
+copy-on-write; either way each child starts with empty connection pools
+(app.db.session.dispose_pools_after_fork). A worker that dies is replaced.
+
+On SIGTERM or SIGINT every worker stops accepting, finishes its in-flight
+requests (for up to WEB_GRACEFUL_TIMEOUT seconds) and runs its lifespan
+shutdown, e.g. flushing the write coalescer, before the master exits.
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import time
+
+import uvicorn
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.serve")
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def initialize_database() -> None:
+    """Schema and seed work, once for all workers."""
+    from app.db.init_db import init_db
+    from app.db.session import engine
+
+    init_db(engine, create_all=settings.DB_CREATE_ALL)
+    # Keep the master's pool empty so there is nothing to inherit
+    engine.dispose()
+
+
+class Master:
+    """Forks the workers, replaces any that die, and stops them all on SIGTERM/SIGINT."""
+
+    # A worker that dies sooner than this after starting is restarted after a pause
+    MIN_WORKER_LIFETIME = 1.0
+
+    def __init__(self, sock: socket.socket, workers: int, app_target, graceful_timeout: float, log_level: str):
+        self.sock = sock
+        self.workers = workers
+        self.app_target = app_target
+        self.graceful_timeout = graceful_timeout
+        self.log_level = log_level
+        self.children: dict[int, tuple[int, float]] = {}  # pid -> (worker id, start time)
+        self.stopping = False
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        for worker_id in range(self.workers):
+            self._spawn(worker_id)
+        logger.info("serving on %s with %d workers", self.sock.getsockname(), self.workers)
+        while not self.stopping:
+            for pid, status in self._reap():
+                child = self.children.pop(pid, None)
+                if child is None:
+                    continue
+                worker_id, started = child
+                logger.warning("worker %d exited with status %d; replacing it", pid, os.waitstatus_to_exitcode(status))
+                if time.monotonic() - started < self.MIN_WORKER_LIFETIME:
+                    time.sleep(self.MIN_WORKER_LIFETIME)
+                if not self.stopping:
+                    # The replacement takes over the worker id
+                    self._spawn(worker_id)
+            time.sleep(0.1)
+        self._shutdown()
+
+    def _request_stop(self, signum, frame) -> None:
+        self.stopping = True
+
+    def _spawn(self, worker_id: int) -> None:
+        pid = os.fork()
+        if pid:
+            self.children[pid] = (worker_id, time.monotonic())
+            return
+        # Reported by /metrics and /internal, whose numbers are per worker
+        settings.WEB_WORKER_ID = worker_id
+        # Worker: uvicorn installs its own SIGTERM/SIGINT handlers for graceful shutdown
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        code = 0
+        try:
+            config = uvicorn.Config(
+                self.app_target,
+                lifespan="on",
+                log_level=self.log_level,
+                timeout_graceful_shutdown=self.graceful_timeout,
+            )
+            uvicorn.Server(config).run(sockets=[self.sock])
+        except BaseException:
+            logger.exception("worker %d failed", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _reap(self) -> list[tuple[int, int]]:
+        exited = []
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            exited.append((pid, status))
+        return exited
+
+    def _shutdown(self) -> None:
+        logger.info("stopping %d workers", len(self.children))
+        for pid in self.children:
+            os.kill(pid, signal.SIGTERM)
+        # Workers drain for up to graceful_timeout, then need a moment for lifespan shutdown
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self.children and time.monotonic() < deadline:
+            for pid, _ in self._reap():
+                self.children.pop(pid, None)
+            time.sleep(0.05)
+        for pid in self.children:
+            logger.warning("worker %d did not stop in time; killing it", pid)
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.WEB_WORKERS)
+    parser.add_argument("--preload", action="store_true", default=settings.WEB_PRELOAD,
+                        help="import the app in the master before forking")
+    parser.add_argument("--graceful-timeout", type=float, default=settings.WEB_GRACEFUL_TIMEOUT)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s [%(process)d] %(levelname)s %(name)s: %(message)s")
+
+    sock = bind_socket(args.host, args.port)
+    if settings.DB_INIT_ON_STARTUP:
+        initialize_database()
+    # Settings are inherited by the forked workers
+    settings.DB_INIT_ON_STARTUP = False
+    if args.workers > 1 and "NOTE_CACHE_MAX_ENTRIES" not in os.environ:
+        # Each worker would cache notes that only it invalidates, so a write on
+        # one worker could leave another serving the old note for the whole TTL
+        settings.NOTE_CACHE_MAX_ENTRIES = 0
+
+    app_target = "app.main:app"
+    if args.preload:
+        from app.main import app as app_target
+    Master(sock, args.workers, app_target, args.graceful_timeout, args.log_level).run()
+
+
+if __name__ == "__main__":
+    main()
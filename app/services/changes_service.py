@@ -0,0 +1,30 @@
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session
+from app.models import Note, NoteChange
+from app.services.notes_service import NOTE_COLUMNS
+
+def get_changes(db: Session, since: tuple[int, int], limit: int):
+    """
+    Changes after the (txid, seq) position since, oldest first, each joined to
+    the note's current row (NULL columns for tombstones). A seek on the
+    (txid, seq) index, so a client that is up to date costs one index probe.
+    Returns (rows, has_more).
+
+    On PostgreSQL only rows written by transactions older than the oldest one
+    still running are returned. Every transaction that commits later has a txid
+    at or above that watermark, so it sorts after anything a client has been
+    given. A long-running write transaction holds the feed back until it ends.
+    """
+    stmt = (
+        select(NoteChange.txid, NoteChange.seq, NoteChange.note_id, NoteChange.op, *NOTE_COLUMNS)
+        .outerjoin(Note, Note.id == NoteChange.note_id)
+        .where(tuple_(NoteChange.txid, NoteChange.seq) > tuple_(*since))
+        .order_by(NoteChange.txid, NoteChange.seq)
+        .limit(limit + 1)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        stmt = stmt.where(NoteChange.txid < func.txid_snapshot_xmin(func.txid_current_snapshot()))
+    rows = db.execute(stmt).all()
+    if len(rows) > limit:
+        return rows[:limit], True
+    return rows, False
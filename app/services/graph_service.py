@@ -0,0 +1,66 @@
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+from app.models import Note, NoteEdge
+from app.services.notes_service import NOTE_COLUMNS
+
+# Reads over the note_edges graph maintained by app/services/note_links.py
+
+def get_backlinks(db: Session, note_id: int, limit: int):
+    """Notes that reference note_id, by id. A range scan on ix_note_edges_target_source."""
+    return db.execute(
+        select(*NOTE_COLUMNS)
+        .join(NoteEdge, NoteEdge.source_id == Note.id)
+        .where(NoteEdge.target_id == note_id)
+        .order_by(NoteEdge.source_id)
+        .limit(limit)
+    ).all()
+
+# One recursive step per direction. Each step is an index seek per frontier note,
+# so the walk costs O(edges within depth), never a scan of notes or note_edges.
+_NEIGHBORHOOD_STEPS = {
+    "out": """
+        SELECT e.target_id, w.depth + 1 FROM walk w
+        JOIN note_edges e ON e.source_id = w.id
+        WHERE w.depth < :depth
+    """,
+    "in": """
+        SELECT e.source_id, w.depth + 1 FROM walk w
+        JOIN note_edges e ON e.target_id = w.id
+        WHERE w.depth < :depth
+    """,
+    "both": """
+        SELECT CASE WHEN e.source_id = w.id THEN e.target_id ELSE e.source_id END, w.depth + 1
+        FROM walk w
+        JOIN note_edges e ON e.source_id = w.id OR e.target_id = w.id
+        WHERE w.depth < :depth
+    """,
+}
+
+def get_neighborhood(db: Session, note_id: int, depth: int, direction: str, max_nodes: int):
+    """
+    Notes within depth hops of note_id, each at its shortest distance, plus the
+    edges between them. UNION (not UNION ALL) drops repeated (id, depth) pairs, so
+    cycles cannot make the walk grow past nodes x depth rows.
+    Returns (nodes, edges, truncated).
+    """
+    nodes = db.execute(text(f"""
+        WITH RECURSIVE walk(id, depth) AS (
+            SELECT CAST(:root AS INTEGER), 0
+            UNION
+            {_NEIGHBORHOOD_STEPS[direction]}
+        )
+        SELECT n.id, n.title, MIN(w.depth) AS depth
+        FROM walk w JOIN notes n ON n.id = w.id
+        GROUP BY n.id, n.title
+        ORDER BY depth, n.id
+        LIMIT :limit
+    """), {"root": note_id, "depth": depth, "limit": max_nodes + 1}).all()
+    truncated = len(nodes) > max_nodes
+    nodes = nodes[:max_nodes]
+    ids = [node.id for node in nodes]
+    edges = db.execute(
+        select(NoteEdge.source_id, NoteEdge.target_id)
+        .where(NoteEdge.source_id.in_(ids), NoteEdge.target_id.in_(ids))
+        .order_by(NoteEdge.source_id, NoteEdge.target_id)
+    ).all() if ids else []
+    return nodes, edges, truncated
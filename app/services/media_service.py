@@ -0,0 +1,48 @@
+from typing import Optional
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+from app.models import Media
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+MEDIA_COLUMNS = (Media.id, Media.file_path, Media.size, Media.sha256, Media.mime_type)
+
+def create_media(db: Session, note_id: int, filename: str, digest: str, size: int, mime_type: str):
+    """Record an uploaded blob against a note. The blob must already be committed to storage."""
+    try:
+        created = db.execute(
+            insert(Media)
+            .values(note_id=note_id, file_path=filename, sha256=digest, size=size, mime_type=mime_type)
+            .returning(*MEDIA_COLUMNS)
+        ).one()
+        db.commit()
+        return created
+    except IntegrityError:
+        # The note was deleted while the upload streamed. The blob stays in
+        # storage; another media row may share it.
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Note not found")
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
+
+def get_media(db: Session, media_id: int) -> Optional[Media]:
+    return db.get(Media, media_id)
+
+def delete_media(db: Session, note_id: int, media_id: int):
+    """
+    Remove a media row from its note. The blob stays in storage: it is content
+    addressed and other media rows may share it.
+    """
+    try:
+        deleted = db.execute(
+            delete(Media)
+            .where(Media.id == media_id, Media.note_id == note_id)
+            .returning(*MEDIA_COLUMNS)
+            .execution_options(synchronize_session=False)
+        ).first()
+        db.commit()
+        return deleted
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
@@ -0,0 +1,113 @@
+import hashlib
+import os
+import uuid
+from typing import Iterator, Optional
+
+from app.core.config import settings
+
+
+class BlobWriter:
+    """
+    Receives one upload chunk by chunk. commit() returns (sha256, size) once the
+    blob is durable; abort() discards whatever was written.
+    """
+
+    def write(self, chunk: bytes) -> None:
+        raise NotImplementedError
+
+    def commit(self) -> tuple[str, int]:
+        raise NotImplementedError
+
+    def abort(self) -> None:
+        raise NotImplementedError
+
+
+class StorageBackend:
+    """
+    Content-addressed blob store. Blobs are keyed by the hex sha256 of their
+    bytes, so uploading the same file twice stores it once.
+    """
+
+    def writer(self) -> BlobWriter:
+        raise NotImplementedError
+
+    def exists(self, digest: str) -> bool:
+        raise NotImplementedError
+
+    def local_path(self, digest: str) -> Optional[str]:
+        """Filesystem path for zero-copy serving, or None if the backend is remote."""
+        raise NotImplementedError
+
+    def open(self, digest: str, chunk_size: int) -> Iterator[bytes]:
+        raise NotImplementedError
+
+
+class LocalBlobWriter(BlobWriter):
+    def __init__(self, storage: "LocalFileStorage"):
+        self._storage = storage
+        self._hash = hashlib.sha256()
+        self.size = 0
+        os.makedirs(storage.tmp_dir, exist_ok=True)
+        self._tmp_path = os.path.join(storage.tmp_dir, uuid.uuid4().hex)
+        self._file = open(self._tmp_path, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._hash.update(chunk)
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def commit(self) -> tuple[str, int]:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        digest = self._hash.hexdigest()
+        final_path = self._storage.blob_path(digest)
+        if os.path.exists(final_path):
+            # Same bytes are already stored
+            os.remove(self._tmp_path)
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            # Atomic on one filesystem; a concurrent upload of the same bytes
+            # replaces the blob with an identical one
+            os.replace(self._tmp_path, final_path)
+        return digest, self.size
+
+    def abort(self) -> None:
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+class LocalFileStorage(StorageBackend):
+    """
+    Blobs under <root>/blobs/ab/cd/<sha256>. Uploads are staged in <root>/tmp so
+    the final rename stays on the same filesystem.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.tmp_dir = os.path.join(root, "tmp")
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], digest[2:4], digest)
+
+    def writer(self) -> LocalBlobWriter:
+        return LocalBlobWriter(self)
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.blob_path(digest))
+
+    def local_path(self, digest: str) -> Optional[str]:
+        return self.blob_path(digest)
+
+    def open(self, digest: str, chunk_size: int) -> Iterator[bytes]:
+        with open(self.blob_path(digest), "rb") as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+
+storage = LocalFileStorage(settings.MEDIA_ROOT)
+
+
+def get_storage() -> StorageBackend:
+    return storage
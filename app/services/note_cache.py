@@ -0,0 +1,49 @@
+# Shared read-through cache for single-note reads. Entries hold the serialized
+# NoteResponse body, so a hit costs neither a query nor re-serialization.
+# Every write path that changes or removes a note must call invalidate().
+import threading
+from typing import Iterable
+from app.core.cache import CacheBackend, LRUCache
+from app.core.config import settings
+from app.schemas.notes import NoteResponse
+
+note_cache: CacheBackend = LRUCache(
+    max_entries=settings.NOTE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.NOTE_CACHE_TTL_SECONDS,
+)
+
+
+def cache_key(note_id: int) -> str:
+    return f"note:{note_id}"
+
+
+def render(note) -> bytes:
+    return NoteResponse.model_validate(note).model_dump_json().encode()
+
+
+# A read that misses fills the cache after its SELECT. If a write commits and
+# invalidates in between, the row it read is already stale and must not be
+# cached. Each note maps to one of GENERATION_SLOTS counters that invalidate()
+# bumps; readers take the counter before the SELECT and store() only caches if
+# it is unchanged. Slots keep memory bounded; a collision only skips a fill.
+GENERATION_SLOTS = 4096
+_generations = [0] * GENERATION_SLOTS
+_lock = threading.Lock()
+
+
+def generation(note_id: int) -> int:
+    return _generations[note_id % GENERATION_SLOTS]
+
+
+def store(note_id: int, seen_generation: int, body: bytes) -> None:
+    """Cache body unless note_id was invalidated since seen_generation was read."""
+    with _lock:
+        if _generations[note_id % GENERATION_SLOTS] == seen_generation:
+            note_cache.set(cache_key(note_id), body)
+
+
+def invalidate(note_ids: Iterable[int]) -> None:
+    with _lock:
+        for note_id in note_ids:
+            _generations[note_id % GENERATION_SLOTS] += 1
+            note_cache.delete(cache_key(note_id))
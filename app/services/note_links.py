@@ -0,0 +1,73 @@
+import re
+from typing import Optional
+from sqlalchemy import select, insert, delete, func
+from sqlalchemy.orm import Session
+from app.models import Note, NoteEdge
+
+# [[42]] links by id, [[Some title]] by exact title (the oldest note wins if
+# titles repeat). References that match no note are ignored; a title link is
+# resolved when the referencing note is written, not when the target appears later.
+REFERENCE_PATTERN = re.compile(r"\[\[([^\[\]\n]{1,200})\]\]")
+
+def parse_references(content: Optional[str]) -> tuple[set[int], set[str]]:
+    ids, titles = set(), set()
+    if not content or "[[" not in content:
+        return ids, titles
+    for match in REFERENCE_PATTERN.finditer(content):
+        ref = match.group(1).strip()
+        if ref.isdigit():
+            ids.add(int(ref))
+        elif ref:
+            titles.add(ref)
+    return ids, titles
+
+def resolve_references(db: Session, content: Optional[str]) -> set[int]:
+    ids, titles = parse_references(content)
+    targets = set()
+    if ids:
+        targets |= set(db.scalars(select(Note.id).where(Note.id.in_(ids))))
+    if titles:
+        targets |= set(db.scalars(
+            select(func.min(Note.id)).where(Note.title.in_(titles)).group_by(Note.title)
+        ))
+    return targets
+
+def sync_outgoing_links(db: Session, note_id: int, content: Optional[str], is_new: bool = False) -> None:
+    """
+    Make note_id's outgoing edges match the references in content, touching only
+    the edges that changed. Runs in the caller's transaction; the caller commits.
+    """
+    targets = resolve_references(db, content) - {note_id}
+    if is_new:
+        current = set()
+    elif not targets:
+        # Common case on update: no references, drop whatever was there
+        db.execute(delete(NoteEdge).where(NoteEdge.source_id == note_id))
+        return
+    else:
+        current = set(db.scalars(select(NoteEdge.target_id).where(NoteEdge.source_id == note_id)))
+    removed = current - targets
+    added = targets - current
+    if removed:
+        db.execute(delete(NoteEdge).where(NoteEdge.source_id == note_id, NoteEdge.target_id.in_(removed)))
+    if added:
+        db.execute(insert(NoteEdge), [{"source_id": note_id, "target_id": target} for target in sorted(added)])
+
+def rebuild_links(db: Session, batch_size: int = 1000) -> int:
+    """Recompute every note's outgoing edges from its content. Returns the edge count."""
+    db.execute(delete(NoteEdge))
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Note.id, Note.content)
+            .where(Note.id > last_id, Note.content.contains("[["))
+            .order_by(Note.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        for note_id, content in rows:
+            sync_outgoing_links(db, note_id, content, is_new=True)
+        last_id = rows[-1].id
+    db.commit()
+    return db.scalar(select(func.count()).select_from(NoteEdge))
@@ -1,48 +1,314 @@
-from sqlalchemy.orm import Session
-from app.models import Note, User
+from typing import Optional
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.orm import Session, load_only, selectinload
+from app.models import Link, Media, Note, User
 from app.schemas.schemas import NoteCreate, NoteUpdate
+from app.schemas.notes import NoteBatchUpdate
+from app.services import note_cache, note_links, similarity
 from fastapi import HTTPException
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+NOTE_COLUMNS = (Note.id, Note.title, Note.content, Note.user_id)
+# Field name -> column, for ?fields= projections. id comes first so it can serve as the cursor
+NOTE_FIELDS = {column.key: column for column in NOTE_COLUMNS}
 
 def get_all_notes(db: Session):
     return db.query(Note).all()
 
-def get_note_by_id(db:Session, note_id: int):
-    return db.query(Note).filter(Note.id == note_id).first()
+def with_relations(query, include=()):
+    """
+    Eager-load the relationships named in include with selectinload: one extra
+    SELECT ... WHERE note_id IN (...) per relationship, however many notes are loaded.
+    Works on both legacy Query objects and select() statements.
+    """
+    if "links" in include:
+        query = query.options(selectinload(Note.links))
+    if "media" in include:
+        query = query.options(selectinload(Note.media))
+    return query
+
+def with_fields(query, fields=None):
+    """
+    Load only the note columns named in fields; the rest are deferred and never
+    selected. Callers must not touch the deferred attributes, or each access
+    costs a SELECT. Works on both legacy Query objects and select() statements.
+    """
+    if fields:
+        query = query.options(load_only(*(NOTE_FIELDS[field] for field in fields)))
+    return query
+
+def get_notes_page(
+    db: Session,
+    limit: int,
+    after_id: Optional[int] = None,
+    include=(),
+    user_id: Optional[int] = None,
+    fields=None,
+):
+    """
+    Keyset pagination over notes.id: seeks past after_id on the primary key
+    index instead of using OFFSET, so every page costs O(limit).
+    With user_id the seek runs on the (user_id, id) index instead.
+    Returns the page and the id to resume after (None on the last page).
+    """
+    query = with_fields(with_relations(db.query(Note), include), fields)
+    if user_id is not None:
+        query = query.filter(Note.user_id == user_id)
+    if after_id is not None:
+        query = query.filter(Note.id > after_id)
+    # Fetch one extra row to know whether another page exists
+    notes = query.order_by(Note.id).limit(limit + 1).all()
+    if len(notes) > limit:
+        notes = notes[:limit]
+        return notes, notes[-1].id
+    return notes, None
+
+def note_columns(fields=None) -> tuple:
+    return tuple(NOTE_FIELDS[field] for field in fields) if fields else NOTE_COLUMNS
+
+def get_note_rows_page(
+    db: Session,
+    limit: int,
+    after_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    fields=None,
+):
+    """
+    Same keyset page as get_notes_page, but selects only the NoteResponse columns
+    (or just those named in fields, id first) as plain tuples: no ORM identity
+    map, instance state or relationship machinery. Used by the list route's fast path.
+    """
+    stmt = select(*note_columns(fields)).order_by(Note.id).limit(limit + 1)
+    if user_id is not None:
+        stmt = stmt.where(Note.user_id == user_id)
+    if after_id is not None:
+        stmt = stmt.where(Note.id > after_id)
+    rows = db.execute(stmt).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1][0]
+    return rows, None
+
+def rows_to_dicts(rows, fields=None) -> list[dict]:
+    """NoteResponse-shaped dicts straight from (id, title, content, user_id) tuples."""
+    if fields:
+        return [dict(zip(fields, row)) for row in rows]
+    return [
+        {"id": note_id, "title": title, "content": content, "user_id": user_id}
+        for note_id, title, content, user_id in rows
+    ]
+
+def note_exists(db: Session, note_id: int) -> bool:
+    return db.scalar(select(Note.id).where(Note.id == note_id)) is not None
+
+def user_exists(db: Session, user_id: int) -> bool:
+    return db.scalar(select(User.id).where(User.id == user_id)) is not None
+
+def iter_notes_for_export(db: Session, since_id: Optional[int] = None, include=(), chunk_size: int = 1000):
+    """
+    Stream every note after since_id in id order. yield_per keeps only one chunk of
+    ORM objects alive at a time (a server-side cursor on PostgreSQL), so memory stays
+    flat regardless of table size. Relationships named in include are batch-loaded
+    per chunk with selectinload.
+    """
+    stmt = select(Note).order_by(Note.id).execution_options(yield_per=chunk_size)
+    if since_id is not None:
+        stmt = stmt.where(Note.id > since_id)
+    yield from db.scalars(with_relations(stmt, include))
+
+def get_note_by_id(db:Session, note_id: int, include=(), fields=None):
+    return with_fields(with_relations(db.query(Note), include), fields).filter(Note.id == note_id).first()
+
+def get_note_json(db: Session, note_id: int) -> Optional[bytes]:
+    """Serialized NoteResponse for note_id, served from note_cache when possible."""
+    key = note_cache.cache_key(note_id)
+    body = note_cache.note_cache.get(key)
+    if body is not None:
+        return body
+    seen_generation = note_cache.generation(note_id)
+    note = get_note_by_id(db, note_id)
+    if not note:
+        return None
+    body = note_cache.render(note)
+    # A lagging replica could hand back a row the primary has since changed and
+    # evicted; caching it would serve the stale version for the whole TTL
+    if not db.info.get("replica"):
+        note_cache.store(note_id, seen_generation, body)
+    return body
+
+# Single-note writes are one statement each: INSERT/UPDATE/DELETE ... RETURNING
+# the response columns. User validation is left to the notes.user_id foreign key.
+# The returned rows are plain Row objects (attribute access like the ORM model),
+# so nothing is expired by the commit and no refresh SELECT is needed.
 
 def create_note(db: Session, note: NoteCreate):
-    # validate user exists
-    user = db.query(User).filter(User.id == note.user_id).first()
-    if not user:
+    if note.user_id is None:
+        raise HTTPException(status_code=400, detail="User with id None not found")
+    try:
+        created = db.execute(
+            insert(Note)
+            .values(title=note.title, content=note.content, user_id=note.user_id)
+            .returning(*NOTE_COLUMNS)
+        ).one()
+        note_links.sync_outgoing_links(db, created.id, note.content, is_new=True)
+        similarity.index_note(db, created.id, note.content, is_new=True)
+        db.commit()
+        return created
+    except IntegrityError:
+        db.rollback()
         raise HTTPException(status_code=400, detail=f"User with id {note.user_id} not found")
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
+
+def update_note(db: Session, note_id: int, note_update: NoteUpdate):
+    update_data = note_update.model_dump(exclude_unset=True)
+    if not update_data:
+        return db.execute(select(*NOTE_COLUMNS).where(Note.id == note_id)).first()
+    try:
+        updated = db.execute(
+            update(Note)
+            .where(Note.id == note_id)
+            .values(**update_data)
+            .returning(*NOTE_COLUMNS)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if updated is not None and "content" in update_data:
+            note_links.sync_outgoing_links(db, note_id, update_data["content"])
+            similarity.index_note(db, note_id, update_data["content"])
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise ValueError(f"Invalid update: {e.orig}")
+    if updated is None:
+        return None
+    note_cache.invalidate([note_id])
+    return updated
 
+def detach_children(note_ids):
+    """
+    Statements that unlink a note's links and media before it is deleted. They
+    stay behind with a null note_id, as the ORM's default cascade left them.
+    """
+    return [
+        update(model).where(model.note_id.in_(note_ids)).values(note_id=None).execution_options(synchronize_session=False)
+        for model in (Link, Media)
+    ]
+
+def delete_note(db:Session, note_id: int):
     try:
-        db_note = Note(title=note.title, content=note.content, user_id=note.user_id)
-        db.add(db_note)
+        for statement in detach_children([note_id]):
+            db.execute(statement)
+        deleted = db.execute(
+            delete(Note)
+            .where(Note.id == note_id)
+            .returning(*NOTE_COLUMNS)
+            .execution_options(synchronize_session=False)
+        ).first()
         db.commit()
-        db.refresh(db_note)
-        return db_note
     except SQLAlchemyError as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
-def update_note(db: Session, note_id: int, note_update: NoteUpdate):
-    note = db.query(Note).filter(Note.id == note_id).first()
-    if not note:
+    if deleted is None:
         return None
-    update_data = note_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(note, key, value)
-    db.commit()
-    db.refresh(note)
-    return note  # <- return the Note instance
+    note_cache.invalidate([note_id])
+    return deleted
 
 
+# --- Batch writes ---------------------------------------------------------
+# Each batch runs in a single transaction: one query to validate referenced rows,
+# one multi-row statement to write, one commit. Items that fail validation are
+# reported individually and do not prevent the rest of the batch from being written.
 
+def _batch_error(index: int, status: int, detail: str):
+    return {"index": index, "status": status, "detail": detail}
 
-def delete_note(db:Session, note_id: int):
-    db_note = db.query(Note).filter(Note.id == note_id).first()
-    if not db_note:
-        return None
-    db.delete(db_note)
-    db.commit()
-    return db_note
\ No newline at end of file
+def create_notes_batch(db: Session, notes: list[NoteCreate]):
+    user_ids = {note.user_id for note in notes}
+    existing_users = set(db.scalars(select(User.id).where(User.id.in_(user_ids))))
+
+    results = [None] * len(notes)
+    rows, positions = [], []
+    for index, note in enumerate(notes):
+        if note.user_id not in existing_users:
+            results[index] = _batch_error(index, 400, f"User with id {note.user_id} not found")
+            continue
+        rows.append({"title": note.title, "content": note.content, "user_id": note.user_id})
+        positions.append(index)
+
+    if rows:
+        try:
+            # executemany with RETURNING: batched into multi-row INSERTs by SQLAlchemy
+            created = db.execute(
+                insert(Note).returning(*NOTE_COLUMNS, sort_by_parameter_order=True), rows
+            ).all()
+            for row in created:
+                note_links.sync_outgoing_links(db, row.id, row.content, is_new=True)
+            similarity.index_notes(db, [(row.id, row.content) for row in created], is_new=True)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
+        for index, row in zip(positions, created):
+            results[index] = {"index": index, "status": 200, "note": dict(row._mapping)}
+    return results
+
+def update_notes_batch(db: Session, items: list[NoteBatchUpdate]):
+    ids = {item.id for item in items}
+    existing_ids = set(db.scalars(select(Note.id).where(Note.id.in_(ids))))
+
+    results = [None] * len(items)
+    params, found = [], []
+    for index, item in enumerate(items):
+        if item.id not in existing_ids:
+            results[index] = _batch_error(index, 404, "Note not found")
+            continue
+        update_data = item.model_dump(exclude_unset=True, exclude={"id"})
+        if update_data:
+            params.append({"id": item.id, **update_data})
+        found.append(index)
+
+    if not found:
+        return results
+    try:
+        if params:
+            # ORM bulk UPDATE by primary key (executemany)
+            db.execute(update(Note), params)
+            # A repeated id is applied in order, so its last content wins
+            contents = {item["id"]: item["content"] for item in params if "content" in item}
+            for note_id, content in contents.items():
+                note_links.sync_outgoing_links(db, note_id, content)
+            similarity.index_notes(db, list(contents.items()))
+        rows = db.execute(select(*NOTE_COLUMNS).where(Note.id.in_(ids))).all()
+        db.commit()
+        note_cache.invalidate(ids)
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
+    notes_by_id = {row.id: dict(row._mapping) for row in rows}
+    for index in found:
+        results[index] = {"index": index, "status": 200, "note": notes_by_id[items[index].id]}
+    return results
+
+def delete_notes_batch(db: Session, note_ids: list[int]):
+    try:
+        for statement in detach_children(set(note_ids)):
+            db.execute(statement)
+        deleted = db.execute(
+            delete(Note).where(Note.id.in_(set(note_ids))).returning(*NOTE_COLUMNS)
+        ).all()
+        db.commit()
+        note_cache.invalidate(row.id for row in deleted)
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
+    deleted_by_id = {row.id: dict(row._mapping) for row in deleted}
+    results = []
+    for index, note_id in enumerate(note_ids):
+        # A repeated id is reported as deleted once, then as not found
+        note = deleted_by_id.pop(note_id, None)
+        if note is None:
+            results.append(_batch_error(index, 404, "Note not found"))
+        else:
+            results.append({"index": index, "status": 200, "note": note})
+    return results
@@ -0,0 +1,131 @@
+# Async counterparts of the notes_service CRUD functions, used by
+# app/api/routes/notes_async.py when settings.DB_ASYNC is enabled.
+from typing import Optional
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Note
+from app.schemas.schemas import NoteCreate, NoteUpdate
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from app.services import note_cache, note_links, similarity
+from app.services.notes_service import NOTE_COLUMNS, detach_children, note_columns, with_fields, with_relations
+
+async def get_notes_page(
+    db: AsyncSession,
+    limit: int,
+    after_id: Optional[int] = None,
+    include=(),
+    user_id: Optional[int] = None,
+    fields=None,
+):
+    stmt = with_fields(with_relations(select(Note).order_by(Note.id).limit(limit + 1), include), fields)
+    if user_id is not None:
+        stmt = stmt.where(Note.user_id == user_id)
+    if after_id is not None:
+        stmt = stmt.where(Note.id > after_id)
+    notes = list(await db.scalars(stmt))
+    if len(notes) > limit:
+        notes = notes[:limit]
+        return notes, notes[-1].id
+    return notes, None
+
+async def get_note_rows_page(
+    db: AsyncSession,
+    limit: int,
+    after_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    fields=None,
+):
+    stmt = select(*note_columns(fields)).order_by(Note.id).limit(limit + 1)
+    if user_id is not None:
+        stmt = stmt.where(Note.user_id == user_id)
+    if after_id is not None:
+        stmt = stmt.where(Note.id > after_id)
+    rows = (await db.execute(stmt)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1][0]
+    return rows, None
+
+async def get_note_by_id(db: AsyncSession, note_id: int, include=(), fields=None):
+    if include or fields:
+        return await db.scalar(with_fields(with_relations(select(Note).where(Note.id == note_id), include), fields))
+    return await db.get(Note, note_id)
+
+async def get_note_json(db: AsyncSession, note_id: int) -> Optional[bytes]:
+    key = note_cache.cache_key(note_id)
+    body = note_cache.note_cache.get(key)
+    if body is not None:
+        return body
+    seen_generation = note_cache.generation(note_id)
+    note = await get_note_by_id(db, note_id)
+    if not note:
+        return None
+    body = note_cache.render(note)
+    note_cache.store(note_id, seen_generation, body)
+    return body
+
+async def create_note(db: AsyncSession, note: NoteCreate):
+    if note.user_id is None:
+        raise HTTPException(status_code=400, detail="User with id None not found")
+    try:
+        created = (await db.execute(
+            insert(Note)
+            .values(title=note.title, content=note.content, user_id=note.user_id)
+            .returning(*NOTE_COLUMNS)
+        )).one()
+        if note.content and "[[" in note.content:
+            await db.run_sync(note_links.sync_outgoing_links, created.id, note.content, True)
+        if note.content:
+            await db.run_sync(similarity.index_note, created.id, note.content, True)
+        await db.commit()
+        return created
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"User with id {note.user_id} not found")
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
+
+async def update_note(db: AsyncSession, note_id: int, note_update: NoteUpdate):
+    update_data = note_update.model_dump(exclude_unset=True)
+    if not update_data:
+        return (await db.execute(select(*NOTE_COLUMNS).where(Note.id == note_id))).first()
+    try:
+        updated = (await db.execute(
+            update(Note)
+            .where(Note.id == note_id)
+            .values(**update_data)
+            .returning(*NOTE_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )).first()
+        if updated is not None and "content" in update_data:
+            await db.run_sync(note_links.sync_outgoing_links, note_id, update_data["content"])
+            await db.run_sync(similarity.index_note, note_id, update_data["content"])
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise ValueError(f"Invalid update: {e.orig}")
+    if updated is None:
+        return None
+    note_cache.invalidate([note_id])
+    return updated
+
+async def delete_note(db: AsyncSession, note_id: int):
+    try:
+        for statement in detach_children([note_id]):
+            await db.execute(statement)
+        deleted = (await db.execute(
+            delete(Note)
+            .where(Note.id == note_id)
+            .returning(*NOTE_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )).first()
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
+    if deleted is None:
+        return None
+    note_cache.invalidate([note_id])
+    return deleted
@@ -0,0 +1,45 @@
+import base64
+import binascii
+import json
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the last seen primary key as an opaque, URL-safe cursor."""
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by encode_cursor; raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_id = payload["id"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise ValueError("Invalid cursor")
+    return last_id
+
+
+def encode_change_token(txid: int, seq: int) -> str:
+    """Encode a position in the changes feed as an opaque, URL-safe token."""
+    payload = json.dumps({"id": seq, "tx": txid}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_change_token(token: str) -> tuple[int, int]:
+    """
+    Decode a token produced by encode_change_token into (txid, seq). Tokens from
+    before the feed was ordered by transaction carry only the seq; they decode
+    with txid 0, which on PostgreSQL replays the feed from that seq onwards.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        position = (payload.get("tx", 0), payload["id"])
+    except (binascii.Error, ValueError, TypeError, KeyError, AttributeError):
+        raise ValueError("Invalid cursor")
+    if not all(isinstance(value, int) and not isinstance(value, bool) for value in position):
+        raise ValueError("Invalid cursor")
+    return position
@@ -0,0 +1,65 @@
+import html
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Ranked full-text search over note title and content. Both backends use an
+# inverted index (GIN on PostgreSQL, FTS5 on SQLite), so lookups cost roughly
+# O(matches) rather than a scan of notes.content. Titles are weighted above content.
+#
+# Snippets are HTML: the database marks matches with private-use sentinels, the
+# note text around them is escaped, then the sentinels become <mark> tags. Having
+# the database write <mark> itself would pass note content through unescaped.
+_START, _STOP = "\ue000", "\ue001"
+
+_POSTGRES_SEARCH = text("""
+    SELECT hits.id, hits.title, hits.content, hits.user_id, hits.rank,
+           ts_headline('english', coalesce(hits.content, hits.title), hits.query,
+                       :headline_options) AS snippet
+    FROM (
+        SELECT n.id, n.title, n.content, n.user_id, query,
+               ts_rank(n.search_vector, query) AS rank
+        FROM notes n, websearch_to_tsquery('english', :q) query
+        WHERE n.search_vector @@ query
+        ORDER BY rank DESC, n.id
+        LIMIT :limit OFFSET :offset
+    ) hits
+    ORDER BY hits.rank DESC, hits.id
+""")
+
+_SQLITE_SEARCH = text("""
+    SELECT n.id, n.title, n.content, n.user_id,
+           -bm25(notes_fts, 10.0, 1.0) AS rank,
+           snippet(notes_fts, -1, :start, :stop, '…', 16) AS snippet
+    FROM notes_fts
+    JOIN notes n ON n.id = notes_fts.rowid
+    WHERE notes_fts MATCH :q
+    ORDER BY rank DESC, n.id
+    LIMIT :limit OFFSET :offset
+""")
+
+
+def _fts5_query(q: str) -> str:
+    # Quote every term so user input is matched literally instead of being
+    # parsed as FTS5 syntax (AND/OR/NEAR, column filters, stray quotes)
+    return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+
+def highlight(snippet):
+    """Escape a sentinel-marked snippet and turn the sentinels into <mark> tags."""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+def search_notes(db: Session, q: str, limit: int, offset: int = 0):
+    """Return matching notes ordered by relevance, each with an HTML-safe highlighted snippet."""
+    if db.get_bind().dialect.name == "postgresql":
+        options = f'StartSel="{_START}", StopSel="{_STOP}", MaxWords=35, MinWords=15'
+        rows = db.execute(_POSTGRES_SEARCH, {"q": q, "limit": limit, "offset": offset, "headline_options": options})
+    else:
+        match = _fts5_query(q)
+        if not match:
+            return []
+        rows = db.execute(_SQLITE_SEARCH, {"q": match, "limit": limit, "offset": offset, "start": _START, "stop": _STOP})
+    return [{**row._mapping, "snippet": highlight(row.snippet)} for row in rows]
@@ -0,0 +1,264 @@
+import os
+import re
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.models import Note, NoteLshBand, NoteSignature
+
+# Near-duplicate detection with MinHash + LSH. A note's content is cut into
+# overlapping 3-word shingles; NUM_PERM hash functions each keep their minimum
+# over the shingles, and the fraction of equal minimums between two notes
+# estimates the Jaccard similarity of their shingle sets. The signature is split
+# into BANDS bands of ROWS values; notes that agree on a whole band land in the
+# same bucket. With 16 x 8 a pair at similarity 0.8 shares a bucket with
+# probability ~0.95, at 0.6 ~0.24 and at 0.3 ~0.001, so a lookup only reads the
+# few notes in its 16 buckets instead of scanning the table.
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+
+_PRIME = np.uint64((1 << 31) - 1)
+# Fixed seed: signatures are stored, so every process and release must hash alike
+_rng = np.random.RandomState(20261018)
+_A = _rng.randint(1, int(_PRIME), size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, int(_PRIME), size=NUM_PERM, dtype=np.uint64)
+_MIX = np.uint64(0x100000001B3)
+_WORD = re.compile(r"\w+")
+
+
+def shingle_hashes(content: Optional[str]) -> np.ndarray:
+    """Distinct 31-bit hashes of the content's word shingles (empty for blank content)."""
+    words = _WORD.findall(content.lower()) if content else []
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    if len(words) < SHINGLE_WORDS:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)]
+    hashes = np.fromiter((zlib.crc32(shingle.encode()) & 0x7FFFFFFF for shingle in shingles),
+                         dtype=np.uint64, count=len(shingles))
+    return np.unique(hashes)
+
+
+def compute_signatures(contents: list) -> tuple[np.ndarray, np.ndarray]:
+    """
+    MinHash signatures for many notes at once. Returns (positions, signatures):
+    the indexes into contents that have any words, and a (len(positions), NUM_PERM)
+    uint32 array. All shingles of the chunk are hashed in one flat array per hash
+    function and reduced per note with np.minimum.reduceat.
+    """
+    hash_sets = [shingle_hashes(content) for content in contents]
+    positions = np.array([i for i, hashes in enumerate(hash_sets) if len(hashes)], dtype=np.int64)
+    signatures = np.empty((len(positions), NUM_PERM), dtype=np.uint32)
+    if not len(positions):
+        return positions, signatures
+    present = [hash_sets[i] for i in positions]
+    flat = np.concatenate(present)
+    starts = np.cumsum([0] + [len(hashes) for hashes in present[:-1]])
+    for i in range(NUM_PERM):
+        permuted = (_A[i] * flat + _B[i]) % _PRIME
+        signatures[:, i] = np.minimum.reduceat(permuted, starts)
+    return positions, signatures
+
+
+def band_buckets(signatures: np.ndarray) -> np.ndarray:
+    """(n, BANDS) signed 63-bit bucket ids; the band number is part of the hash."""
+    bands = signatures.reshape(len(signatures), BANDS, ROWS).astype(np.uint64)
+    buckets = np.broadcast_to(np.arange(1, BANDS + 1, dtype=np.uint64), (len(signatures), BANDS)).copy()
+    for row in range(ROWS):
+        buckets = buckets * _MIX + bands[:, :, row]
+    return (buckets >> np.uint64(1)).astype(np.int64)
+
+
+def similarities(signature: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """Estimated Jaccard similarity of one signature against each row of others."""
+    return (others == signature).mean(axis=1)
+
+
+def _to_array(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype="<u4")
+
+
+def _store(db: Session, note_ids, signatures: np.ndarray) -> None:
+    if not len(note_ids):
+        return
+    db.execute(insert(NoteSignature), [
+        {"note_id": int(note_id), "signature": signature.astype("<u4").tobytes()}
+        for note_id, signature in zip(note_ids, signatures)
+    ])
+    rows = {
+        (int(bucket), int(note_id))
+        for note_id, buckets in zip(note_ids, band_buckets(signatures))
+        for bucket in buckets
+    }
+    db.execute(insert(NoteLshBand), [{"bucket": bucket, "note_id": note_id} for bucket, note_id in rows])
+
+
+def index_notes(db: Session, notes: list[tuple[int, Optional[str]]], is_new: bool = False) -> None:
+    """
+    (Re)compute the signatures and buckets of (note_id, content) pairs. Notes
+    without words get neither. Runs in the caller's transaction; the caller commits.
+    """
+    if not notes:
+        return
+    note_ids = [note_id for note_id, _ in notes]
+    if not is_new:
+        db.execute(delete(NoteLshBand).where(NoteLshBand.note_id.in_(note_ids)))
+        db.execute(delete(NoteSignature).where(NoteSignature.note_id.in_(note_ids)))
+    positions, signatures = compute_signatures([content for _, content in notes])
+    _store(db, [note_ids[i] for i in positions], signatures)
+
+
+def index_note(db: Session, note_id: int, content: Optional[str], is_new: bool = False) -> None:
+    index_notes(db, [(note_id, content)], is_new=is_new)
+
+
+def find_similar(db: Session, note_id: int, limit: int, threshold: float, max_candidates: int):
+    """
+    Notes whose estimated similarity to note_id is at least threshold, most similar
+    first, as (id, title, similarity) tuples. Reads the note's 16 buckets through
+    the primary key index and scores at most max_candidates notes found there.
+    """
+    blob = db.scalar(select(NoteSignature.signature).where(NoteSignature.note_id == note_id))
+    if blob is None:
+        return []
+    signature = _to_array(blob)
+    buckets = [int(bucket) for bucket in band_buckets(signature[None, :])[0]]
+    candidates = (
+        select(NoteLshBand.note_id)
+        .where(NoteLshBand.bucket.in_(buckets), NoteLshBand.note_id != note_id)
+        .distinct()
+        .limit(max_candidates)
+    )
+    rows = db.execute(
+        select(NoteSignature.note_id, Note.title, NoteSignature.signature)
+        .join(Note, Note.id == NoteSignature.note_id)
+        .where(NoteSignature.note_id.in_(candidates))
+    ).all()
+    if not rows:
+        return []
+    scores = similarities(signature, np.stack([_to_array(row.signature) for row in rows]))
+    hits = [(row.note_id, row.title, float(score)) for row, score in zip(rows, scores) if score >= threshold]
+    hits.sort(key=lambda hit: (-hit[2], hit[0]))
+    return hits[:limit]
+
+
+# Batch jobs. Shingling is pure Python, so whole-table signature runs are spread
+# over worker processes, and so is scoring find-duplicates' candidate pairs; the
+# parent reads and writes the database, so workers never touch a connection.
+
+def _signature_chunk(notes: list[tuple[int, Optional[str]]]):
+    positions, signatures = compute_signatures([content for _, content in notes])
+    return [notes[i][0] for i in positions], signatures
+
+
+def _workers(workers: Optional[int]) -> int:
+    return workers or settings.SIMILARITY_WORKERS or os.cpu_count() or 1
+
+
+def rebuild_signatures(db: Session, workers: Optional[int] = None, chunk_size: int = 1000) -> int:
+    """Recompute every note's signature and buckets. Returns the number of notes indexed."""
+    db.execute(delete(NoteLshBand))
+    db.execute(delete(NoteSignature))
+    workers = _workers(workers)
+    indexed = 0
+    pending = deque()
+
+    def store_oldest():
+        nonlocal indexed
+        note_ids, signatures = pending.popleft().result()
+        _store(db, note_ids, signatures)
+        indexed += len(note_ids)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        last_id = 0
+        while True:
+            rows = db.execute(
+                select(Note.id, Note.content).where(Note.id > last_id).order_by(Note.id).limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            pending.append(pool.submit(_signature_chunk, [tuple(row) for row in rows]))
+            # Bound the chunks held in memory while the workers stay busy
+            if len(pending) >= 2 * workers:
+                store_oldest()
+        while pending:
+            store_oldest()
+    db.commit()
+    return indexed
+
+
+def _duplicate_chunk(pairs: list[tuple[int, int]], blobs: dict[int, bytes], threshold: float):
+    """The candidate pairs whose signatures agree on at least threshold of their values."""
+    lefts = np.stack([_to_array(blobs[a]) for a, _ in pairs])
+    rights = np.stack([_to_array(blobs[b]) for _, b in pairs])
+    scores = (lefts == rights).mean(axis=1)
+    return [pair for pair, score in zip(pairs, scores) if score >= threshold]
+
+
+def find_duplicates(db: Session, threshold: float, workers: Optional[int] = None, chunk_size: int = 5000) -> dict:
+    """
+    Group notes into near-duplicate clusters from the stored signatures. Candidate
+    pairs come from a self-join of note_lsh_bands on bucket (each pair once); each
+    chunk is scored with one vectorized comparison in a worker process, and the
+    pairs at or above threshold are merged here with union-find.
+    """
+    left, right = aliased(NoteLshBand), aliased(NoteLshBand)
+    pairs = db.execute(
+        select(left.note_id, right.note_id)
+        .join(right, (right.bucket == left.bucket) & (right.note_id > left.note_id))
+        .distinct()
+        .order_by(left.note_id, right.note_id)
+        .execution_options(yield_per=chunk_size)
+    )
+    parent: dict[int, int] = {}
+
+    def root(note_id: int) -> int:
+        parent.setdefault(note_id, note_id)
+        while parent[note_id] != note_id:
+            parent[note_id] = parent[parent[note_id]]
+            note_id = parent[note_id]
+        return note_id
+
+    candidate_pairs = duplicate_pairs = 0
+    workers = _workers(workers)
+    pending = deque()
+
+    def merge_oldest():
+        nonlocal duplicate_pairs
+        for a, b in pending.popleft().result():
+            duplicate_pairs += 1
+            parent[root(b)] = root(a)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in pairs.partitions():
+            candidate_pairs += len(chunk)
+            chunk = [tuple(pair) for pair in chunk]
+            ids = {note_id for pair in chunk for note_id in pair}
+            blobs = dict(db.execute(
+                select(NoteSignature.note_id, NoteSignature.signature).where(NoteSignature.note_id.in_(ids))
+            ).all())
+            pending.append(pool.submit(_duplicate_chunk, chunk, blobs, threshold))
+            # Bound the chunks held in memory while the workers stay busy
+            if len(pending) >= 2 * workers:
+                merge_oldest()
+        while pending:
+            merge_oldest()
+
+    groups: dict[int, list[int]] = {}
+    for note_id in parent:
+        groups.setdefault(root(note_id), []).append(note_id)
+    return {
+        "candidate_pairs": candidate_pairs,
+        "duplicate_pairs": duplicate_pairs,
+        "groups": sorted(sorted(group) for group in groups.values()),
+    }
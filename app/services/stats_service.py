@@ -0,0 +1,63 @@
+from sqlalchemy import select, insert, delete, func, literal, union_all, text
+from sqlalchemy.orm import Session
+from app.models import Link, Media, Note, NoteEdge, NoteStats, User, UserStats
+
+def get_user_stats(db: Session, user_id: int):
+    """A primary key range scan over the user's shards; None if the user doesn't exist."""
+    note_count = (
+        select(func.coalesce(func.sum(UserStats.note_count), 0))
+        .where(UserStats.user_id == User.id)
+        .scalar_subquery()
+    )
+    return db.execute(
+        select(User.id.label("user_id"), note_count.label("note_count")).where(User.id == user_id)
+    ).first()
+
+def get_note_stats(db: Session, note_id: int):
+    """One primary key lookup; None if the note doesn't exist."""
+    return db.execute(
+        select(
+            Note.id.label("note_id"),
+            func.coalesce(NoteStats.link_count, 0).label("link_count"),
+            func.coalesce(NoteStats.media_count, 0).label("media_count"),
+            func.coalesce(NoteStats.backlink_count, 0).label("backlink_count"),
+        )
+        .outerjoin(NoteStats, NoteStats.note_id == Note.id)
+        .where(Note.id == note_id)
+    ).first()
+
+def rebuild_stats(db: Session) -> dict:
+    """
+    Recompute every counter from the source tables, repairing any drift. Full
+    scans of notes, links, media and note_edges, so run it off-peak.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        # Block writers for the duration so no trigger update is lost in between
+        db.execute(text("LOCK TABLE notes, links, media, note_edges IN SHARE MODE"))
+    db.execute(delete(UserStats))
+    db.execute(delete(NoteStats))
+    # Rebuilt counts go to shard 0
+    db.execute(insert(UserStats).from_select(
+        ["user_id", "note_count"],
+        select(Note.user_id, func.count()).where(Note.user_id.is_not(None)).group_by(Note.user_id),
+    ))
+    per_note = union_all(
+        select(Link.note_id.label("note_id"), literal(1).label("links"), literal(0).label("media"), literal(0).label("backlinks"))
+        .where(Link.note_id.is_not(None)),
+        select(Media.note_id, literal(0), literal(1), literal(0)).where(Media.note_id.is_not(None)),
+        select(NoteEdge.target_id, literal(0), literal(0), literal(1)),
+    ).subquery()
+    db.execute(insert(NoteStats).from_select(
+        ["note_id", "link_count", "media_count", "backlink_count"],
+        select(
+            per_note.c.note_id,
+            func.sum(per_note.c.links),
+            func.sum(per_note.c.media),
+            func.sum(per_note.c.backlinks),
+        ).group_by(per_note.c.note_id),
+    ))
+    db.commit()
+    return {
+        "users": db.scalar(select(func.count(UserStats.user_id.distinct()))),
+        "notes": db.scalar(select(func.count()).select_from(NoteStats)),
+    }
@@ -0,0 +1,129 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.schemas.notes import NoteCreate
+from app.services import notes_service
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteCoalescer:
+    """
+    Group commit for note creation. Callers submit() a NoteCreate and get a
+    Future; a single writer thread gathers whatever arrives within window_seconds
+    of the first item (up to max_batch), inserts it with create_notes_batch in one
+    transaction and resolves each Future with its own note or HTTPException.
+    One commit (one WAL flush on PostgreSQL) then serves the whole batch.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], window_seconds: float, max_batch: int):
+        self.session_factory = session_factory
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="note-write-coalescer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Flush everything already submitted, then stop the writer thread."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, note: NoteCreate) -> Future:
+        future: Future = Future()
+        self._queue.put((note, future))
+        return future
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "largest_batch": self.largest_batch,
+            "avg_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.window_seconds
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                self._flush(batch)
+            except Exception as e:
+                # Keep the writer alive; every caller still waiting gets the error
+                logger.exception("coalesced insert of %d notes failed", len(batch))
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _flush(self, batch) -> None:
+        notes = [note for note, _ in batch]
+        futures = [future for _, future in batch]
+        try:
+            with self.session_factory() as db:
+                results = notes_service.create_notes_batch(db, notes)
+        except HTTPException:
+            # The shared transaction failed (e.g. a user deleted after validation);
+            # retry one by one so a single bad item only fails its own caller
+            logger.warning("coalesced insert of %d notes failed; retrying individually", len(batch))
+            results = [self._create_one(index, note) for index, note in enumerate(notes)]
+
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for future, result in zip(futures, results):
+            if result["status"] == 200:
+                future.set_result(result["note"])
+            else:
+                future.set_exception(HTTPException(status_code=result["status"], detail=result["detail"]))
+
+    def _create_one(self, index: int, note: NoteCreate) -> dict:
+        try:
+            with self.session_factory() as db:
+                created = notes_service.create_note(db, note)
+            return {"index": index, "status": 200, "note": dict(created._mapping)}
+        except HTTPException as e:
+            return {"index": index, "status": e.status_code, "detail": e.detail}
+
+
+# Created only when NOTES_WRITE_COALESCING is on; started and stopped by the lifespan
+note_writer: Optional[WriteCoalescer] = None
+if settings.NOTES_WRITE_COALESCING:
+    note_writer = WriteCoalescer(
+        SessionLocal,
+        window_seconds=settings.NOTES_COALESCE_WINDOW_MS / 1000,
+        max_batch=settings.NOTES_COALESCE_MAX_BATCH,
+    )
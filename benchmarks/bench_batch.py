@@ -0,0 +1,74 @@
+"""
+Single-item vs. batch note creation throughput.
+
+Creates the same notes once through notes_service.create_note (one transaction
+per note) and once through notes_service.create_notes_batch (one transaction per
+batch) against a throwaway SQLite file, and reports notes/second for each.
+
+    python -m benchmarks.bench_batch --batch-size 1000 --batches 5
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, User
+from app.schemas.notes import NoteCreate
+from app.services import notes_service
+
+
+def _fresh_session():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(User(id=1, username="bench", email="bench@example.com"))
+    db.commit()
+    return db, engine, path
+
+
+def run(batch_size: int, batches: int):
+    payloads = [
+        NoteCreate(title=f"Note {i}", content="benchmark content " * 20, user_id=1)
+        for i in range(batch_size)
+    ]
+
+    db, engine, path = _fresh_session()
+    start = time.perf_counter()
+    for _ in range(batches):
+        for payload in payloads:
+            notes_service.create_note(db, payload)
+    single = time.perf_counter() - start
+    db.close(); engine.dispose(); os.remove(path)
+
+    db, engine, path = _fresh_session()
+    start = time.perf_counter()
+    for _ in range(batches):
+        notes_service.create_notes_batch(db, payloads)
+    batched = time.perf_counter() - start
+    db.close(); engine.dispose(); os.remove(path)
+
+    total = batch_size * batches
+    return {
+        "notes": total,
+        "single_notes_per_sec": round(total / single, 1),
+        "batch_notes_per_sec": round(total / batched, 1),
+        "speedup": round(single / batched, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--batches", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps({"benchmark": "batch_create", **run(args.batch_size, args.batches)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Overload: tail latency with and without admission control.
+
+Seeds a database, then launches the API under uvicorn with a deliberately small
+connection pool, once with ADMISSION_CONTROL=false and once with it on, and
+drives the GET /notes/?limit=N listing at concurrency well beyond what the pool
+can serve. Responses are split into
+"served" (2xx) and "shed" (503) so the report shows both what admitted requests
+paid and how fast refused ones were told to come back.
+
+Without admission control every request queues on the pool and p99 grows with
+concurrency (up to DB_POOL_TIMEOUT); with it, served p99 stays near
+ADMISSION_MAX_WAIT_MS plus service time and the excess is shed in
+milliseconds.
+
+    python -m benchmarks.bench_overload --concurrency 32 128 512 --pool-size 2
+
+Run the load generator on a different machine (or at least different cores)
+from the server; on a single core the client's own scheduling dominates p99.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+from benchmarks.loadgen import drive, internal_stats, launch_server, stop_server
+from benchmarks.seed import seed
+
+
+def run(args):
+    database_url = args.database_url
+    tmp_path = None
+    if not database_url:
+        fd, tmp_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite:///{tmp_path}"
+
+    base_env = {
+        "DATABASE_URL": database_url,
+        "DB_POOL_SIZE": str(args.pool_size),
+        "DB_MAX_OVERFLOW": "0",
+        "SLOW_REQUEST_MS": "60000",
+        "MAX_QUERIES_PER_REQUEST": "100000",
+        "NOTE_CACHE_MAX_ENTRIES": "0",
+    }
+    modes = {
+        "unbounded": {"ADMISSION_CONTROL": "false"},
+        "admission": {
+            "ADMISSION_CONTROL": "true",
+            "ADMISSION_READ_CONCURRENCY": str(args.pool_size),
+            "ADMISSION_QUEUE_SIZE": str(args.queue_size),
+            "ADMISSION_MAX_WAIT_MS": str(args.max_wait_ms),
+        },
+    }
+    results = []
+    try:
+        seed(database_url, args.notes)
+        for mode, env in modes.items():
+            proc = launch_server(args.port, {**base_env, **env})
+            try:
+                base_url = f"http://127.0.0.1:{args.port}"
+
+                async def listing(client):
+                    response = await client.get("/notes/", params={"limit": args.limit})
+                    return ("shed" if response.status_code == 503 else "served"), response
+
+                for concurrency in args.concurrency:
+                    stats = asyncio.run(drive(base_url, concurrency, args.duration, listing))
+                    results.append({"mode": mode, "concurrency": concurrency, **stats})
+                    print(json.dumps(results[-1]), file=sys.stderr)
+                results.append({"mode": mode, "admission": internal_stats(base_url, "admission")})
+            finally:
+                stop_server(proc)
+    finally:
+        if tmp_path:
+            os.remove(tmp_path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="defaults to a throwaway SQLite file")
+    parser.add_argument("--notes", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[32, 128, 512])
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per measurement")
+    parser.add_argument("--limit", type=int, default=200, help="notes per listing request")
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=250)
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+    print(json.dumps({"benchmark": "overload", "results": run(args)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Profiling overhead: requests per second and latency with the profiler off,
+installed but idle, and profiling every request.
+
+Seeds a database, then launches the API under uvicorn three times and drives a
+mix of list pages and single notes:
+
+* off: PROFILING=false, the middleware isn't installed (sync handlers still
+  go through the `profiled` wrapper, which costs one ContextVar lookup)
+* idle: PROFILING=true with a token and no sampling, requests don't carry it
+* every: PROFILING_SAMPLE_RATE=1, every request is stack-sampled and stored
+
+"off" and "idle" should be within noise of each other; "every" shows the cost
+of sampling and of building the report.
+
+    python -m benchmarks.bench_profiling --concurrency 16 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+
+from benchmarks.loadgen import drive, launch_server, stop_server
+from benchmarks.seed import seed
+
+
+def run(args):
+    database_url = args.database_url
+    tmp_path = None
+    if not database_url:
+        fd, tmp_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite:///{tmp_path}"
+
+    base_env = {
+        "DATABASE_URL": database_url,
+        "SLOW_REQUEST_MS": "60000",
+        "MAX_QUERIES_PER_REQUEST": "100000",
+        "NOTE_CACHE_MAX_ENTRIES": "0",
+        "ADMISSION_CONTROL": "false",
+    }
+    modes = {
+        "off": {"PROFILING": "false"},
+        "idle": {"PROFILING": "true", "PROFILING_TOKEN": "bench", "PROFILING_SAMPLE_RATE": "0"},
+        "every": {"PROFILING": "true", "PROFILING_SAMPLE_RATE": "1"},
+    }
+    results = []
+    try:
+        seeded = seed(database_url, args.notes)
+        first_id, last_id = seeded["first_note_id"], seeded["last_note_id"]
+        rng = random.Random(7)
+
+        async def read(client):
+            if rng.random() < 0.5:
+                return "GET /notes/", await client.get("/notes/", params={"limit": 50})
+            return "GET /notes/{id}", await client.get(f"/notes/{rng.randint(first_id, last_id)}")
+
+        for mode, env in modes.items():
+            proc = launch_server(args.port, {**base_env, **env})
+            try:
+                stats = asyncio.run(drive(f"http://127.0.0.1:{args.port}", args.concurrency, args.duration, read))
+            finally:
+                stop_server(proc)
+            results.append({"mode": mode, **stats})
+            print(json.dumps({"mode": mode, "rps": stats["rps"], "p50_ms": stats["p50_ms"],
+                              "p99_ms": stats["p99_ms"]}), file=sys.stderr)
+    finally:
+        if tmp_path:
+            os.remove(tmp_path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="defaults to a throwaway SQLite file")
+    parser.add_argument("--notes", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per mode")
+    parser.add_argument("--port", type=int, default=8769)
+    args = parser.parse_args()
+    print(json.dumps({"benchmark": "profiling", "results": run(args)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
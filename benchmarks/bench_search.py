@@ -0,0 +1,97 @@
+"""
+Search latency vs. table size.
+
+Seeds a throwaway SQLite database with increasing numbers of notes and times the
+query behind GET /notes/search. A selective term (a fixed number of matches) should
+stay flat as the table grows, while the LIKE scan it replaces grows linearly.
+Terms that match a fixed fraction of the table still cost O(matches) to rank.
+
+    python -m benchmarks.bench_search --sizes 1000 10000 100000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, Note, User
+from app.services import search_service
+
+WORDS = [
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+    "india", "juliet", "kilo", "lima", "mike", "november", "oscar", "papa",
+    "quebec", "romeo", "sierra", "tango", "uniform", "victor", "whiskey",
+    "xray", "yankee", "zulu", "meeting", "project", "idea", "todo", "draft",
+]
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _ilike_query(db, term: str, limit: int):
+    return db.execute(
+        text("SELECT id FROM notes WHERE title LIKE :p OR content LIKE :p LIMIT :limit"),
+        {"p": f"%{term}%", "limit": limit},
+    ).all()
+
+
+def run(sizes, queries, rarity_marker="zephyr"):
+    rng = random.Random(42)
+    results = []
+    for size in sizes:
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            db.execute(insert(User), [{"id": 1, "username": "bench", "email": "bench@example.com"}])
+            batch = []
+            for i in range(size):
+                content = _sentence(rng, 40)
+                # A rare term that appears in ~10 notes regardless of table size
+                if i % max(size // 10, 1) == 0:
+                    content += f" {rarity_marker}"
+                batch.append({"title": _sentence(rng, 4), "content": content, "user_id": 1})
+                if len(batch) == 5000:
+                    db.execute(insert(Note), batch)
+                    batch = []
+            if batch:
+                db.execute(insert(Note), batch)
+            db.commit()
+
+            def timed(fn):
+                samples = []
+                for _ in range(queries):
+                    start = time.perf_counter()
+                    fn()
+                    samples.append((time.perf_counter() - start) * 1000)
+                return round(statistics.median(samples), 3)
+
+            results.append({
+                "notes": size,
+                "fts_rare_term_p50_ms": timed(lambda: search_service.search_notes(db, rarity_marker, limit=20)),
+                "fts_common_terms_p50_ms": timed(lambda: search_service.search_notes(db, "project zulu", limit=20)),
+                "like_scan_rare_term_p50_ms": timed(lambda: _ilike_query(db, rarity_marker, 20)),
+            })
+        engine.dispose()
+        os.remove(path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps({"benchmark": "search", "results": run(args.sizes, args.queries)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+List-page serialization cost: ORM + Pydantic vs. column rows + orjson.
+
+Seeds a throwaway SQLite database and times building the body of one large
+GET /notes/ page three ways:
+
+  orm_pydantic_json   ORM objects, validated per row into NoteResponse, stdlib json
+  orm_type_adapter    ORM objects, one TypeAdapter validate + dump_json
+  rows_orjson         column tuples -> dicts -> orjson (the route's fast path)
+
+    python -m benchmarks.bench_serialization --notes 10000 --runs 20
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.schemas.notes import NoteResponse
+from app.services import notes_service
+from benchmarks.seed import seed
+
+note_list_adapter = TypeAdapter(list[NoteResponse])
+
+
+def orm_pydantic_json(db, limit):
+    notes, _ = notes_service.get_notes_page(db, limit=limit)
+    return json.dumps([NoteResponse.model_validate(note).model_dump() for note in notes]).encode()
+
+
+def orm_type_adapter(db, limit):
+    notes, _ = notes_service.get_notes_page(db, limit=limit)
+    return note_list_adapter.dump_json(note_list_adapter.validate_python(notes, from_attributes=True))
+
+
+def rows_orjson(db, limit):
+    rows, _ = notes_service.get_note_rows_page(db, limit=limit)
+    return orjson.dumps(notes_service.rows_to_dicts(rows))
+
+
+PATHS = [orm_pydantic_json, orm_type_adapter, rows_orjson]
+
+
+def run(notes, runs):
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    url = f"sqlite:///{path}"
+    seed(url, notes)
+    engine = create_engine(url)
+    Session = sessionmaker(bind=engine)
+    results = []
+    try:
+        bodies = []
+        for fn in PATHS:
+            samples = []
+            for _ in range(runs):
+                # Fresh session each run so the identity map doesn't carry over
+                with Session() as db:
+                    start = time.perf_counter()
+                    body = fn(db, notes)
+                    samples.append((time.perf_counter() - start) * 1000)
+            with Session() as db:
+                tracemalloc.start()
+                fn(db, notes)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            bodies.append(json.loads(body))
+            results.append({
+                "path": fn.__name__,
+                "p50_ms": round(statistics.median(samples), 2),
+                "min_ms": round(min(samples), 2),
+                "peak_alloc_kb": round(peak / 1024),
+                "body_bytes": len(body),
+            })
+        # All three paths must produce the same document
+        assert all(b == bodies[0] for b in bodies), "serialization paths disagree"
+    finally:
+        engine.dispose()
+        os.remove(path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps({"benchmark": "serialization", "notes": args.notes, "results": run(args.notes, args.runs)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
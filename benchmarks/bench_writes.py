@@ -0,0 +1,83 @@
+"""
+Write latency through notes_service: create_note, update_note and delete_note.
+
+Each operation is timed individually against a throwaway SQLite file (or
+--database-url) and the number of SQL statements it issued is counted, so the
+effect of round-trip changes in the write path is visible directly.
+
+    python -m benchmarks.bench_writes --iterations 2000
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db.init_db import init_db
+from app.schemas.notes import NoteCreate, NoteUpdate
+from app.services import notes_service
+from benchmarks.loadgen import percentile
+
+
+def run(database_url: str, iterations: int) -> dict:
+    engine = create_engine(database_url)
+    init_db(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    timings = {"create": [], "update": [], "delete": []}
+    queries = {"create": 0, "update": 0, "delete": 0}
+    payload = NoteCreate(title="bench", content="x" * 1000, user_id=1)
+    change = NoteUpdate(title="bench (edited)")
+
+    def timed(name, fn):
+        with Session() as db:
+            before = len(statements)
+            start = time.perf_counter()
+            result = fn(db)
+            timings[name].append((time.perf_counter() - start) * 1000)
+            queries[name] += len(statements) - before
+            return result
+
+    for _ in range(iterations):
+        note_id = timed("create", lambda db: notes_service.create_note(db, payload)).id
+        timed("update", lambda db: notes_service.update_note(db, note_id, change))
+        timed("delete", lambda db: notes_service.delete_note(db, note_id))
+    engine.dispose()
+
+    return {
+        name: {
+            "p50_ms": round(statistics.median(samples), 3),
+            "p99_ms": round(percentile(samples, 99), 3),
+            "statements_per_call": round(queries[name] / iterations, 2),
+        }
+        for name, samples in timings.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--database-url", default=None, help="defaults to a throwaway SQLite file")
+    args = parser.parse_args()
+
+    tmp_path = None
+    database_url = args.database_url
+    if not database_url:
+        fd, tmp_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite:///{tmp_path}"
+    try:
+        print(json.dumps({"benchmark": "writes", **run(database_url, args.iterations)}, indent=2))
+    finally:
+        if tmp_path:
+            os.remove(tmp_path)
+
+
+if __name__ == "__main__":
+    main()
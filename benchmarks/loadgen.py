@@ -0,0 +1,106 @@
+"""Shared helpers for the HTTP benchmarks: launch uvicorn and drive it with concurrent clients."""
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+# /internal takes X-Profile-Token; launch_server sets PROFILING_TOKEN to this
+# unless the benchmark passes its own
+INTERNAL_TOKEN = "bench"
+
+
+def launch_server(port: int, env: dict, workers: int = 1, serve: bool = False) -> subprocess.Popen:
+    """
+    Start `uvicorn app.main:app` (or, with serve, the app.serve master with its
+    forked workers) with extra environment and wait until it answers.
+    """
+    if serve:
+        command = [sys.executable, "-m", "app.serve", "--port", str(port), "--workers", str(workers),
+                   "--preload", "--log-level", "warning"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"]
+        if workers > 1:
+            command += ["--workers", str(workers)]
+    proc = subprocess.Popen(command, env={**os.environ, "PROFILING_TOKEN": INTERNAL_TOKEN, **env})
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+            return proc
+        except httpx.TransportError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+def internal_stats(base_url: str, path: str) -> dict:
+    """GET /internal/<path> from a server started by launch_server."""
+    return httpx.get(f"{base_url}/internal/{path}", headers={"X-Profile-Token": INTERNAL_TOKEN}).json()
+
+
+def stop_server(proc: subprocess.Popen) -> None:
+    proc.terminate()
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(latencies_ms, errors, elapsed):
+    if not latencies_ms:
+        return {"requests": 0, "errors": errors, "rps": 0.0}
+    return {
+        "requests": len(latencies_ms),
+        "errors": errors,
+        "rps": round(len(latencies_ms) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies_ms), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+    }
+
+
+async def drive(base_url: str, concurrency: int, duration: float, request):
+    """
+    Run `concurrency` closed-loop clients for `duration` seconds. `request(client)`
+    returns (label, response), or None when it has nothing left to send. Returns
+    overall stats plus a per-label breakdown (used by mixed workloads).
+    """
+    latencies, errors = defaultdict(list), defaultdict(int)
+    stop_at = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def worker():
+            while time.perf_counter() < stop_at:
+                start = time.perf_counter()
+                try:
+                    result = await request(client)
+                    if result is None:
+                        return
+                    label, response = result
+                    failed = response.status_code >= 400
+                except httpx.TransportError:
+                    label, failed = "transport_error", True
+                latencies[label].append((time.perf_counter() - start) * 1000)
+                errors[label] += failed
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    overall = summarize([ms for samples in latencies.values() for ms in samples], sum(errors.values()), elapsed)
+    if len(latencies) > 1:
+        overall["by_route"] = {label: summarize(samples, errors[label], elapsed) for label, samples in latencies.items()}
+    return overall
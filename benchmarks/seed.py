@@ -0,0 +1,96 @@
+"""
+Seed users, notes, links and media at benchmark scale.
+
+    python -m benchmarks.seed --scale 100k                      # DATABASE_URL or ./bench.db
+    python -m benchmarks.seed --notes 250000 --database-url postgresql://...
+
+Data is deterministic for a given --seed so results are comparable across commits.
+Rows are written with multi-row Core inserts in chunks, so seeding 1M notes is
+bounded by the database, not the ORM.
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+from sqlalchemy import create_engine, func, insert, select, text
+
+from app.db.init_db import init_db
+from app.models import Link, Media, Note, User
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+NOTES_PER_USER = 100
+CHUNK = 5_000
+
+WORDS = (
+    "meeting project idea todo draft research budget roadmap design review "
+    "sprint release bug feature customer feedback travel recipe book reading "
+    "python database index query cache latency throughput backup sync mobile"
+).split()
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def seed(database_url: str, notes: int, seed_value: int = 1234) -> dict:
+    """Create the schema if needed and insert `notes` notes (plus users/links/media)."""
+    rng = random.Random(seed_value)
+    engine = create_engine(database_url)
+    init_db(engine)
+    started = time.perf_counter()
+
+    with engine.begin() as conn:
+        first_user = (conn.execute(select(func.max(User.id))).scalar() or 0) + 1
+        first_note = (conn.execute(select(func.max(Note.id))).scalar() or 0) + 1
+        users = max(notes // NOTES_PER_USER, 1)
+        conn.execute(insert(User), [
+            {"id": first_user + i, "username": f"bench-{first_user + i}", "email": f"bench-{first_user + i}@example.com"}
+            for i in range(users)
+        ])
+
+        for offset in range(0, notes, CHUNK):
+            size = min(CHUNK, notes - offset)
+            ids = range(first_note + offset, first_note + offset + size)
+            conn.execute(insert(Note), [
+                {"id": note_id, "title": _text(rng, 4), "content": _text(rng, rng.randint(20, 200)),
+                 "user_id": first_user + rng.randrange(users)}
+                for note_id in ids
+            ])
+            # One link per two notes and one media file per four notes
+            conn.execute(insert(Link), [
+                {"url": f"https://example.com/{note_id}", "note_id": note_id} for note_id in ids if note_id % 2 == 0
+            ])
+            conn.execute(insert(Media), [
+                {"file_path": f"media/{note_id}.png", "note_id": note_id} for note_id in ids if note_id % 4 == 0
+            ])
+
+        if conn.dialect.name == "postgresql":
+            # Explicit ids bypass the sequences; move them past the seeded rows
+            for table in ("users", "notes"):
+                conn.execute(text(f"SELECT setval('{table}_id_seq', (SELECT MAX(id) FROM {table}))"))
+
+    engine.dispose()
+    return {
+        "notes": notes,
+        "users": users,
+        "first_note_id": first_note,
+        "last_note_id": first_note + notes - 1,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--scale", choices=SCALES, default="1k")
+    size.add_argument("--notes", type=int)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+    print(json.dumps(seed(args.database_url, args.notes or SCALES[args.scale], args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
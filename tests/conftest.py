@@ -0,0 +1,75 @@
+# tests/conftest.py
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.query_metrics import instrument_queries
+from app.db.session import get_db
+from app.main import app
+from app.models import Base, User
+
+
+@pytest.fixture
+def sqlite_db():
+    """
+    Factory for throwaway SQLite databases. sqlite_db(seed=...) creates the schema
+    in a temporary file, adds user 1, lets seed(db) add the test's own rows and
+    returns the sessionmaker. Engines and files are removed after the test.
+    """
+    created = []
+
+    def make(seed=None, instrument=False):
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        created.append((engine, path))
+        if instrument:
+            instrument_queries(engine)
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        with SessionLocal() as db:
+            db.add(User(id=1, username="testuser", email="test@test.com"))
+            if seed is not None:
+                seed(db)
+            db.commit()
+        return SessionLocal
+
+    yield make
+    for engine, path in created:
+        engine.dispose()
+        os.remove(path)
+
+
+@pytest.fixture
+def sqlite_app(sqlite_db):
+    """
+    sqlite_app(seed=..., target=app, dependencies=(get_db,)) makes a database with
+    sqlite_db and points the target app's session dependencies at it. Other test
+    modules install their own overrides, so the previous ones are restored afterwards.
+    """
+    installed = []
+
+    def make(seed=None, instrument=False, target=app, dependencies=(get_db,)):
+        SessionLocal = sqlite_db(seed=seed, instrument=instrument)
+
+        def override_get_db():
+            db = SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        for dependency in dependencies:
+            installed.append((target, dependency, target.dependency_overrides.get(dependency)))
+            target.dependency_overrides[dependency] = override_get_db
+        return SessionLocal
+
+    yield make
+    for target, dependency, previous in reversed(installed):
+        if previous is None:
+            target.dependency_overrides.pop(dependency, None)
+        else:
+            target.dependency_overrides[dependency] = previous
@@ -0,0 +1,168 @@
+# tests/test_admission.py
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.middleware import AdmissionControlMiddleware
+from app.api.routes import health
+from app.core.admission import AdmissionLimiter
+from app.core.config import settings
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_limiter_queues_then_sheds():
+    async def scenario():
+        limiter = AdmissionLimiter("read", concurrency=1, max_queue=1, max_wait_seconds=5)
+        assert await limiter.acquire()
+        queued = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.waiting == 1
+        # Queue full: refused without waiting
+        assert await limiter.acquire() is False
+        limiter.release(0.01)
+        assert await queued is True
+        assert limiter.in_flight == 1
+        limiter.release(0.01)
+        assert limiter.in_flight == 0
+        return limiter.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["admitted"] == 2
+    assert stats["rejected"]["queue_full"] == 1
+
+
+def test_limiter_refuses_when_estimated_wait_exceeds_deadline():
+    async def scenario():
+        limiter = AdmissionLimiter("write", concurrency=1, max_queue=10, max_wait_seconds=0.5)
+        limiter.avg_service_seconds = 1.0
+        assert await limiter.acquire()
+        assert await limiter.acquire() is False
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.rejected["deadline"] == 1
+    assert limiter.waiting == 0
+    assert limiter.retry_after() == 1
+
+
+def test_limiter_times_out_waiters():
+    async def scenario():
+        limiter = AdmissionLimiter("read", concurrency=1, max_queue=10, max_wait_seconds=0.05)
+        assert await limiter.acquire()
+        assert await limiter.acquire() is False
+        # The timed-out waiter doesn't take the slot when it frees up
+        limiter.release(0.0)
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.rejected["timeout"] == 1
+    assert limiter.in_flight == 0
+
+
+def test_middleware_returns_503_with_retry_after():
+    small = FastAPI()
+    reads = AdmissionLimiter("read", concurrency=1, max_queue=0, max_wait_seconds=1)
+    writes = AdmissionLimiter("write", concurrency=1, max_queue=0, max_wait_seconds=1)
+    small.add_middleware(AdmissionControlMiddleware, read_limiter=reads, write_limiter=writes)
+    release = asyncio.Event()
+
+    @small.get("/slow")
+    async def slow():
+        await release.wait()
+        return {}
+
+    @small.post("/slow")
+    async def write():
+        return {}
+
+    @small.get("/health")
+    async def health():
+        return {}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=small)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            first = asyncio.create_task(http.get("/slow"))
+            while reads.in_flight == 0:
+                await asyncio.sleep(0.001)
+            shed = await http.get("/slow")
+            # Writes and exempt paths have their own budget
+            write_response = await http.post("/slow")
+            health_response = await http.get("/health")
+            release.set()
+            return shed, await first, write_response, health_response
+
+    shed, first, write_response, health_response = asyncio.run(scenario())
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "1"
+    assert first.status_code == 200
+    assert write_response.status_code == 200
+    assert health_response.status_code == 200
+    assert reads.in_flight == 0
+
+
+def test_readiness_endpoint(monkeypatch):
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "healthy"
+    assert {"read", "write", "upload"} == set(body["admission"])
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "ops")
+    assert client.get("/internal/admission", headers={"X-Profile-Token": "ops"}).json()["enabled"] is True
+
+
+def test_readiness_tolerates_a_short_admission_queue(monkeypatch):
+    limiter = AdmissionLimiter("write", concurrency=1, max_queue=10, max_wait_seconds=1)
+    monkeypatch.setattr(health, "write_limiter", limiter)
+    # One queued request is a burst, not a reason to leave the rotation
+    limiter._waiters.append(object())
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
+
+    # 9 of 10 queue slots taken
+    limiter._waiters.extend(object() for _ in range(8))
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "degraded"
+
+
+def test_slow_uploads_do_not_take_write_slots():
+    small = FastAPI()
+    reads = AdmissionLimiter("read", concurrency=1, max_queue=0, max_wait_seconds=1)
+    writes = AdmissionLimiter("write", concurrency=1, max_queue=0, max_wait_seconds=1)
+    uploads = AdmissionLimiter("upload", concurrency=1, max_queue=0, max_wait_seconds=1)
+    small.add_middleware(AdmissionControlMiddleware, read_limiter=reads, write_limiter=writes,
+                         upload_limiter=uploads)
+    release = asyncio.Event()
+
+    @small.post("/notes/{note_id}/media")
+    async def upload(note_id: int):
+        await release.wait()
+        return {}
+
+    @small.post("/notes/")
+    async def create():
+        return {}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=small)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            streaming = asyncio.create_task(http.post("/notes/1/media", content=b"data"))
+            while uploads.in_flight == 0:
+                await asyncio.sleep(0.001)
+            note = await http.post("/notes/")
+            second_upload = await http.post("/notes/1/media", content=b"data")
+            release.set()
+            return note, second_upload, await streaming
+
+    note, second_upload, streaming = asyncio.run(scenario())
+    assert note.status_code == 200
+    # Uploads are limited by their own budget
+    assert second_upload.status_code == 503
+    assert streaming.status_code == 200
+    assert writes.in_flight == 0 and uploads.in_flight == 0
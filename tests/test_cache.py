@@ -0,0 +1,57 @@
+# tests/test_cache.py
+from app.core.cache import LRUCache
+from app.api.etag import etag_matches, make_etag
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_cache_hit_and_miss():
+    cache = LRUCache(max_entries=2, ttl_seconds=60)
+    assert cache.get("a") is None
+    cache.set("a", b"1")
+    assert cache.get("a") == b"1"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    cache.get("a")
+    cache.set("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_cache_expires_entries():
+    clock = FakeClock()
+    cache = LRUCache(max_entries=10, ttl_seconds=5, clock=clock)
+    cache.set("a", b"1")
+    clock.now = 4.9
+    assert cache.get("a") == b"1"
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_cache_disabled_with_zero_entries():
+    cache = LRUCache(max_entries=0, ttl_seconds=60)
+    cache.set("a", b"1")
+    assert cache.get("a") is None
+
+
+def test_etag_matching():
+    etag = make_etag(b"body")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches(make_etag(b"other"), etag)
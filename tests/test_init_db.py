@@ -0,0 +1,73 @@
+# tests/test_init_db.py
+import os
+import tempfile
+import time
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.db import init_db as init_db_module
+from app.db.init_db import init_db, wait_for_db
+from app.models import User
+
+
+@pytest.fixture
+def engine():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    test_engine = create_engine(f"sqlite:///{path}")
+    yield test_engine
+    test_engine.dispose()
+    os.remove(path)
+
+
+def test_init_db_creates_schema_and_seeds_once(engine):
+    init_db(engine)
+    phases = init_db(engine)
+    assert set(phases) == {"connect", "create_all", "seed"}
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(User)).scalar() == 1
+        assert conn.execute(select(User.username).where(User.id == 1)).scalar() == "default"
+
+
+def test_init_db_can_skip_create_all(engine):
+    init_db(engine)
+    assert "create_all" not in init_db(engine, create_all=False)
+
+
+def test_init_db_within_startup_budget(engine):
+    start = time.perf_counter()
+    init_db(engine)
+    assert time.perf_counter() - start < settings.STARTUP_BUDGET_SECONDS
+
+
+class FlakyEngine:
+    """Fails to connect a fixed number of times before delegating to a real engine."""
+
+    def __init__(self, engine, failures):
+        self.engine = engine
+        self.failures = failures
+        self.attempts = 0
+
+    def connect(self):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise OperationalError("SELECT 1", {}, Exception("connection refused"))
+        return self.engine.connect()
+
+
+def test_wait_for_db_retries_with_backoff(engine, monkeypatch):
+    delays = []
+    monkeypatch.setattr(init_db_module.time, "sleep", delays.append)
+    flaky = FlakyEngine(engine, failures=2)
+    wait_for_db(flaky, retries=3, backoff=0.5)
+    assert flaky.attempts == 3
+    assert delays == [0.5, 1.0]
+
+
+def test_wait_for_db_gives_up(engine, monkeypatch):
+    monkeypatch.setattr(init_db_module.time, "sleep", lambda _: None)
+    with pytest.raises(OperationalError):
+        wait_for_db(FlakyEngine(engine, failures=5), retries=2, backoff=0.1)
@@ -0,0 +1,155 @@
+# tests/test_media.py
+import os
+import shutil
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.db.session import get_db
+from app.main import app
+from app.models import Note
+from app.services.media_storage import LocalFileStorage, get_storage
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def media_env(sqlite_app, monkeypatch):
+    sqlite_app(seed=lambda db: db.add(Note(id=1, title="With media", content="", user_id=1)))
+    storage_root = tempfile.mkdtemp()
+    storage = LocalFileStorage(storage_root)
+    # Small chunks so multi-chunk streaming is exercised
+    monkeypatch.setattr(settings, "MEDIA_CHUNK_SIZE", 1024)
+    app.dependency_overrides[get_storage] = lambda: storage
+    yield storage
+    app.dependency_overrides.pop(get_storage, None)
+    shutil.rmtree(storage_root)
+
+
+def _blob_files(storage):
+    return [name for _, _, files in os.walk(os.path.join(storage.root, "blobs")) for name in files]
+
+
+def _upload(data: bytes, filename="photo.png", content_type="image/png"):
+    return client.post(
+        "/notes/1/media",
+        params={"filename": filename},
+        content=data,
+        headers={"Content-Type": content_type},
+    )
+
+
+def test_upload_and_download(media_env):
+    data = os.urandom(5000)
+    response = _upload(data)
+    assert response.status_code == 201
+    media = response.json()
+    assert media["size"] == 5000
+    assert media["mime_type"] == "image/png"
+    assert media["file_path"] == "photo.png"
+
+    download = client.get(f"/media/{media['id']}/content")
+    assert download.status_code == 200
+    assert download.content == data
+    assert download.headers["content-type"] == "image/png"
+    assert download.headers["etag"] == f'"{media["sha256"]}"'
+    assert "immutable" in download.headers["cache-control"]
+    assert download.headers["accept-ranges"] == "bytes"
+
+
+def test_download_disposition(media_env):
+    image = _upload(b"png bytes").json()
+    page = _upload(b"<script>alert(1)</script>", filename="page.html", content_type="text/html").json()
+    svg = _upload(b"<svg onload='alert(1)'/>", filename="x.svg", content_type="image/svg+xml").json()
+
+    response = client.get(f"/media/{image['id']}/content")
+    assert response.headers["content-disposition"].startswith("inline;")
+    assert response.headers["x-content-type-options"] == "nosniff"
+    for media in (page, svg):
+        response = client.get(f"/media/{media['id']}/content")
+        assert response.headers["content-disposition"].startswith("attachment;")
+        assert response.headers["x-content-type-options"] == "nosniff"
+
+
+def test_identical_uploads_share_one_blob(media_env):
+    data = b"same bytes" * 500
+    first = _upload(data, filename="a.txt", content_type="text/plain").json()
+    second = _upload(data, filename="b.txt", content_type="text/plain").json()
+    assert first["id"] != second["id"]
+    assert first["sha256"] == second["sha256"]
+    assert _blob_files(media_env) == [first["sha256"]]
+    # Staging files are cleaned up
+    assert os.listdir(media_env.tmp_dir) == []
+
+
+def test_download_range(media_env):
+    data = bytes(range(256)) * 20
+    media = _upload(data).json()
+    response = client.get(f"/media/{media['id']}/content", headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.content == data[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(data)}"
+
+
+def test_download_not_modified(media_env):
+    media = _upload(b"cache me").json()
+    etag = client.get(f"/media/{media['id']}/content").headers["etag"]
+    response = client.get(f"/media/{media['id']}/content", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_upload_too_large(media_env, monkeypatch):
+    monkeypatch.setattr(settings, "MEDIA_MAX_BYTES", 2048)
+    # Rejected up front from Content-Length
+    assert _upload(os.urandom(4096)).status_code == 413
+
+    # Chunked upload without a length: rejected mid-stream, staging file removed
+    def chunks():
+        for _ in range(4):
+            yield os.urandom(1024)
+    response = client.post("/notes/1/media", params={"filename": "big.bin"}, content=chunks())
+    assert response.status_code == 413
+    assert _blob_files(media_env) == []
+    assert os.listdir(media_env.tmp_dir) == []
+
+
+def test_upload_does_not_hold_a_connection_while_streaming(media_env):
+    db = next(app.dependency_overrides[get_db]())
+    pool = db.get_bind().pool
+    checked_out = []
+
+    def chunks():
+        for _ in range(3):
+            checked_out.append(pool.checkedout())
+            yield os.urandom(1024)
+    response = client.post("/notes/1/media", params={"filename": "slow.bin"}, content=chunks())
+    db.close()
+    assert response.status_code == 201
+    assert checked_out[1:] == [0, 0]
+
+
+def test_upload_to_unknown_note(media_env):
+    response = client.post("/notes/999/media", params={"filename": "x.bin"}, content=b"data")
+    assert response.status_code == 404
+
+
+def test_media_included_with_note(media_env):
+    media = _upload(b"embedded", filename="doc.txt", content_type="text/plain").json()
+    note = client.get("/notes/1", params={"include": "media"}).json()
+    assert note["media"] == [media]
+
+
+def test_delete_media(media_env):
+    media = _upload(b"detach me").json()
+    assert client.delete(f"/notes/999/media/{media['id']}").status_code == 404
+    response = client.delete(f"/notes/1/media/{media['id']}")
+    assert response.status_code == 200
+    assert response.json() == media
+    assert client.get(f"/media/{media['id']}").status_code == 404
+    assert client.delete(f"/notes/1/media/{media['id']}").status_code == 404
+    assert client.get("/notes/1/stats").json()["media_count"] == 0
+    # The blob is kept for any other media row with the same content
+    assert _blob_files(media_env) == [media["sha256"]]
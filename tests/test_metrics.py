@@ -0,0 +1,50 @@
+# tests/test_metrics.py
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services.note_cache import note_cache
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def instrumented_db(sqlite_app):
+    sqlite_app(instrument=True)
+    note_cache.clear()
+    yield
+    note_cache.clear()
+
+
+def _sample(body: str, prefix: str) -> float:
+    for line in body.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{prefix} not found")
+
+
+def test_metrics_endpoint_reports_route_latency_and_queries(instrumented_db):
+    note_id = client.post("/notes/", json={"title": "Metered", "user_id": 1}).json()["id"]
+    client.get(f"/notes/{note_id}")
+
+    body = client.get("/metrics").text
+    route = 'method="GET",route="/notes/{note_id}"'
+    assert _sample(body, f'http_requests_total{{{route},status="200"}}') >= 1
+    assert _sample(body, f"http_request_duration_seconds_count{{{route}}}") >= 1
+    # The cache miss issued exactly one SELECT
+    assert _sample(body, f'http_request_db_queries_bucket{{{route},le="1"}}') >= 1
+    assert "db_pool_checkout_wait_seconds_count" in body
+    assert 'note_cache_events_total{event="misses"}' in body
+    assert 'admission_waiting{class="upload"}' in body
+    # Only app.serve workers have an id to report
+    assert "app_worker_info" not in body
+
+
+def test_request_over_query_threshold_logs_statements(instrumented_db, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "MAX_QUERIES_PER_REQUEST", 0)
+    with caplog.at_level(logging.WARNING, logger="app.api.middleware"):
+        client.get("/notes/")
+    assert any("slow request GET /notes/" in r.message and "FROM notes" in r.message for r in caplog.records)
@@ -1,15 +1,18 @@
 # tests/test_notes_api.py
+import json
 import pytest
 import tempfile
 import os
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, select
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
 # Import all models to ensure Base.metadata has all table definitions
 from app.models import Base, Note, User, Link, Media
 from app.db.session import get_db
+from app.services.note_cache import note_cache
+from app.core.config import settings
 
 
 # ----------------------
@@ -56,6 +59,9 @@ def setup_db():
     """
     global engine, TestingSessionLocal
     
+    # Cached notes from a previous test would shadow the fresh database
+    note_cache.clear()
+
     # Create a fresh database file for each test
     test_db_url = get_test_db_url()
     
@@ -102,6 +108,8 @@ def setup_db():
     db_cleanup = TestingSessionLocal()
     try:
         # Delete all data first (in reverse order of foreign key dependencies)
+        db_cleanup.query(Link).delete()
+        db_cleanup.query(Media).delete()
         db_cleanup.query(Note).delete()
         db_cleanup.query(User).delete()
         db_cleanup.commit()
@@ -172,4 +180,609 @@ def test_delete_note_success(setup_db):
     response = client.delete(f"/notes/{note_id}")
     assert response.status_code == 200  # or 204 if your API uses No Content
     get_response = client.get(f"/notes/{note_id}")
-    assert get_response.status_code == 404
\ No newline at end of file
+    assert get_response.status_code == 404
+
+
+def test_get_notes_keyset_pagination(setup_db):
+    for i in range(5):
+        client.post("/notes/", json={"title": f"Note {i}", "content": "A", "user_id": 1})
+    first = client.get("/notes/", params={"limit": 2})
+    assert first.status_code == 200
+    assert [n["title"] for n in first.json()] == ["Note 0", "Note 1"]
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get("/notes/", params={"limit": 2, "after": cursor})
+    assert [n["title"] for n in second.json()] == ["Note 2", "Note 3"]
+
+    last = client.get("/notes/", params={"limit": 2, "after": second.headers["X-Next-Cursor"]})
+    assert [n["title"] for n in last.json()] == ["Note 4"]
+    assert "X-Next-Cursor" not in last.headers
+
+
+def test_get_notes_invalid_cursor(setup_db):
+    response = client.get("/notes/", params={"after": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_get_notes_limit_above_max(setup_db):
+    response = client.get("/notes/", params={"limit": 100000})
+    assert response.status_code == 422
+
+
+def _add_second_user():
+    db = TestingSessionLocal()
+    db.add(User(id=2, username="other", email="other@test.com"))
+    db.commit()
+    db.close()
+
+
+def test_get_user_notes(setup_db):
+    _add_second_user()
+    for i in range(3):
+        client.post("/notes/", json={"title": f"Mine {i}", "content": "A", "user_id": 1})
+        client.post("/notes/", json={"title": f"Theirs {i}", "content": "A", "user_id": 2})
+    first = client.get("/users/2/notes", params={"limit": 2})
+    assert first.status_code == 200
+    assert [n["title"] for n in first.json()] == ["Theirs 0", "Theirs 1"]
+    rest = client.get("/users/2/notes", params={"limit": 2, "after": first.headers["X-Next-Cursor"]})
+    assert [n["title"] for n in rest.json()] == ["Theirs 2"]
+    assert "X-Next-Cursor" not in rest.headers
+
+    filtered = client.get("/notes/", params={"user_id": 1})
+    assert [n["title"] for n in filtered.json()] == ["Mine 0", "Mine 1", "Mine 2"]
+
+
+def test_get_user_notes_unknown_user(setup_db):
+    response = client.get("/users/999/notes")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "User not found"
+
+
+def test_user_notes_query_uses_owner_index(setup_db):
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT id FROM notes WHERE user_id = 1 AND id > 0 ORDER BY id LIMIT 10"
+        ).all()
+    assert any("ix_notes_user_id_id" in row[-1] for row in plan)
+
+
+def test_export_notes_ndjson(setup_db):
+    ids = [client.post("/notes/", json={"title": f"Export {i}", "content": "E", "user_id": 1}).json()["id"] for i in range(3)]
+    db = TestingSessionLocal()
+    db.add(Link(url="https://example.com", note_id=ids[0]))
+    db.commit()
+    db.close()
+
+    response = client.get("/notes/export", params={"include": "links"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["id"] for r in rows] == ids
+    assert rows[0]["links"][0]["url"] == "https://example.com"
+    assert rows[1]["links"] == []
+
+    resumed = client.get("/notes/export", params={"since_id": ids[0]})
+    assert [json.loads(line)["id"] for line in resumed.text.splitlines()] == ids[1:]
+
+
+def test_export_notes_unknown_include(setup_db):
+    response = client.get("/notes/export", params={"include": "owners"})
+    assert response.status_code == 400
+
+
+def test_search_notes_ranked(setup_db):
+    client.post("/notes/", json={"title": "Gardening", "content": "Tomatoes need sun", "user_id": 1})
+    client.post("/notes/", json={"title": "Tomatoes", "content": "Tomatoes and basil", "user_id": 1})
+    client.post("/notes/", json={"title": "Cooking", "content": "Pasta night", "user_id": 1})
+
+    response = client.get("/notes/search", params={"q": "tomatoes"})
+    assert response.status_code == 200
+    hits = response.json()
+    # The title match ranks above the content-only match
+    assert [h["title"] for h in hits] == ["Tomatoes", "Gardening"]
+    assert "<mark>" in hits[0]["snippet"]
+
+
+def test_search_snippet_escapes_note_content(setup_db):
+    client.post("/notes/", json={"title": "Markup", "content": 'tomatoes <img src=x onerror="alert(1)"> & co', "user_id": 1})
+    snippet = client.get("/notes/search", params={"q": "tomatoes"}).json()[0]["snippet"]
+    assert "<img" not in snippet
+    assert "&lt;img" in snippet and "&amp;" in snippet
+    assert "<mark>tomatoes</mark>" in snippet
+
+
+def test_search_notes_tracks_updates_and_deletes(setup_db):
+    note_id = client.post("/notes/", json={"title": "Draft", "content": "alpha", "user_id": 1}).json()["id"]
+    client.put(f"/notes/{note_id}", json={"content": "omega"})
+    assert client.get("/notes/search", params={"q": "alpha"}).json() == []
+    assert [h["id"] for h in client.get("/notes/search", params={"q": "omega"}).json()] == [note_id]
+
+    client.delete(f"/notes/{note_id}")
+    assert client.get("/notes/search", params={"q": "omega"}).json() == []
+
+
+def test_search_notes_treats_query_syntax_literally(setup_db):
+    client.post("/notes/", json={"title": "Quotes", "content": 'say "hello" AND bye', "user_id": 1})
+    response = client.get("/notes/search", params={"q": '"hello AND'})
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+
+
+def test_batch_create_reports_per_item_errors(setup_db):
+    response = client.post("/notes/batch", json=[
+        {"title": "B1", "content": "one", "user_id": 1},
+        {"title": "B2", "content": "two", "user_id": 999},
+        {"title": "B3", "user_id": 1},
+    ])
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == [200, 400, 200]
+    assert "not found" in results[1]["detail"]
+    assert results[0]["note"]["title"] == "B1"
+    assert results[2]["note"]["id"] > results[0]["note"]["id"]
+    assert len(client.get("/notes/").json()) == 2
+
+
+def test_batch_update_and_delete(setup_db):
+    created = client.post("/notes/batch", json=[
+        {"title": "U1", "content": "a", "user_id": 1},
+        {"title": "U2", "content": "b", "user_id": 1},
+    ]).json()["results"]
+    ids = [r["note"]["id"] for r in created]
+
+    updated = client.patch("/notes/batch", json=[
+        {"id": ids[0], "title": "U1 edited"},
+        {"id": 999, "title": "Missing"},
+        {"id": ids[1], "content": "b edited"},
+    ]).json()["results"]
+    assert [r["status"] for r in updated] == [200, 404, 200]
+    assert updated[0]["note"]["title"] == "U1 edited"
+    assert updated[0]["note"]["content"] == "a"
+    assert updated[2]["note"]["content"] == "b edited"
+
+    deleted = client.request("DELETE", "/notes/batch", json=[ids[0], 999]).json()["results"]
+    assert [r["status"] for r in deleted] == [200, 404]
+    assert client.get(f"/notes/{ids[0]}").status_code == 404
+    assert client.get(f"/notes/{ids[1]}").status_code == 200
+
+
+def test_batch_update_repeated_id_last_content_wins(setup_db):
+    target = _create("Elsewhere")
+    note = _create("Twice", "first draft of the note")
+    updated = client.patch("/notes/batch", json=[
+        {"id": note["id"], "content": "second draft [[Elsewhere]]"},
+        {"id": note["id"], "content": "final draft of the note body"},
+    ])
+    assert updated.status_code == 200
+    assert [r["status"] for r in updated.json()["results"]] == [200, 200]
+    assert client.get(f"/notes/{note['id']}").json()["content"] == "final draft of the note body"
+    assert client.get(f"/notes/{target['id']}/backlinks").json() == []
+    copy = _create("Copy", "final draft of the note body")
+    assert [hit["id"] for hit in client.get(f"/notes/{copy['id']}/similar").json()] == [note["id"]]
+
+
+def test_batch_rejects_oversized_payload(setup_db):
+    payload = [{"title": "x", "user_id": 1}] * (settings.NOTES_BATCH_MAX_SIZE + 1)
+    assert client.post("/notes/batch", json=payload).status_code == 422
+
+
+def test_get_note_etag_not_modified(setup_db):
+    note_id = client.post("/notes/", json={"title": "Cached", "content": "C", "user_id": 1}).json()["id"]
+    first = client.get(f"/notes/{note_id}")
+    etag = first.headers["ETag"]
+
+    second = client.get(f"/notes/{note_id}", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == etag
+
+
+def test_get_note_cache_invalidated_on_update(setup_db):
+    note_id = client.post("/notes/", json={"title": "Before", "content": "C", "user_id": 1}).json()["id"]
+    etag = client.get(f"/notes/{note_id}").headers["ETag"]
+    hits = note_cache.stats()["hits"]
+    client.get(f"/notes/{note_id}")
+    assert note_cache.stats()["hits"] == hits + 1
+
+    client.put(f"/notes/{note_id}", json={"title": "After"})
+    response = client.get(f"/notes/{note_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "After"
+    assert response.headers["ETag"] != etag
+
+
+def test_get_note_does_not_cache_a_row_updated_during_the_read(setup_db, monkeypatch):
+    from app.schemas.schemas import NoteUpdate
+    from app.services import notes_service
+    note_id = client.post("/notes/", json={"title": "Before", "user_id": 1}).json()["id"]
+    read_row = notes_service.get_note_by_id
+
+    def read_then_update(db, note_id, *args, **kwargs):
+        row = read_row(db, note_id, *args, **kwargs)
+        # An update commits and invalidates after the SELECT, before the cache fill
+        with TestingSessionLocal() as other:
+            notes_service.update_note(other, note_id, NoteUpdate(title="After"))
+        return row
+
+    monkeypatch.setattr(notes_service, "get_note_by_id", read_then_update)
+    assert client.get(f"/notes/{note_id}").json()["title"] == "Before"
+    monkeypatch.undo()
+    assert client.get(f"/notes/{note_id}").json()["title"] == "After"
+
+
+def test_get_notes_list_etag(setup_db):
+    client.post("/notes/", json={"title": "Listed", "user_id": 1})
+    etag = client.get("/notes/").headers["ETag"]
+    assert client.get("/notes/", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/notes/", json={"title": "Listed too", "user_id": 1})
+    assert client.get("/notes/", headers={"If-None-Match": etag}).status_code == 200
+
+
+def _seed_notes_with_relations(count):
+    db = TestingSessionLocal()
+    for i in range(count):
+        note = Note(title=f"Rel {i}", content="R", user_id=1)
+        db.add(note)
+        db.flush()
+        db.add_all([
+            Link(url=f"https://example.com/{i}/a", note_id=note.id),
+            Link(url=f"https://example.com/{i}/b", note_id=note.id),
+            Media(file_path=f"/media/{i}.png", note_id=note.id),
+        ])
+    db.commit()
+    db.close()
+
+
+def _capture_statements(fn):
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return response, statements
+
+
+def _count_queries(fn):
+    response, statements = _capture_statements(fn)
+    return response, len(statements)
+
+
+def test_get_notes_include_relations(setup_db):
+    _seed_notes_with_relations(2)
+    response = client.get("/notes/", params={"include": "links,media"})
+    assert response.status_code == 200
+    notes = response.json()
+    assert [len(n["links"]) for n in notes] == [2, 2]
+    assert notes[0]["media"][0]["file_path"] == "/media/0.png"
+
+    plain = client.get("/notes/").json()
+    assert "links" not in plain[0] and "media" not in plain[0]
+
+    detail = client.get(f"/notes/{notes[1]['id']}", params={"include": "media"}).json()
+    assert detail["media"][0]["file_path"] == "/media/1.png"
+    assert "links" not in detail
+
+
+def test_get_notes_include_query_count_constant(setup_db):
+    _seed_notes_with_relations(20)
+    small, small_queries = _count_queries(lambda: client.get("/notes/", params={"include": "links,media", "limit": 2}))
+    large, large_queries = _count_queries(lambda: client.get("/notes/", params={"include": "links,media", "limit": 20}))
+    assert len(small.json()) == 2 and len(large.json()) == 20
+    # One query for the notes plus one per relationship, regardless of page size
+    assert small_queries == large_queries == 3
+
+
+def test_update_note_rejects_null_title(setup_db):
+    note_id = client.post("/notes/", json={"title": "Keep", "user_id": 1}).json()["id"]
+    response = client.put(f"/notes/{note_id}", json={"title": None})
+    assert response.status_code == 400
+    assert client.get(f"/notes/{note_id}").json()["title"] == "Keep"
+
+
+def test_delete_note_detaches_links_and_media(setup_db):
+    note_id = client.post("/notes/", json={"title": "Linked", "user_id": 1}).json()["id"]
+    other_id = client.post("/notes/", json={"title": "Also linked", "user_id": 1}).json()["id"]
+    db = TestingSessionLocal()
+    db.add_all([
+        Link(url="https://example.com", note_id=note_id),
+        Link(url="https://example.org", note_id=other_id),
+        Media(file_path="a.png", note_id=other_id),
+    ])
+    db.commit()
+    assert client.delete(f"/notes/{note_id}").status_code == 200
+    assert client.get(f"/notes/{note_id}").status_code == 404
+    deleted = client.request("DELETE", "/notes/batch", json=[other_id]).json()["results"]
+    assert deleted[0]["status"] == 200
+    # Like the ORM cascade did, the rows stay with no note
+    assert db.scalars(select(Link.note_id)).all() == [None, None]
+    assert db.scalars(select(Media.note_id)).all() == [None]
+    db.close()
+
+
+def test_changes_feed(setup_db):
+    initial = client.get("/notes/changes").json()
+    assert initial["changes"] == [] and initial["has_more"] is False
+
+    a = client.post("/notes/", json={"title": "A", "content": "1", "user_id": 1}).json()
+    b = client.post("/notes/", json={"title": "B", "content": "1", "user_id": 1}).json()
+    full = client.get("/notes/changes").json()
+    assert [(c["id"], c["op"]) for c in full["changes"]] == [(a["id"], "upsert"), (b["id"], "upsert")]
+    token = full["next"]
+
+    # Nothing new: same token back
+    assert client.get("/notes/changes", params={"since": token}).json()["next"] == token
+
+    client.put(f"/notes/{a['id']}", json={"title": "A2"})
+    client.put(f"/notes/{a['id']}", json={"title": "A3"})
+    client.delete(f"/notes/{b['id']}")
+    delta = client.get("/notes/changes", params={"since": token}).json()
+    # Compacted: two edits of A arrive once, with the latest body
+    assert delta["changes"] == [
+        {"id": a["id"], "op": "upsert", "note": {**a, "title": "A3"}},
+        {"id": b["id"], "op": "delete", "note": None},
+    ]
+
+
+def test_changes_feed_pagination(setup_db):
+    for i in range(5):
+        client.post("/notes/", json={"title": f"Note {i}", "content": "A", "user_id": 1})
+    seen, since = [], None
+    while True:
+        page = client.get("/notes/changes", params={"limit": 2, **({"since": since} if since else {})}).json()
+        seen += [c["note"]["title"] for c in page["changes"]]
+        since = page["next"]
+        if not page["has_more"]:
+            break
+    assert seen == [f"Note {i}" for i in range(5)]
+
+
+def test_changes_feed_invalid_token(setup_db):
+    assert client.get("/notes/changes", params={"since": "garbage"}).status_code == 400
+
+
+def test_changes_feed_orders_by_transaction(setup_db):
+    from app.models import NoteChange
+    from app.services.pagination import encode_cursor
+    a, b, c = (_create(title) for title in ("A", "B", "C"))
+    db = TestingSessionLocal()
+    # As on PostgreSQL: B took its seq after C but its transaction started first
+    for note, txid in ((a, 100), (b, 105), (c, 110)):
+        db.query(NoteChange).filter(NoteChange.note_id == note["id"]).update({"txid": txid})
+    db.query(NoteChange).filter(NoteChange.note_id == b["id"]).update({"seq": 99})
+    db.commit()
+    db.close()
+    page = client.get("/notes/changes", params={"limit": 2}).json()
+    assert [change["id"] for change in page["changes"]] == [a["id"], b["id"]]
+    rest = client.get("/notes/changes", params={"since": page["next"]}).json()
+    assert [change["id"] for change in rest["changes"]] == [c["id"]]
+    # A token from before txids carries only the seq and replays from there
+    old_token = client.get("/notes/changes", params={"since": encode_cursor(0)}).json()
+    assert len(old_token["changes"]) == 3
+
+
+def _create(title, content=""):
+    return client.post("/notes/", json={"title": title, "content": content, "user_id": 1}).json()
+
+
+def test_backlinks_by_id_and_title(setup_db):
+    target = _create("Target")
+    by_id = _create("By id", f"see [[{target['id']}]]")
+    by_title = _create("By title", "see [[Target]] and [[Nothing by this name]]")
+    _create("Unrelated", "no links")
+    response = client.get(f"/notes/{target['id']}/backlinks")
+    assert response.status_code == 200
+    assert [n["id"] for n in response.json()] == [by_id["id"], by_title["id"]]
+
+
+def test_backlinks_follow_content_updates(setup_db):
+    a, b = _create("A"), _create("B")
+    source = _create("Source", "[[A]]")
+    client.put(f"/notes/{source['id']}", json={"content": "[[B]] now"})
+    assert client.get(f"/notes/{a['id']}/backlinks").json() == []
+    assert [n["id"] for n in client.get(f"/notes/{b['id']}/backlinks").json()] == [source["id"]]
+    # Title-only updates leave the edges alone
+    client.put(f"/notes/{source['id']}", json={"title": "Renamed"})
+    assert len(client.get(f"/notes/{b['id']}/backlinks").json()) == 1
+    # Deleting the source drops its edges
+    client.delete(f"/notes/{source['id']}")
+    assert client.get(f"/notes/{b['id']}/backlinks").json() == []
+
+
+def test_backlinks_unknown_note(setup_db):
+    assert client.get("/notes/999/backlinks").status_code == 404
+
+
+def test_neighborhood(setup_db):
+    # a -> b -> c -> d, and e -> a
+    d = _create("d")
+    c = _create("c", "[[d]]")
+    b = _create("b", "[[c]]")
+    a = _create("a", "[[b]]")
+    e = _create("e", "[[a]]")
+    out = client.get(f"/notes/{a['id']}/neighborhood", params={"depth": 2, "direction": "out"}).json()
+    assert [(n["title"], n["depth"]) for n in out["nodes"]] == [("a", 0), ("b", 1), ("c", 2)]
+    assert out["edges"] == [
+        {"source_id": b["id"], "target_id": c["id"]},
+        {"source_id": a["id"], "target_id": b["id"]},
+    ]
+    far = client.get(f"/notes/{a['id']}/neighborhood", params={"depth": 3, "direction": "out"}).json()
+    assert {"id": d["id"], "title": "d", "depth": 3} in far["nodes"]
+    inbound = client.get(f"/notes/{a['id']}/neighborhood", params={"depth": 2, "direction": "in"}).json()
+    assert [(n["id"], n["depth"]) for n in inbound["nodes"]] == [(a["id"], 0), (e["id"], 1)]
+    assert inbound["edges"] == [{"source_id": e["id"], "target_id": a["id"]}]
+    both = client.get(f"/notes/{a['id']}/neighborhood", params={"depth": 1}).json()
+    assert {n["title"] for n in both["nodes"]} == {"a", "b", "e"}
+    assert both["truncated"] is False
+    assert client.get(f"/notes/{a['id']}/neighborhood", params={"depth": 99}).status_code == 422
+
+
+def test_link_queries_use_edge_indexes(setup_db):
+    with engine.connect() as conn:
+        backlinks = conn.exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT source_id FROM note_edges WHERE target_id = 1 ORDER BY source_id"
+        ).all()
+        outgoing = conn.exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT target_id FROM note_edges WHERE source_id = 1"
+        ).all()
+    assert any("ix_note_edges_target_source" in row[-1] for row in backlinks)
+    assert any("USING" in row[-1] and "INDEX" in row[-1] for row in outgoing)
+
+
+def test_user_stats_follow_note_writes(setup_db):
+    assert client.get("/users/1/stats").json() == {"user_id": 1, "note_count": 0}
+    notes = [_create(f"n{i}") for i in range(3)]
+    assert client.get("/users/1/stats").json()["note_count"] == 3
+    client.delete(f"/notes/{notes[0]['id']}")
+    assert client.get("/users/1/stats").json()["note_count"] == 2
+    # Moving a note between users moves the count with it
+    db = TestingSessionLocal()
+    db.add(User(id=2, username="other", email="other@test.com"))
+    db.flush()
+    db.query(Note).filter(Note.id == notes[1]["id"]).update({"user_id": 2})
+    db.commit()
+    db.close()
+    assert client.get("/users/1/stats").json()["note_count"] == 1
+    assert client.get("/users/2/stats").json()["note_count"] == 1
+    assert client.get("/users/999/stats").status_code == 404
+
+
+def test_user_stats_sum_counter_shards(setup_db):
+    from app.models import UserStats
+
+    _create("n0")
+    # What writers on other PostgreSQL connections leave behind, including a
+    # delete counted on a different shard than its insert
+    db = TestingSessionLocal()
+    db.add_all([UserStats(user_id=1, shard=3, note_count=2), UserStats(user_id=1, shard=7, note_count=-1)])
+    db.commit()
+    db.close()
+    assert client.get("/users/1/stats").json()["note_count"] == 2
+
+
+def test_note_stats_counts_links_media_and_backlinks(setup_db):
+    target = _create("Target")
+    _create("One", "[[Target]]")
+    two = _create("Two", "[[Target]]")
+    db = TestingSessionLocal()
+    db.add_all([Link(url="https://a.example", note_id=target["id"]), Link(url="https://b.example", note_id=target["id"])])
+    db.add(Media(file_path="f.png", note_id=target["id"]))
+    db.commit()
+    db.close()
+    assert client.get(f"/notes/{target['id']}/stats").json() == {
+        "note_id": target["id"], "link_count": 2, "media_count": 1, "backlink_count": 2,
+    }
+    # Edge removals, including cascades from a deleted source, are counted too
+    client.delete(f"/notes/{two['id']}")
+    assert client.get(f"/notes/{target['id']}/stats").json()["backlink_count"] == 1
+    assert client.get(f"/notes/{two['id']}/stats").status_code == 404
+    assert client.get(f"/notes/{_create('Plain')['id']}/stats").json()["link_count"] == 0
+
+
+def test_rebuild_stats_repairs_drift(setup_db):
+    from app.models import NoteStats, UserStats
+    from app.services import stats_service
+
+    target = _create("Target")
+    _create("Source", "[[Target]]")
+    db = TestingSessionLocal()
+    db.query(UserStats).update({"note_count": 42})
+    db.query(NoteStats).delete()
+    db.commit()
+    assert stats_service.rebuild_stats(db) == {"users": 1, "notes": 1}
+    db.close()
+    assert client.get("/users/1/stats").json()["note_count"] == 2
+    assert client.get(f"/notes/{target['id']}/stats").json()["backlink_count"] == 1
+
+
+def test_list_sparse_fields(setup_db):
+    _create("First", "long content " * 100)
+    response, statements = _capture_statements(lambda: client.get("/notes/", params={"fields": "title"}))
+    assert response.json() == [{"id": 1, "title": "First"}]
+    # The unrequested columns are not selected at all
+    assert not any("notes.content" in statement for statement in statements)
+    assert client.get("/users/1/notes", params={"fields": "user_id,title"}).json() == [
+        {"id": 1, "title": "First", "user_id": 1}
+    ]
+    # Naming every field is the same as naming none
+    full = client.get("/notes/", params={"fields": "id,title,content,user_id"}).json()
+    assert full == client.get("/notes/").json()
+
+
+def test_list_sparse_fields_with_include(setup_db):
+    _seed_notes_with_relations(2)
+    response, statements = _capture_statements(
+        lambda: client.get("/notes/", params={"fields": "id", "include": "links"})
+    )
+    body = response.json()
+    assert set(body[0]) == {"id", "links"}
+    assert len(body[0]["links"]) == 2
+    # Deferred columns are never lazy-loaded: notes plus one query for links
+    assert len(statements) == 2
+    assert not any("notes.title" in statement for statement in statements)
+
+
+def test_get_note_sparse_fields(setup_db):
+    note = _create("Detail", "body")
+    response, statements = _capture_statements(
+        lambda: client.get(f"/notes/{note['id']}", params={"fields": "title"})
+    )
+    assert response.json() == {"id": note["id"], "title": "Detail"}
+    assert len(statements) == 1 and "notes.content" not in statements[0]
+    assert client.get("/notes/999", params={"fields": "title"}).status_code == 404
+
+
+def test_unknown_field_rejected(setup_db):
+    response = client.get("/notes/", params={"fields": "title,secret"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown field: secret"
+
+SIMILAR_TEXT = (
+    "Quarterly planning meeting notes: agreed the roadmap for the mobile release, "
+    "moved the database index work to the next sprint, and assigned budget review "
+    "to finance. Customer feedback on sync latency needs a follow up with the backend team."
+)
+
+
+def test_similar_notes(setup_db):
+    original = _create("Planning", SIMILAR_TEXT)
+    near = _create("Planning (imported)", SIMILAR_TEXT + " Action items due Friday.")
+    _create("Recipe", "Whisk the eggs with sugar, fold in the flour and bake for forty minutes.")
+    empty = _create("Empty")
+    hits = client.get(f"/notes/{original['id']}/similar").json()
+    assert [hit["id"] for hit in hits] == [near["id"]]
+    assert 0.8 <= hits[0]["similarity"] < 1.0
+    # Editing the content re-indexes the note
+    client.put(f"/notes/{near['id']}", json={"content": "Completely different text about gardening tools."})
+    assert client.get(f"/notes/{original['id']}/similar").json() == []
+    assert client.get(f"/notes/{empty['id']}/similar").json() == []
+    assert client.get("/notes/999/similar").status_code == 404
+
+
+def test_similar_lookup_uses_bucket_index(setup_db):
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT DISTINCT note_id FROM note_lsh_bands WHERE bucket IN (1, 2, 3) AND note_id != 1"
+        ).all()
+    assert any("USING" in row[-1] and "INDEX" in row[-1] for row in plan)
+    assert not any(row[-1].startswith("SCAN note_lsh_bands") and "INDEX" not in row[-1] for row in plan)
+
+
+def test_rebuild_similarity_and_find_duplicates(setup_db):
+    from app.services import similarity
+
+    a = _create("A", SIMILAR_TEXT)
+    b = _create("B", SIMILAR_TEXT + " Action items due Friday.")
+    c = _create("C", "Action items due Friday. " + SIMILAR_TEXT)
+    _create("D", "Whisk the eggs with sugar, fold in the flour and bake for forty minutes.")
+    db = TestingSessionLocal()
+    try:
+        assert similarity.rebuild_signatures(db, workers=2, chunk_size=2) == 4
+        result = similarity.find_duplicates(db, threshold=0.8, workers=2, chunk_size=1)
+    finally:
+        db.close()
+    assert result["groups"] == [[a["id"], b["id"], c["id"]]]
+    assert result["duplicate_pairs"] >= 2
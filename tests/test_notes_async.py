@@ -0,0 +1,89 @@
+# tests/test_notes_async.py
+import os
+import tempfile
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+pytest.importorskip("aiosqlite")
+
+from app.api.routes import notes_async
+from app.db.session import get_async_db, to_async_url
+from app.models import Base, User
+from app.services.note_cache import note_cache
+
+
+@pytest.fixture
+def client():
+    note_cache.clear()
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=sync_engine)
+    with sync_engine.begin() as conn:
+        conn.execute(User.__table__.insert(), {"id": 1, "username": "testuser", "email": "test@test.com"})
+
+    # NullPool: aiosqlite connections must not outlive the event loop that opened them
+    async_engine = create_async_engine(to_async_url(f"sqlite:///{path}"), poolclass=NullPool)
+    AsyncTestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(notes_async.router)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    with TestClient(app) as test_client:
+        yield test_client
+
+    Base.metadata.drop_all(bind=sync_engine)
+    sync_engine.dispose()
+    os.remove(path)
+
+
+def test_to_async_url():
+    assert to_async_url("postgresql://u:p@db:5432/kb").startswith("postgresql+asyncpg://u:p@db")
+    assert to_async_url("postgresql+psycopg2://u:p@db/kb").startswith("postgresql+asyncpg://")
+    assert to_async_url("sqlite:///./x.db") == "sqlite+aiosqlite:///./x.db"
+
+
+def test_async_crud_roundtrip(client):
+    created = client.post("/notes/", json={"title": "Async", "content": "A", "user_id": 1})
+    assert created.status_code == 200
+    note_id = created.json()["id"]
+
+    assert client.get(f"/notes/{note_id}").json()["title"] == "Async"
+    updated = client.put(f"/notes/{note_id}", json={"title": "Async edited"})
+    assert updated.json()["title"] == "Async edited"
+    assert updated.json()["content"] == "A"
+
+    assert client.delete(f"/notes/{note_id}").json()["id"] == note_id
+    assert client.get(f"/notes/{note_id}").status_code == 404
+
+
+def test_async_create_invalid_user(client):
+    response = client.post("/notes/", json={"title": "Bad", "user_id": 999})
+    assert response.status_code == 400
+    assert "not found" in response.json()["detail"]
+
+
+def test_async_pagination(client):
+    for i in range(3):
+        client.post("/notes/", json={"title": f"Note {i}", "user_id": 1})
+    first = client.get("/notes/", params={"limit": 2})
+    assert len(first.json()) == 2
+    rest = client.get("/notes/", params={"limit": 2, "after": first.headers["X-Next-Cursor"]})
+    assert [n["title"] for n in rest.json()] == ["Note 2"]
+
+
+def test_async_sparse_fields(client):
+    created = client.post("/notes/", json={"title": "Sparse", "content": "body", "user_id": 1}).json()
+    assert client.get("/notes/", params={"fields": "title"}).json() == [{"id": created["id"], "title": "Sparse"}]
+    assert client.get(f"/notes/{created['id']}", params={"fields": "content"}).json() == {
+        "id": created["id"], "content": "body",
+    }
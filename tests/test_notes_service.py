@@ -7,9 +7,13 @@ from app.schemas.notes import NoteCreate, NoteUpdate
 from app.services.notes_service import (
     create_note,
     get_all_notes,
+    get_notes_page,
+    get_note_rows_page,
+    rows_to_dicts,
     get_note_by_id,
     update_note,
-    delete_note
+    delete_note,
+    create_notes_batch,
 )
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
@@ -66,6 +70,25 @@ def test_get_all_notes(db, test_note):
     assert any(n.id == test_note.id for n in notes)
 
 
+def test_get_notes_page_keyset(db, test_note):
+    create_note(db, NoteCreate(title="Page Note", content="Content", user_id=1))
+    first, next_id = get_notes_page(db, limit=1)
+    assert len(first) == 1
+    assert next_id == first[0].id
+    rest, _ = get_notes_page(db, limit=1000, after_id=next_id)
+    assert all(n.id > next_id for n in rest)
+
+
+def test_get_note_rows_page_matches_orm_page(db, test_note):
+    create_note(db, NoteCreate(title="Row Note", content="Content", user_id=1))
+    rows, next_id = get_note_rows_page(db, limit=1)
+    notes, orm_next_id = get_notes_page(db, limit=1)
+    assert next_id == orm_next_id
+    assert rows_to_dicts(rows) == [
+        {"id": n.id, "title": n.title, "content": n.content, "user_id": n.user_id} for n in notes
+    ]
+
+
 def test_get_note_by_id_success(db, test_note):
     note = get_note_by_id(db, test_note.id)
     assert note is not None
@@ -102,3 +125,12 @@ def test_delete_note_success(db, test_note):
 def test_delete_note_not_found(db):
     deleted_note = delete_note(db, 999)
     assert deleted_note is None
+
+
+def test_create_notes_batch_single_transaction(db):
+    notes = [NoteCreate(title=f"Batch {i}", content="c", user_id=1) for i in range(3)]
+    notes.append(NoteCreate(title="Orphan", content="c", user_id=999))
+    results = create_notes_batch(db, notes)
+    assert [r["status"] for r in results] == [200, 200, 200, 400]
+    for r in results[:3]:
+        assert get_note_by_id(db, r["note"]["id"]).title == r["note"]["title"]
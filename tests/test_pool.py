@@ -0,0 +1,95 @@
+# tests/test_pool.py
+import os
+import tempfile
+import threading
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.core.metrics import Histogram
+from app.db.pool_metrics import InstrumentedQueuePool, PoolMetrics, instrument_pool, pool_metrics, pool_status
+from app.db.session import engine_options
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_engine_options_sizes_pool_for_server_databases():
+    options = engine_options("postgresql://u:p@db:5432/kb")
+    assert {"pool_size", "max_overflow", "pool_timeout", "pool_recycle", "pool_pre_ping"} <= set(options)
+
+
+def test_engine_options_skip_sizing_for_in_memory_sqlite():
+    options = engine_options("sqlite:///:memory:")
+    assert "pool_size" not in options
+
+
+def test_histogram_cumulative_buckets():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"0.1": 1, "1.0": 3, "+Inf": 4}
+    assert snapshot["count"] == 4
+
+
+def test_pool_events_feed_metrics():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    test_engine = create_engine(f"sqlite:///{path}", poolclass=InstrumentedQueuePool, pool_size=2, max_overflow=0)
+    metrics = PoolMetrics()
+    instrument_pool(test_engine, metrics)
+    waits_before = pool_metrics.checkout_wait.snapshot()["count"]
+    try:
+        with test_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            assert pool_status(test_engine)["checkedout"] == 1
+        with test_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    finally:
+        test_engine.dispose()
+        os.remove(path)
+    assert metrics.connects == 1
+    assert metrics.checkouts == 2
+    assert metrics.checkins == 2
+    assert metrics.connect_latency.snapshot()["count"] == 1
+    assert pool_metrics.checkout_wait.snapshot()["count"] == waits_before + 2
+
+
+def test_pool_metrics_counters_are_thread_safe():
+    metrics = PoolMetrics()
+
+    def checkouts():
+        for _ in range(10000):
+            metrics.increment("checkouts")
+    threads = [threading.Thread(target=checkouts) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert metrics.snapshot()["checkouts"] == 80000
+
+
+def test_internal_endpoints_require_the_token(monkeypatch):
+    paths = ("/internal/pool", "/internal/cache", "/internal/writes", "/internal/admission")
+    # Without a configured token nothing under /internal can be read
+    assert all(client.get(path).status_code == 403 for path in paths)
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "ops")
+    for path in paths:
+        assert client.get(path).status_code == 403
+        assert client.get(path, headers={"X-Profile-Token": "guess"}).status_code == 403
+        assert client.get(path, headers={"X-Profile-Token": "ops"}).status_code == 200
+
+
+def test_internal_pool_endpoint(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "ops")
+    response = client.get("/internal/pool", headers={"X-Profile-Token": "ops"})
+    assert response.status_code == 200
+    body = response.json()
+    assert {"config", "status", "metrics"} <= set(body)
+    assert "checkout_wait_seconds" in body["metrics"]
+
+
+def test_health_endpoint():
+    assert client.get("/health").json() == {"status": "healthy"}
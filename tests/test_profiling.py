@@ -0,0 +1,117 @@
+# tests/test_profiling.py
+import os
+import time
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.middleware import ProfilingMiddleware, RequestMetricsMiddleware
+from app.api.routes import notes
+from app.api.routing import ProfiledRoute
+from app.core.config import settings
+from app.core.profiling import ProfileStore, Sampler
+from app.db.session import get_db, get_read_db
+from app.main import app
+from app.models import Note
+
+TOKEN = "let-me-see"
+
+
+def spin_sync(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def spin_async(seconds):
+    spin_sync(seconds)
+
+
+@pytest.fixture
+def profiled_app(sqlite_app):
+    router = APIRouter(route_class=ProfiledRoute)
+
+    @router.get("/work/sync")
+    def sync_work():
+        spin_sync(0.05)
+        return {}
+
+    @router.get("/work/async")
+    async def async_work():
+        await spin_async(0.05)
+        return {}
+
+    store = ProfileStore(max_profiles=3)
+    small = FastAPI()
+    small.add_middleware(ProfilingMiddleware, store=store, sampler=Sampler(0.001), token=TOKEN, sample_rate=0)
+    small.add_middleware(RequestMetricsMiddleware)
+    small.include_router(router)
+    small.include_router(notes.router)
+    sqlite_app(
+        seed=lambda db: db.add_all([Note(title=f"Note {i}", content="c", user_id=1) for i in range(5)]),
+        instrument=True,
+        target=small,
+        dependencies=(get_db, get_read_db),
+    )
+    return TestClient(small), store
+
+
+def test_sync_handler_is_sampled_on_its_thread(profiled_app):
+    client, store = profiled_app
+    response = client.get("/work/sync", headers={"X-Profile-Token": TOKEN})
+    assert response.status_code == 200
+    record = store.get(int(response.headers["x-profile-id"]))
+    # No worker id outside app.serve
+    assert "x-profile-worker" not in response.headers
+    assert record["route"] == "/work/sync"
+    assert record["status"] == 200
+    assert record["samples"] > 0
+    # Stacks start at the handler wrapper on the threadpool thread
+    assert any("spin_sync" in stack for stack in record["collapsed"])
+    assert record["top"][0]["function"].endswith(":spin_sync")
+    assert record["top"][0]["self_ms"] > 0
+
+
+def test_async_handler_is_sampled_on_the_event_loop(profiled_app):
+    client, store = profiled_app
+    response = client.get("/work/async", headers={"X-Profile-Token": TOKEN})
+    record = store.get(int(response.headers["x-profile-id"]))
+    assert any("spin_async;" in stack and stack.split(" ")[0].endswith(":spin_sync") for stack in record["collapsed"])
+
+
+def test_profile_reports_sql_time(profiled_app):
+    client, store = profiled_app
+    response = client.get("/notes/", headers={"X-Profile-Token": TOKEN})
+    assert len(response.json()) == 5
+    record = store.get(int(response.headers["x-profile-id"]))
+    assert record["query_count"] >= 1
+    assert record["sql_ms"] > 0
+    assert any("FROM notes" in entry["statement"] for entry in record["sql"])
+    assert sum(entry["count"] for entry in record["sql"]) == record["query_count"]
+
+
+def test_requests_without_the_token_are_not_profiled(profiled_app):
+    client, store = profiled_app
+    assert "x-profile-id" not in client.get("/work/sync").headers
+    assert "x-profile-id" not in client.get("/work/sync", headers={"X-Profile-Token": "guess"}).headers
+    assert store.summaries() == []
+    # Only the newest profiles are kept
+    ids = [client.get("/notes/", headers={"X-Profile-Token": TOKEN}).headers["x-profile-id"] for _ in range(4)]
+    assert [summary["id"] for summary in store.summaries()] == [int(i) for i in reversed(ids[1:])]
+
+
+def test_internal_profiles_endpoint(monkeypatch):
+    client = TestClient(app)
+    # Without a configured token profiles can't be read at all
+    assert client.get("/internal/profiles").status_code == 403
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", TOKEN)
+    for path in ("/internal/profiles", "/internal/profiles/1", "/internal/profiles/1/collapsed"):
+        assert client.get(path).status_code == 403
+        assert client.get(path, headers={"X-Profile-Token": "guess"}).status_code == 403
+    headers = {"X-Profile-Token": TOKEN}
+    body = client.get("/internal/profiles", headers=headers).json()
+    assert body["enabled"] is False and body["profiles"] == []
+    assert body["worker"] is None and body["pid"] == os.getpid()
+    assert client.get("/internal/profiles/1", headers=headers).status_code == 404
+    assert client.get("/internal/profiles/1/collapsed", headers=headers).status_code == 404
@@ -0,0 +1,108 @@
+# tests/test_replicas.py
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+import app.db.session as session_module
+from app.api.middleware import ReadYourWritesMiddleware
+from app.db.replicas import ReplicaRouter
+from app.db.session import READ_PIN_COOKIE
+from app.main import app
+from app.models import Note
+from app.services.note_cache import note_cache
+
+client = TestClient(app)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _seed(title: str):
+    """One note; tells the primary and the replica apart."""
+    return lambda db: db.add(Note(id=1, title=title, content="", user_id=1))
+
+
+@pytest.fixture
+def primary_and_replica(sqlite_app, sqlite_db, monkeypatch):
+    sqlite_app(seed=_seed("from primary"))
+    replica = sqlite_db(seed=_seed("from replica")).kw["bind"]
+    router = ReplicaRouter([replica], retry_after=10)
+    monkeypatch.setattr(session_module, "replica_router", router)
+    note_cache.clear()
+    yield router
+    note_cache.clear()
+    client.cookies.clear()
+
+
+def test_router_round_robin_and_retry():
+    clock = FakeClock()
+    a, b = create_engine("sqlite://"), create_engine("sqlite://")
+    router = ReplicaRouter([a, b], retry_after=5, clock=clock)
+    assert [router.choose() for _ in range(4)] == [a, b, a, b]
+
+    router.mark_down(a)
+    assert [router.choose() for _ in range(3)] == [b, b, b]
+    router.mark_down(b)
+    assert router.choose() is None
+
+    clock.now = 5
+    assert router.choose() in (a, b)
+    assert router.status()["failures"] == 2
+
+
+def test_reads_go_to_replica(primary_and_replica):
+    assert client.get("/notes/").json()[0]["title"] == "from replica"
+    assert client.get("/notes/1").json()["title"] == "from replica"
+    # Writes always use the primary
+    assert client.put("/notes/1", json={"content": "edited"}).json()["title"] == "from primary"
+
+
+def test_replica_reads_are_not_cached(primary_and_replica):
+    client.get("/notes/1")
+    assert note_cache.stats()["entries"] == 0
+
+
+def test_pinned_client_reads_primary(primary_and_replica):
+    client.cookies.set(READ_PIN_COOKIE, "1")
+    assert client.get("/notes/").json()[0]["title"] == "from primary"
+
+
+def test_unreachable_replica_falls_back_to_primary(primary_and_replica, monkeypatch):
+    broken = create_engine("sqlite:////nonexistent-dir/replica.db")
+    router = ReplicaRouter([broken], retry_after=10)
+    monkeypatch.setattr(session_module, "replica_router", router)
+    assert client.get("/notes/").json()[0]["title"] == "from primary"
+    assert router.status()["replicas"][0]["healthy"] is False
+    # Skipped without another connection attempt until the retry window passes
+    assert router.choose() is None
+
+
+def test_read_your_writes_cookie():
+    small = FastAPI()
+    small.add_middleware(ReadYourWritesMiddleware, cookie_name=READ_PIN_COOKIE, window_seconds=5)
+
+    @small.get("/thing")
+    def read():
+        return {}
+
+    @small.post("/thing")
+    def write():
+        return {}
+
+    @small.delete("/thing")
+    def fail():
+        return Response(status_code=404)
+
+    small_client = TestClient(small)
+    assert READ_PIN_COOKIE not in small_client.get("/thing").cookies
+    response = small_client.post("/thing")
+    assert response.cookies[READ_PIN_COOKIE] == "1"
+    assert "Max-Age=5" in response.headers["set-cookie"]
+    # Failed writes don't pin
+    assert READ_PIN_COOKIE not in small_client.delete("/thing").cookies
@@ -0,0 +1,72 @@
+# tests/test_serve.py
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import text
+
+from app.db import session
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_forked_child_starts_with_empty_pool():
+    # The parent holds a pooled connection across the fork
+    with session.engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        pid = os.fork()
+        if pid == 0:
+            ok = session.engine.pool.checkedout() == 0 and session.engine.pool.checkedin() == 0
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        # The child's dispose must not have closed the parent's connection
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+    assert os.waitstatus_to_exitcode(status) == 0
+
+
+def test_serve_initializes_once_and_stops_gracefully():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    port = _free_port()
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{path}", "PROFILING_TOKEN": "ops"}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--port", str(port), "--workers", "2", "--log-level", "info"],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            assert time.monotonic() < deadline, "server did not start"
+            time.sleep(0.1)
+        created = httpx.post(f"http://127.0.0.1:{port}/notes/", json={"title": "Served", "content": "c", "user_id": 1})
+        assert created.status_code == 200
+        # Any worker can read it back: they share the database, not a cache
+        for _ in range(4):
+            assert httpx.get(f"http://127.0.0.1:{port}/notes/{created.json()['id']}").status_code == 200
+        # Per-worker stats say which worker answered
+        cache = httpx.get(f"http://127.0.0.1:{port}/internal/cache", headers={"X-Profile-Token": "ops"})
+        assert cache.json()["worker"] in (0, 1)
+        assert 'app_worker_info{worker="' in httpx.get(f"http://127.0.0.1:{port}/metrics").text
+        proc.send_signal(signal.SIGTERM)
+        output, _ = proc.communicate(timeout=30)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        os.remove(path)
+    assert proc.returncode == 0
+    assert output.count("startup phase seed") == 1
@@ -0,0 +1,38 @@
+# tests/test_similarity.py
+import numpy as np
+
+from app.services.similarity import NUM_PERM, band_buckets, compute_signatures, shingle_hashes, similarities
+
+
+def _words(start, stop):
+    return " ".join(f"w{i}" for i in range(start, stop))
+
+
+def test_signature_estimates_jaccard():
+    # Shingle sets of 398 each, overlapping in 298 of 498 -> Jaccard ~0.6
+    positions, signatures = compute_signatures([_words(0, 400), _words(100, 500)])
+    assert list(positions) == [0, 1]
+    estimate = similarities(signatures[0], signatures[1:])[0]
+    assert abs(estimate - 298 / 498) < 0.12
+
+
+def test_batch_matches_single_and_skips_blank_content():
+    contents = ["alpha beta gamma delta", None, "  ", "one two"]
+    positions, signatures = compute_signatures(contents)
+    assert list(positions) == [0, 3]
+    for position, signature in zip(positions, signatures):
+        assert np.array_equal(compute_signatures([contents[position]])[1][0], signature)
+    assert signatures.shape == (2, NUM_PERM)
+
+
+def test_shingles_ignore_case_and_punctuation():
+    assert np.array_equal(shingle_hashes("Hello, World again!"), shingle_hashes("hello world AGAIN"))
+
+
+def test_bands_hash_into_distinct_buckets():
+    _, signatures = compute_signatures([_words(0, 50)])
+    buckets = band_buckets(signatures)[0]
+    # Identical band values in different bands still get different buckets
+    same = band_buckets(np.zeros((1, NUM_PERM), dtype=np.uint32))[0]
+    assert len(set(same)) == len(same)
+    assert (buckets >= 0).all()
@@ -0,0 +1,74 @@
+# tests/test_write_coalescer.py
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.main import app
+from app.models import Note
+from app.schemas.notes import NoteCreate
+from app.services import write_coalescer
+from app.services.write_coalescer import WriteCoalescer
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def session_factory(sqlite_app):
+    return sqlite_app()
+
+
+@pytest.fixture
+def writer(session_factory):
+    coalescer = WriteCoalescer(session_factory, window_seconds=0.05, max_batch=16)
+    coalescer.start()
+    yield coalescer
+    coalescer.stop()
+
+
+def test_concurrent_creates_share_transactions(writer, session_factory):
+    notes = [NoteCreate(title=f"Note {i}", content="c", user_id=1) for i in range(40)]
+    with ThreadPoolExecutor(max_workers=40) as pool:
+        created = list(pool.map(lambda note: writer.submit(note).result(timeout=5), notes))
+
+    # Each caller gets its own note back
+    assert [note["title"] for note in created] == [f"Note {i}" for i in range(40)]
+    assert len({note["id"] for note in created}) == 40
+    stats = writer.stats()
+    assert stats["items"] == 40
+    assert stats["batches"] < 40
+    assert stats["largest_batch"] <= 16
+    with session_factory() as db:
+        assert db.scalar(select(func.count()).select_from(Note)) == 40
+
+
+def test_bad_item_fails_only_its_caller(writer):
+    good = writer.submit(NoteCreate(title="Good", content="c", user_id=1))
+    bad = writer.submit(NoteCreate(title="Bad", content="c", user_id=999))
+    assert good.result(timeout=5)["title"] == "Good"
+    with pytest.raises(HTTPException) as exc:
+        bad.result(timeout=5)
+    assert exc.value.status_code == 400
+    assert exc.value.detail == "User with id 999 not found"
+
+
+def test_stop_flushes_pending(session_factory):
+    coalescer = WriteCoalescer(session_factory, window_seconds=10, max_batch=1000)
+    coalescer.start()
+    futures = [coalescer.submit(NoteCreate(title=f"N{i}", content="c", user_id=1)) for i in range(5)]
+    # stop() doesn't wait out the 10 second window
+    coalescer.stop()
+    assert all(future.done() for future in futures)
+    assert coalescer.stats()["batches"] == 1
+
+
+def test_create_route_uses_coalescer(writer, monkeypatch):
+    monkeypatch.setattr(write_coalescer, "note_writer", writer)
+    response = client.post("/notes/", json={"title": "Routed", "content": "c", "user_id": 1})
+    missing_user = client.post("/notes/", json={"title": "Routed", "content": "c", "user_id": 999})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Routed"
+    assert missing_user.status_code == 400
+    assert writer.stats()["items"] == 2